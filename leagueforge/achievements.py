@@ -51,9 +51,10 @@ import gspread
 from datetime import datetime
 from typing import Dict, List, Set, Tuple
 from sheet_utils import (
-    COL_CONFIG, COL_RESULTS, COL_ACHIEVEMENT_DEF, COL_PLAYER_ACH,
+    COL_CONFIG, COL_ACHIEVEMENT_DEF, COL_PLAYER_ACH,
     safe_get, safe_int
 )
+from results_table import ResultsTable, load_results_table, tcg_from_season
 
 
 # ============================================================================
@@ -126,22 +127,8 @@ def load_player_achievements(sheet, membership: str) -> Set[str]:
 
     return unlocked
 
-def calculate_player_stats(sheet, membership: str, tcg: str = None) -> Dict:
-    """
-    Calcola statistiche complete di un giocatore dai fogli Results.
-
-    IMPORTANTE: Esclude automaticamente i risultati delle stagioni ARCHIVED
-    per evitare che influenzino gli achievement.
-
-    Args:
-        sheet: Google Sheet connesso
-        membership: Membership number del giocatore
-        tcg: Filtra per TCG specifico (opzionale)
-
-    Returns:
-        Dict con tutte le stats necessarie per check achievement
-    """
-    # 1. Carica lista stagioni ARCHIVED da Config
+def _load_archived_seasons(sheet) -> Set[str]:
+    """Season ID con status ARCHIVED nel foglio Config."""
     ws_config = sheet.worksheet("Config")
     config_data = safe_api_call(ws_config.get_all_values)[4:]  # Skip header (righe 1-4)
 
@@ -151,58 +138,55 @@ def calculate_player_stats(sheet, membership: str, tcg: str = None) -> Dict:
         status = (safe_get(row, COL_CONFIG, 'status') or '').strip().upper()
         if status == "ARCHIVED":
             archived_seasons.add(season_id)
+    return archived_seasons
 
-    # 2. Carica risultati
-    ws_results = sheet.worksheet("Results")
-    all_results = safe_api_call(ws_results.get_all_values)[3:]  # Skip header
 
-    # 3. Filtra risultati del giocatore ESCLUDENDO stagioni ARCHIVED
-    player_results = []
-    for r in all_results:
-        if safe_get(r, COL_RESULTS, 'membership') == membership:
-            season_id = safe_get(r, COL_RESULTS, 'season_id')
-            if season_id not in archived_seasons:
-                player_results.append(r)
+def _player_rows(table: ResultsTable, membership: str, archived_seasons: Set[str], tcg: str = None) -> List[int]:
+    """Indici riga del giocatore, ESCLUDENDO stagioni ARCHIVED (e altri TCG se tcg)."""
+    rows = []
+    for i in table.rows_for_member(membership):
+        season_id = table.season_of(i)
+        if season_id in archived_seasons:
+            continue
+        if tcg and tcg_from_season(season_id) != tcg.upper():
+            continue
+        rows.append(i)
+    return rows
 
-    if tcg:
-        # Filtra per TCG
-        player_results = [r for r in player_results if safe_get(r, COL_RESULTS, 'season_id', '').startswith(tcg)]
 
-    # Calcoli base
-    tournaments_played = len(player_results)
-    tournament_wins = sum(1 for r in player_results if safe_int(r, COL_RESULTS, 'rank', 999) == 1)
-    top8_count = sum(1 for r in player_results if safe_int(r, COL_RESULTS, 'rank', 999) <= 8)
+def _stats_from_rows(table: ResultsTable, rows: List[int]) -> Dict:
+    """Stats achievement dalle righe (indici ResultsTable) di un giocatore."""
+    ranks = [table.rank[i] for i in rows]
 
-    # Ranks
-    ranks = [safe_int(r, COL_RESULTS, 'rank', 999) for r in player_results]
-    ranks = [rk for rk in ranks if rk < 999]
-    best_rank = min(ranks) if ranks else 999
+    # Calcoli base
+    tournaments_played = len(rows)
+    tournament_wins = sum(1 for rk in ranks if rk == 1)
+    top8_count = sum(1 for rk in ranks if rk <= 8)
 
-    # Perfect wins (4-0 o 5-0 senza sconfitte)
-    perfect_wins = 0
-    for r in player_results:
-        if safe_int(r, COL_RESULTS, 'rank', 999) == 1:
-            perfect_wins += 1
+    # Ranks (999 = rank mancante)
+    valid_ranks = [rk for rk in ranks if rk < 999]
+    best_rank = min(valid_ranks) if valid_ranks else 999
 
     # TCG giocati
     tcgs_played = set()
+    tcg_tournaments = {}
     tcg_wins = {}
     tcg_top8 = {}
-    for r in player_results:
-        season_id = r[0]
-        tcg_code = season_id.split('-')[0] if '-' in season_id else 'OP'
+    for i in rows:
+        tcg_code = tcg_from_season(table.season_of(i))
         tcgs_played.add(tcg_code)
+        tcg_tournaments[tcg_code] = tcg_tournaments.get(tcg_code, 0) + 1
 
-        if r[3] and int(r[3]) == 1:
+        if table.rank[i] == 1:
             tcg_wins[tcg_code] = tcg_wins.get(tcg_code, 0) + 1
-        if r[3] and int(r[3]) <= 8:
+        if table.rank[i] <= 8:
             tcg_top8[tcg_code] = tcg_top8.get(tcg_code, 0) + 1
 
     # Streak calculation (top8 consecutivi)
     current_streak_top8 = 0
     max_streak_top8 = 0
-    for r in sorted(player_results, key=lambda x: x[1]):  # Ordina per tournament_id (data)
-        if r[3] and int(r[3]) <= 8:
+    for i in sorted(rows, key=table.tid_of):  # Ordina per tournament_id (data)
+        if table.rank[i] <= 8:
             current_streak_top8 += 1
             max_streak_top8 = max(max_streak_top8, current_streak_top8)
         else:
@@ -210,30 +194,47 @@ def calculate_player_stats(sheet, membership: str, tcg: str = None) -> Dict:
 
     # Rank frequency (per achievement tipo "Silver Collector")
     rank_frequency = {}
-    for r in player_results:
-        if r[3]:
-            rank = int(r[3])
-            rank_frequency[rank] = rank_frequency.get(rank, 0) + 1
+    for rk in valid_ranks:
+        rank_frequency[rk] = rank_frequency.get(rk, 0) + 1
 
-    # Ultimi 3 tornei (per Rookie Struggles)
-    first_3_results = player_results[:3] if len(player_results) >= 3 else player_results
-    first_3_wins = sum(1 for r in first_3_results if r[4] and float(r[4])/3 >= 1)
+    # Primi 3 tornei (per Rookie Struggles)
+    first_3_wins = sum(1 for i in rows[:3] if table.win_points[i] / 3 >= 1)
 
-    stats = {
+    return {
         'tournaments_played': tournaments_played,
         'tournament_wins': tournament_wins,
         'top8_count': top8_count,
         'best_rank': best_rank,
         'max_streak_top8': max_streak_top8,
         'tcgs_played': tcgs_played,
+        'tcg_tournaments': tcg_tournaments,
         'tcg_wins': tcg_wins,
         'tcg_top8': tcg_top8,
         'rank_frequency': rank_frequency,
         'first_3_wins': first_3_wins,
-        'player_results': player_results  # Per check avanzati
+        'seasons_played': len({table.season_of(i) for i in rows})
     }
 
-    return stats
+
+def calculate_player_stats(sheet, membership: str, tcg: str = None) -> Dict:
+    """
+    Calcola statistiche complete di un giocatore dai fogli Results.
+
+    IMPORTANTE: Esclude automaticamente i risultati delle stagioni ARCHIVED
+    per evitare che influenzino gli achievement.
+
+    Args:
+        sheet: Google Sheet connesso
+        membership: Membership number del giocatore
+        tcg: Filtra per TCG specifico (opzionale)
+
+    Returns:
+        Dict con tutte le stats necessarie per check achievement
+    """
+    archived_seasons = _load_archived_seasons(sheet)
+    table = load_results_table(sheet)
+    return _stats_from_rows(table, _player_rows(table, membership, archived_seasons, tcg))
+
 
 def unlock_achievement(sheet, membership: str, achievement_id: str, tournament_id: str, progress: str = ""):
     """
@@ -404,8 +405,7 @@ def check_special_achievements(stats: Dict, achievements: Dict, unlocked: Set, c
             # Almeno 3 tornei in 2 TCG diversi
             tcg_counts = {}
             for tcg in stats['tcgs_played']:
-                count = sum(1 for r in stats['player_results'] if r[0].startswith(tcg))
-                tcg_counts[tcg] = count
+                tcg_counts[tcg] = stats['tcg_tournaments'].get(tcg, 0)
 
             tcgs_with_3plus = [tcg for tcg, count in tcg_counts.items() if count >= 3]
             if len(tcgs_with_3plus) >= 2:
@@ -445,27 +445,10 @@ def batch_load_player_achievements(sheet, memberships: list) -> dict:
     return result
 
 def batch_calculate_player_stats(sheet, memberships: list, tcg: str = None) -> dict:
-    """Calcola stats per multipli giocatori in 2 reads."""
-    ws_config = sheet.worksheet("Config")
-    config_data = safe_api_call(ws_config.get_all_values)[4:]
-    archived = {safe_get(r, COL_CONFIG, 'season_id') for r in config_data if safe_get(r, COL_CONFIG, 'status', '').strip().upper() == "ARCHIVED"}
-    ws_results = sheet.worksheet("Results")
-    all_results = safe_api_call(ws_results.get_all_values)[3:]
-    player_results = {m: [] for m in memberships}
-    for r in all_results:
-        mem = safe_get(r, COL_RESULTS, 'membership')
-        if mem in player_results:
-            season_id = safe_get(r, COL_RESULTS, 'season_id')
-            if season_id not in archived and (not tcg or season_id.startswith(tcg)):
-                player_results[mem].append(r)
-    result = {}
-    for mem, results in player_results.items():
-        tournaments = len(results)
-        wins = sum(1 for r in results if safe_int(r, COL_RESULTS, 'rank', 999) == 1)
-        top8 = sum(1 for r in results if safe_int(r, COL_RESULTS, 'rank', 999) <= 8)
-        ranks = [safe_int(r, COL_RESULTS, 'rank', 999) for r in results if safe_int(r, COL_RESULTS, 'rank', 999) < 999]
-        result[mem] = {'tournaments_played': tournaments, 'tournament_wins': wins, 'top8_count': top8, 'best_rank': min(ranks) if ranks else 999, 'tcgs_played': len({safe_get(r, COL_RESULTS, 'season_id', '')[:2] for r in results if safe_get(r, COL_RESULTS, 'season_id')}), 'seasons_played': len({safe_get(r, COL_RESULTS, 'season_id') for r in results})}
-    return result
+    """Calcola stats per multipli giocatori in 2 reads (Results condivisa con l'import)."""
+    archived = _load_archived_seasons(sheet)
+    table = load_results_table(sheet)
+    return {m: _stats_from_rows(table, _player_rows(table, m, archived, tcg)) for m in memberships}
 
 def check_and_unlock_achievements(sheet, import_data: Dict):
     """
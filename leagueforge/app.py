@@ -29,15 +29,27 @@ Note:
 # ============================================================================
 # IMPORTS
 # ============================================================================
-from flask import Flask, render_template, redirect, url_for, jsonify, request, flash, session
+from flask import Flask, render_template, redirect, url_for, jsonify, request, flash, session, make_response
 from cache import cache
 from config import SECRET_KEY, DEBUG, SESSION_TIMEOUT
-from stats_builder import build_stats
+try:
+    from config import NEGATIVE_CACHE_SECONDS
+except ImportError:
+    # config.py creati prima di questa opzione
+    NEGATIVE_CACHE_SECONDS = 60
+from stats_builder import SECTIONS
+from stats_warmup import StatsWorker, warm_scopes
+from stats_artifacts import load_artifact
+from player_profiles import profiles
+from page_cache import PageCache
+from auth import admin_required
+from http_cache import conditional, snapshot_last_modified
+from invalidation import InvalidationListener
+from collections import OrderedDict
 from datetime import timedelta
-from sheet_utils import (
-    COL_PLAYERS, COL_PLAYER_STATS, COL_ACHIEVEMENT_DEF, COL_PLAYER_ACH,
-    validate_sheet_headers
-)
+import threading
+import time
+from sheet_utils import COL_PLAYER_STATS, validate_header_rows
 # Note: safe_int, safe_float sono definiti localmente in questo file (signature diversa da sheet_utils)
 
 
@@ -62,6 +74,153 @@ def inject_defaults():
     return {"default_stats_scope": "OP12"}
 
 
+# ============================================================================
+# INVALIDAZIONE DOPO IMPORT
+# ============================================================================
+# Gli import pubblicano un evento (invalidation.py); alla prima richiesta
+# successiva questo processo aggiorna in background snapshot e stats degli
+# scope toccati, senza aspettare i TTL.
+
+_invalidation_listener = InvalidationListener(
+    since=cache.last_update.timestamp() if cache.last_update else time.time()
+)
+_pending_invalidations = []
+_invalidation_lock = threading.Lock()
+_invalidation_thread = None
+# Aggregati stats di tutti gli scope, aggiornati in modo incrementale dagli
+# import: tenuti in un processo dedicato, non condividono il GIL con le richieste
+_stats_worker = StatsWorker()
+# HTML renderizzato di classifica/stats/player per versione dello snapshot
+pages = PageCache(current_version=lambda: cache.snapshot_version())
+# Scope senza stats né artifact: calcolati in background, mai nella richiesta
+_stats_builds = set()
+_stats_build_lock = threading.Lock()
+_stats_build_thread = None
+
+
+@app.before_request
+def check_import_invalidations():
+    """Avvia il rebuild se un import ha pubblicato eventi (1 os.stat se no)."""
+    global _invalidation_thread
+    events = _invalidation_listener.poll()
+    if not events:
+        return
+    with _invalidation_lock:
+        _pending_invalidations.extend(events)
+        if _invalidation_thread is None or not _invalidation_thread.is_alive():
+            _invalidation_thread = threading.Thread(
+                target=_rebuild_after_import, name='import-invalidation', daemon=True
+            )
+            _invalidation_thread.start()
+
+
+def _rebuild_after_import():
+    """Consuma gli eventi pendenti: refresh snapshot + stats degli scope toccati."""
+    while True:
+        with _invalidation_lock:
+            events = list(_pending_invalidations)
+            _pending_invalidations.clear()
+        if not events:
+            return
+        apply_invalidations(events)
+
+
+def _schedule_stats_build(scopes):
+    """Accoda il calcolo in background degli scope (un solo thread per processo)."""
+    global _stats_build_thread
+    with _stats_build_lock:
+        _stats_builds.update(scopes)
+        if _stats_build_thread is None:
+            _stats_build_thread = threading.Thread(
+                target=_build_pending_stats, name='stats-build', daemon=True
+            )
+            _stats_build_thread.start()
+
+
+def _build_pending_stats():
+    """Calcola gli scope accodati e li salva in stats_cache."""
+    global _stats_build_thread
+    while True:
+        with _stats_build_lock:
+            scopes = sorted(_stats_builds)
+            _stats_builds.clear()
+            if not scopes:
+                _stats_build_thread = None
+                return
+        try:
+            warm_scopes(cache.results_table(), scopes,
+                        fingerprint=cache.sheet_fingerprint("Results"), verbose=False)
+        except Exception as e:
+            print(f"⚠️ Stats in background fallite ({', '.join(scopes)}): {e}")
+
+
+def _load_stats_artifact(scope, table, results_fp):
+    """Artifact dell'import per lo scope → stats_cache; False se assente o vecchio."""
+    from stats_cache import set_sections
+
+    payload = load_artifact(scope, table.digest())
+    if not payload:
+        return False
+    set_sections(scope, payload, fingerprint=results_fp)
+    return True
+
+
+def apply_invalidations(events):
+    """
+    Applica eventi di invalidazione import.
+
+    1. Nuovo fetch SheetCache (anche se uno è già in corso: potrebbe essere
+       partito prima dell'import)
+    2. Stats per stagione + ALL-<TCG> di ogni evento: prima gli artifact
+       scritti dall'import (stats_artifacts.py) se sono della stessa
+       versione di Results; per gli scope restanti, se l'import ha solo
+       aggiunto tornei in coda a Results, fold incrementale sugli aggregati
+       tenuti nel processo stats (_stats_worker); altrimenti rebuild degli
+       scope nel pool di processi (stats_warmup) e aggregati ricostruiti
+       nel processo stats, in background, per il prossimo fold
+    3. Profili (player_profiles) ricalcolati solo per i giocatori dell'evento
+    La negative cache (membership/scope inesistenti) si svuota subito dopo
+    il fetch: l'import può aver creato giocatori o stagioni.
+    """
+    from stats_cache import set_sections, clear
+
+    success, error = cache.fetch_data(reuse_inflight=False)
+    if not success:
+        print(f"⚠️ Invalidazione import: refresh cache fallito: {error}")
+        return
+    _forget_missing()
+
+    scopes = list(dict.fromkeys(s for e in events for s in e.get('scopes', [])))
+    players = {m for e in events for m in e.get('players', [])}
+    try:
+        results_fp = cache.sheet_fingerprint("Results")
+        table = cache.results_table()
+        tids = [e.get('tournament_id') for e in events]
+        pending = [scope for scope in scopes if not _load_stats_artifact(scope, table, results_fp)]
+        # Il fold aggiorna gli aggregati anche senza scope da calcolare
+        stats_map = _stats_worker.fold(table, tids, pending)
+        if stats_map is None:
+            if pending:
+                warm_scopes(table, pending, fingerprint=results_fp, verbose=False)
+            _stats_worker.rebuild(table)
+        else:
+            for scope in pending:
+                if stats_map.get(scope):
+                    set_sections(scope, stats_map[scope], fingerprint=results_fp)
+                else:
+                    clear(scope)
+    except Exception as e:
+        _stats_worker.clear()
+        print(f"⚠️ Invalidazione import: rebuild stats fallito: {e}")
+        return
+    try:
+        profiles.refresh_players(cache, players)
+    except Exception as e:
+        profiles.clear()
+        print(f"⚠️ Invalidazione import: profili non ricalcolati: {e}")
+    print(f"🔄 Import: cache aggiornata ({', '.join(scopes)}; {len(players)} profili)")
+
+
 # ============================================================================
 # HELPER FUNCTIONS - Utility generiche
 # ============================================================================
@@ -185,12 +344,14 @@ def ping():
 
 
 # ---------------------- REFRESH ROBUSTO CACHE/STATS ------------------------
-def _normalize_builder_result(res, scope):
+def _normalize_builder_result(res, scope, sections=None):
     """
     Normalizza l'output del build_stats:
     - se res è un dict con dentro {scope: {...}} ritorna res[scope]
     - se è già "flat" lo lascia così
     - riempie i pezzi mancanti con default sicuri (così Jinja non esplode)
+    - con `sections` (le sezioni richieste al builder) i default vanno solo
+      alle sezioni NON richieste: quelle calcolate restano come sono
     """
     # estrazione del payload della stagione
     if isinstance(res, dict) and scope in res:
@@ -209,76 +370,150 @@ def _normalize_builder_result(res, scope):
             d = d[k]
         d.setdefault(path_keys[-1], default_value)
 
-    # default per spotlights
-    ensure(["spotlights"], {})
-    for k in ["mvp", "sharpshooter", "metronome", "phoenix", "big_stage", "closer"]:
-        payload["spotlights"].setdefault(k, [])
-
-    # narrative cards
-    ensure(["spot_narrative"], [])
-
-    # pulse.kpi
-    ensure(["pulse"], {})
-    ensure(["pulse", "kpi"], {})
-    kpi = payload["pulse"]["kpi"]
-    kpi.setdefault("events_total", 0)
-    kpi.setdefault("unique_players", 0)         # o "participants_unique" se preferisci
-    kpi.setdefault("entries_total", 0)
-    kpi.setdefault("avg_participants", 0.0)
-    kpi.setdefault("top8_rate", 0.0)
-    kpi.setdefault("avg_omw", 0.0)
-
-    # pulse.series
-    ensure(["pulse", "series"], {})
-    payload["pulse"]["series"].setdefault("entries_per_event", [])
-    payload["pulse"]["series"].setdefault("avg_points_per_event", [])
-
-    # tales
-    ensure(["tales"], {})
-    for k in ["companions", "podium_rivals", "top8_mixture"]:
-        payload["tales"].setdefault(k, [])
-
-    # hall of fame
-    ensure(["hof"], {})
-    for k in ["highest_single_score", "biggest_crowd", "most_balanced", "most_dominated", "fastest_riser"]:
-        payload["hof"].setdefault(k, None)
+    def spotlights():
+        ensure(["spotlights"], {})
+        for k in ["mvp", "sharpshooter", "metronome", "phoenix", "big_stage", "closer"]:
+            payload["spotlights"].setdefault(k, [])
+
+    def spot_narrative():
+        ensure(["spot_narrative"], [])
+
+    def pulse():
+        # pulse.kpi
+        ensure(["pulse"], {})
+        ensure(["pulse", "kpi"], {})
+        kpi = payload["pulse"]["kpi"]
+        kpi.setdefault("events_total", 0)
+        kpi.setdefault("unique_players", 0)         # o "participants_unique" se preferisci
+        kpi.setdefault("entries_total", 0)
+        kpi.setdefault("avg_participants", 0.0)
+        kpi.setdefault("top8_rate", 0.0)
+        kpi.setdefault("avg_omw", 0.0)
+
+        # pulse.series
+        ensure(["pulse", "series"], {})
+        payload["pulse"]["series"].setdefault("entries_per_event", [])
+        payload["pulse"]["series"].setdefault("avg_points_per_event", [])
+
+    def tales():
+        ensure(["tales"], {})
+        for k in ["companions", "podium_rivals", "top8_mixture"]:
+            payload["tales"].setdefault(k, [])
+
+    def hof():
+        ensure(["hof"], {})
+        for k in ["highest_single_score", "biggest_crowd", "most_balanced", "most_dominated", "fastest_riser"]:
+            payload["hof"].setdefault(k, None)
+
+    defaults = {"spotlights": spotlights, "spot_narrative": spot_narrative,
+                "pulse": pulse, "tales": tales, "hof": hof}
+    for section, fill in defaults.items():
+        if sections is None or section not in sections:
+            fill()
 
     return payload
 
 
-def _do_refresh(scope):
-    try:
-        # il tuo import in alto: from stats_builder import build_stats
-        # Provo prima con lista (alcune versioni vogliono ['OP12']), poi con stringa.
-        try:
-            raw = build_stats([scope])
-        except Exception:
-            raw = build_stats(scope)
+# Sezioni stats della homepage (highlights): niente Pulse, Tales, Hall of Fame
+HOME_STATS_SECTIONS = ("spotlights",)
 
-        payload = _normalize_builder_result(raw, scope)
 
-        # Se la V2 è presente, salvo in cache; se non c'è, pazienza.
-        try:
-            from leagueforge_v2.services.stats_service import write_stats
-            write_stats(scope, payload)
-        except Exception:
-            pass
+def _stats_sections(scope, sections, max_age=900):
+    """
+    Sezioni stats di uno scope, senza mai calcolarle nella richiesta.
 
-        return jsonify({"status": "ok", "scope": scope, "keys": list(payload.keys())})
-    except Exception as e:
-        # NON facciamo più saltare la WSGI: rispondiamo con JSON d'errore
-        return jsonify({"status": "error", "message": str(e)}), 500
+    Ordine: cache per-sezione di stats_cache, poi artifact precalcolato
+    dall'import (stesso digest di Results). Se manca ancora qualcosa lo
+    scope viene accodato al calcolo in background e la pagina esce con le
+    sezioni disponibili (default per le altre).
 
+    Args:
+        scope (str): Season ID o ALL-<TCG>
+        sections: Sottoinsieme di stats_builder.SECTIONS
+        max_age (int): TTL in secondi (vedi stats_cache.get_cached)
 
-@app.get("/api/refresh")
-def api_refresh_default():
-    # refresh di cortesia sulla stagione standard
-    return _do_refresh("OP12")
+    Returns:
+        dict: {sezione: dati} per le sezioni disponibili
+    """
+    from stats_cache import get_sections
+
+    results_fp = cache.sheet_fingerprint("Results")
+    found = get_sections(scope, sections, max_age, fingerprint=results_fp)
+    if len(found) < len(sections):
+        table = cache.results_table()
+        if _load_stats_artifact(scope, table, results_fp):
+            found = get_sections(scope, sections, max_age, fingerprint=results_fp)
+        if len(found) < len(sections) and len(table.rows_for_scope(scope)):
+            _schedule_stats_build([scope])
+    return {section: found[section] for section in sections if section in found}
+
+
+# ---------------------------------------------------------------------------
+# Negative cache: membership e scope che non esistono nello snapshot.
+# L'esistenza si decide sugli indici della ResultsTable (O(1)); per
+# NEGATIVE_CACHE_SECONDS la stessa richiesta risponde 404 con la pagina già
+# renderizzata, senza cache.get_data() (e quindi senza refresh verso Google).
+# Svuotata da apply_invalidations: un import può creare giocatori e stagioni.
+# ---------------------------------------------------------------------------
+NEGATIVE_CACHE_MAX_ENTRIES = 4096
+
+_missing = OrderedDict()    # (tipo, chiave) -> scadenza (time.monotonic)
+_missing_pages = {}         # tipo -> (scadenza, html della 404)
+_missing_lock = threading.Lock()
+
+
+def _known_missing(kind, key):
+    """Pagina 404 già pronta se (kind, key) è noto come inesistente, altrimenti None."""
+    now = time.monotonic()
+    with _missing_lock:
+        expiry = _missing.get((kind, key))
+        if expiry is None:
+            return None
+        if expiry <= now:
+            del _missing[(kind, key)]
+            return None
+        page = _missing_pages.get(kind)
+        return page[1] if page and page[0] > now else None
+
+
+def _remember_missing(kind, key, page):
+    """Registra (kind, key) come inesistente per NEGATIVE_CACHE_SECONDS."""
+    if NEGATIVE_CACHE_SECONDS <= 0:
+        return
+    expiry = time.monotonic() + NEGATIVE_CACHE_SECONDS
+    with _missing_lock:
+        _missing[(kind, key)] = expiry
+        _missing.move_to_end((kind, key))
+        while len(_missing) > NEGATIVE_CACHE_MAX_ENTRIES:
+            _missing.popitem(last=False)
+        _missing_pages[kind] = (expiry, page)
+
+
+def _forget_missing():
+    with _missing_lock:
+        _missing.clear()
+        _missing_pages.clear()
+
+
+def _not_found(kind, key, error):
+    """404 per una chiave assente dallo snapshot (ricordata nella negative cache)."""
+    page = render_template('error.html', error=error)
+    _remember_missing(kind, key, page)
+    return page, 404
 
 
-@app.get("/api/stats/refresh/<scope>")
-def api_refresh_scope(scope):
-    return _do_refresh(scope.strip().upper())
+@app.get("/api/refresh")
+def api_refresh_default():
+    # refresh di cortesia sulla stagione standard: nessun calcolo nella
+    # richiesta, se mancano sezioni lo scope va al thread stats-build
+    scope = "OP12"
+    try:
+        payload = _stats_sections(scope, SECTIONS)
+        return jsonify({"status": "ok", "scope": scope, "keys": list(payload.keys()),
+                        "pending": len(payload) < len(SECTIONS)})
+    except Exception as e:
+        # NON facciamo più saltare la WSGI: rispondiamo con JSON d'errore
+        return jsonify({"status": "error", "message": str(e)}), 500
 # ---------------------------------------------------------------------------
 
 
@@ -407,33 +642,22 @@ def index():
     global_players = set()
     global_tournaments = 0
 
+    # Riepilogo per stagione dal manifest cache: nessuno shard letto da disco
+    season_summary = data.get('season_summary', {})
     for season in all_active_seasons:
-        sid = season.get('id', '')
-        season_standings = standings_by_season.get(sid, [])
-        # Conta giocatori unici
-        for player in season_standings:
-            if player.get('membership'):
-                global_players.add(player.get('membership'))
-
-    # Conta tornei da tournaments_by_season (è un dizionario, non una lista!)
-    tournaments_by_season = data.get('tournaments_by_season', {})
-    for season in all_active_seasons:
-        sid = season.get('id', '')
-        season_tournaments = tournaments_by_season.get(sid, [])
-        global_tournaments += len(season_tournaments)
+        summary = season_summary.get(season.get('id', ''), {})
+        # Conta giocatori unici e tornei
+        global_players.update(summary.get('players', []))
+        global_tournaments += summary.get('tournaments', 0)
 
     # Top 3 standings (from podio season)
     standings = standings_by_season.get(podio_season_id, [])[:3]
 
-    # Stats highlights (from stats season)
-    from stats_cache import get_cached
-    stats_obj = get_cached(stats_season_id, 900)
-    if not stats_obj:
-        try:
-            stats_map = build_stats([stats_season_id])
-            stats_obj = stats_map.get(stats_season_id, {})
-        except:
-            stats_obj = {}
+    # Stats highlights (from stats season): solo le sezioni della homepage
+    try:
+        stats_obj = _stats_sections(stats_season_id, HOME_STATS_SECTIONS)
+    except:
+        stats_obj = {}
 
     # Next tournament (from stats season)
     next_tournament = None
@@ -517,6 +741,7 @@ def classifiche_page():
 # Support BOTH /classifica and /classifica/<season_id>
 @app.route('/classifica')
 @app.route('/classifica/<season_id>')
+@conditional(lambda: cache)
 def classifica(season_id=None):
     """
     Classifica dettagliata di una singola stagione.
@@ -544,6 +769,8 @@ def classifica(season_id=None):
     if season_id is None and q_season:
         season_id = q_season
 
+    # Versione letta prima dei dati (vedi page_cache.py)
+    version = cache.snapshot_version()
     data, err, meta = cache.get_data()
     if not data:
         return render_template('error.html', error=err or 'Cache non disponibile'), 500
@@ -587,6 +814,16 @@ def classifica(season_id=None):
             return render_template('error.html', error='Nessuna stagione disponibile'), 500
         return redirect(url_for('classifica', season_id=season_id))
 
+    # La pagina in cache non dipende dall'età della cache: l'avviso "dati
+    # vecchi" esce solo nei render non salvati (no-store), "ultimo
+    # aggiornamento" è calcolato nel browser da updated_at
+    is_stale = meta[0] if meta else False
+    cache_age = meta[1] if meta else None
+    if not is_stale:
+        body = pages.get(version, ('classifica', season_id))
+        if body is not None:
+            return body
+
     standings = standings_by_season.get(season_id, []) or []
 
     # Self-healing: if standings empty, try one fetch_data() and retry once
@@ -605,17 +842,24 @@ def classifica(season_id=None):
     # Provide alias 'all_seasons' for template backward-compatibility
     all_seasons = seasons
 
-    return render_template(
+    updated_at = snapshot_last_modified(cache)
+    page = render_template(
         'classifica.html',
         season=season_meta,
         standings=standings,
         tournaments=tournaments_by_season.get(season_id, []),
         seasons=seasons,
         all_seasons=all_seasons,
-        is_stale=(meta[0] if meta else False),
-        cache_age=(meta[1] if meta else None),
+        is_stale=is_stale,
+        cache_age=cache_age,
+        updated_at=updated_at,
         last_tournament=last_tournament_ctx  # optional for template
     )
+    if not is_stale:
+        return pages.put(version, ('classifica', season_id), page)
+    response = make_response(page)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 
 # ============================================================================
@@ -623,6 +867,7 @@ def classifica(season_id=None):
 # ============================================================================
 
 @app.route('/saga/<season_id>')
+@conditional(lambda: cache)
 def saga(season_id):
     """
     Timeline narrativa epica della stagione - stile pergamena fantasy.
@@ -641,7 +886,9 @@ def saga(season_id):
 
     tournaments = data.get('tournaments_by_season', {}).get(season_id, [])
     standings = data.get('standings_by_season', {}).get(season_id, [])
-    results = data.get('results', [])
+
+    # Results dallo snapshot, indicizzati per torneo
+    table = cache.results_table()
 
     # Sort tournaments by date
     def parse_date(d):
@@ -675,9 +922,8 @@ def saga(season_id):
         t_id = t.get('tournament_id', '')
 
         # Get tournament results for more context
-        t_results = [r for r in results if r.get('tournament_id') == t_id]
-        t_results_sorted = sorted(t_results, key=lambda x: safe_int(x.get('rank', 99)))
-        second = t_results_sorted[1].get('name', '') if len(t_results_sorted) > 1 else None
+        t_rows = sorted(table.rows_for_tournament(t_id), key=lambda r: table.rank[r])
+        second = table.name_of(t_rows[1]) if len(t_rows) > 1 else None
 
         # Track streaks
         if winner == prev_winner:
@@ -791,6 +1037,7 @@ def _ordinal(n):
 # ============================================================================
 
 @app.route('/stats/<scope>')
+@conditional(lambda: cache)
 def stats(scope):
     """
     Statistiche avanzate per stagione o all-time TCG.
@@ -805,8 +1052,10 @@ def stats(scope):
     - Singola stagione (es. OP12) → stats solo per quella stagione
     - All-time TCG (es. ALL-OP) → stats aggregate per tutti i tornei One Piece
 
-    Usa cache file-based (stats_cache.py) per performance.
-    Cache TTL: 900s (15 min).
+    Usa stats_cache.py (LRU in memoria + file, una entry per sezione) per performance.
+    Cache TTL: 900s (15 min); scaduto il TTL, se il fingerprint di Results
+    è invariato la entry viene rivalidata senza ricalcolo.
+    La pagina completa resta in page_cache per la versione dello snapshot.
 
     Args:
         scope (str): Season ID (es. OP12) o ALL-<TCG> (es. ALL-OP)
@@ -814,12 +1063,23 @@ def stats(scope):
     Returns:
         Template: stats.html con 4 categorie di statistiche
     """
-    from stats_cache import get_cached, set_cached
+    page = _known_missing('scope', scope)
+    if page is not None:
+        return page, 404
 
+    version = cache.snapshot_version()
     data, err, meta = cache.get_data()
     if not data:
         return render_template('error.html', error=err or 'Cache non disponibile'), 500
 
+    # Scope senza righe nello snapshot: 404 prima di cache stats e artifact
+    if not len(cache.results_table().rows_for_scope(scope)):
+        return _not_found('scope', scope, 'Scope non valido o nessun dato')
+
+    body = pages.get(version, ('stats', scope))
+    if body is not None:
+        return body
+
     seasons = data.get('seasons', [])
 
     # only "real seasons" for the dropdown (exclude ARCHIVED)
@@ -846,23 +1106,25 @@ def stats(scope):
     else:
         available_scopes = others_sorted + all_time
 
-    # File-based cache (15 min TTL)
-    MAX_AGE = 900
-    stats_obj = get_cached(scope, MAX_AGE)
-    if stats_obj is None:
-        stats_map = build_stats([scope])
-        stats_obj = stats_map.get(scope)
-        if not stats_obj:
-            return render_template('error.html', error='Scope non valido o nessun dato'), 404
-        set_cached(scope, stats_obj)
+    # Cache per sezione o artifact dell'import; mai build_stats nella richiesta
+    stats_obj = _stats_sections(scope, SECTIONS, max_age=900)
+    stats_pending = len(stats_obj) < len(SECTIONS)
+    stats_obj = _normalize_builder_result(stats_obj, scope, sections=list(stats_obj))
 
-    return render_template(
+    page = render_template(
         'stats.html',
         scope=scope,
         stats=stats_obj,
+        stats_pending=stats_pending,
         default_season=default_season,
         available_scopes=available_scopes
     )
+    if not stats_pending:
+        return pages.put(version, ('stats', scope), page)
+    # Pagina provvisoria: niente ETag, né cache pagine né cache nei proxy
+    response = make_response(page)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
 # ---------- APIs ----------
 @app.route('/api/refresh')
@@ -870,22 +1132,28 @@ def api_refresh():
     """Refresh della cache classifica (quella originale)."""
     success, error = cache.fetch_data()
     if success:
-        return jsonify({'status': 'ok', 'message': 'Cache refreshed'})
+        return jsonify({'status': 'ok', 'message': 'Cache refreshed',
+                        'refresh': cache.last_refresh})
     else:
         return jsonify({'status': 'error', 'message': error}), 500
 
 @app.route('/api/stats/refresh/<scope>')
+@admin_required
 def api_stats_refresh(scope):
-    """Invalidates and rebuilds stats cache for a scope."""
-    from stats_cache import clear, set_cached
+    """
+    Invalida le stats di uno scope e le ricalcola in background (solo admin).
+
+    La richiesta non esegue build_stats: risponde subito 202 e il calcolo
+    gira nel thread stats-build.
+    """
+    from stats_cache import clear
+    scope = scope.strip().upper()
     try:
-        cleared = clear(scope)
-        stats_map = build_stats([scope])
-        stats_obj = stats_map.get(scope)
-        if not stats_obj:
+        if not len(cache.results_table().rows_for_scope(scope)):
             return jsonify({'status':'error','message':'Scope non valido o nessun dato'}), 404
-        set_cached(scope, stats_obj)
-        return jsonify({'status':'ok','cleared': cleared, 'scope': scope})
+        cleared = clear(scope)
+        _schedule_stats_build([scope])
+        return jsonify({'status':'accepted','cleared': cleared, 'scope': scope}), 202
     except Exception as e:
         return jsonify({'status':'error','message': str(e)}), 500
 
@@ -895,6 +1163,7 @@ def api_stats_refresh(scope):
 # ============================================================================
 
 @app.route('/players')
+@conditional(lambda: cache)
 def players_list():
     """
     Lista tutti i giocatori registrati (senza duplicati).
@@ -915,10 +1184,8 @@ def players_list():
     Returns:
         Template: players.html con lista giocatori ordinata per punti medi DESC
     """
-    from cache import cache
     try:
-        sheet = cache.connect_sheet()
-        ws_stats = sheet.worksheet("Player_Stats")
+        stats_rows = cache.get_sheet_rows("Player_Stats")
 
         # Valida struttura Player_Stats
         expected_headers = [
@@ -926,14 +1193,14 @@ def players_list():
             "Current Streak", "Best Streak", "Top8 Count", "Last Rank",
             "Last Date", "Seasons Count", "Updated At", "Total Points"
         ]
-        validation = validate_sheet_headers(ws_stats, COL_PLAYER_STATS, expected_headers, header_row_index=2)
+        validation = validate_header_rows(stats_rows, COL_PLAYER_STATS, expected_headers, header_row_index=2)
         if not validation['valid']:
             error_msg = "⚠️ ATTENZIONE: La struttura del foglio Player_Stats non è corretta!\n"
             error_msg += "\n".join(validation['errors'])
             error_msg += "\n\nContatta l'amministratore per correggere il problema."
             return render_template('error.html', error=error_msg), 500
 
-        all_stats = ws_stats.get_all_values()[3:]  # Skip header
+        all_stats = stats_rows[3:]  # Skip header
 
         players = []
         for row in all_stats:
@@ -973,6 +1240,7 @@ def players_list():
         return render_template('error.html', error=f'Errore: {str(e)}'), 500
 
 @app.route('/player/<membership>')
+@conditional(lambda: cache)
 def player(membership):
     """
     Profilo dettagliato singolo giocatore.
@@ -987,6 +1255,10 @@ def player(membership):
     - Achievement_Definitions (per info emoji, rarity, descrizione)
     - Player_Achievements (per achievement sbloccati da questo giocatore)
 
+    Il documento viene da player_profiles: calcolato una volta per snapshot
+    e, dopo un import, ricalcolato solo per i giocatori del torneo.
+    L'HTML renderizzato resta in page_cache finché lo snapshot non cambia.
+
     Args:
         membership (str): Membership number giocatore (es. 0000012345)
 
@@ -994,228 +1266,27 @@ def player(membership):
         Template: player.html con profilo completo giocatore
         404: Se giocatore non trovato (no results in Results sheet)
     """
-    from cache import cache
+    page = _known_missing('player', membership)
+    if page is not None:
+        return page, 404
+
+    version = cache.snapshot_version()
     data, err, meta = cache.get_data()
     if not data:
         return render_template('error.html', error='Cache non disponibile'), 500
 
-    # Carica sheet per player data
+    # Documento profilo precalcolato (indici per snapshot, nessuno scan per richiesta)
     try:
-        sheet = cache.connect_sheet()
-        ws_results = sheet.worksheet("Results")
-        all_results = ws_results.get_all_values()[3:]
-
-        # Filtra per membership
-        player_results = [r for r in all_results if r and len(r) >= 10 and r[2] == membership]
-
-        if not player_results:
-            return render_template('error.html', error='Giocatore non trovato'), 404
-
-        # Leggi TCG dal foglio Players
-        ws_players = sheet.worksheet("Players")
-        players_data = ws_players.get_all_values()[3:]
-        player_row = next((p for p in players_data if safe_get(p, COL_PLAYERS, 'membership') == membership), None)
-        player_tcg = safe_get(player_row, COL_PLAYERS, 'tcg', 'OP') if player_row else 'OP'
-
-        # Dati base
-        player_name = player_results[0][9] if player_results[0][9] else membership
-        
-        # Calcoli
-        tournaments_played = len(player_results)
-        tournament_wins = sum(1 for r in player_results if r[3] and int(r[3]) == 1)
-        top8_count = sum(1 for r in player_results if r[3] and int(r[3]) <= 8)
-        
-        points = [float(r[8]) for r in player_results if r[8]]
-        avg_points = sum(points) / len(points) if points else 0
-        best_rank = min([int(r[3]) for r in player_results if r[3]], default=999)
-        
-        # Win Rate (assumendo 4 round medi)
-        total_wins = sum([float(r[4])/3 for r in player_results if r[4]])
-        win_rate = (total_wins / (tournaments_played * 4) * 100) if tournaments_played > 0 else 0
-        
-        # Top8 Rate
-        top8_rate = (top8_count / tournaments_played * 100) if tournaments_played > 0 else 0
-        
-        # Trend (ultimi 2 vs precedenti)
-        if len(points) >= 3:
-            recent = sum(points[-2:]) / 2
-            older = sum(points[:-2]) / len(points[:-2])
-            trend = ((recent - older) / older * 100) if older > 0 else 0
-        else:
-            trend = 0
-        
-        # First seen
-        dates = [r[1].split('_')[1] if '_' in r[1] else '' for r in player_results if r[1]]
-        first_seen = min(dates) if dates else 'N/A'
-        
-        # Storico tornei (ultimi 10)
-        # Carica seasons per ottenere status (ARCHIVED check)
-        seasons = data.get('seasons', [])
-        season_status_map = {s.get('id'): s.get('status', '') for s in seasons}
-
-        history = []
-        for r in player_results[-10:]:
-            season_id = r[1].split('_')[0] if '_' in r[1] else ''
-            season_status = season_status_map.get(season_id, '')
-
-            # Costruisci record W-T-L o W-L in base al TCG
-            # Colonne Results: 10=Match_W, 11=Match_T, 12=Match_L
-            if len(r) >= 13 and r[10] and r[11] and r[12]:
-                match_w = int(r[10])
-                match_t = int(r[11])
-                match_l = int(r[12])
-
-                # Pokemon e Riftbound hanno ties, One Piece no
-                if match_t > 0:
-                    record = f"{match_w}-{match_t}-{match_l}"  # W-T-L
-                else:
-                    record = f"{match_w}-{match_l}"  # W-L
-            else:
-                # Fallback per dati vecchi senza Match_W/T/L
-                # Approssima da Win_Points (W*3 + T*1)
-                wins = int(float(r[4])/3) if r[4] else 0
-                record = f"{wins}-?"
-
-            history.append({
-                'date': r[1].split('_')[1] if '_' in r[1] else '',
-                'season': season_id,
-                'season_status': season_status,
-                'rank': int(r[3]) if r[3] else 999,
-                'points': float(r[8]) if r[8] else 0,
-                'record': record
-            })
-        history.reverse()
-        
-        # Chart data (ultimi 10)
-        chart_labels = [h['date'] for h in history[::-1]]
-        chart_data = [h['points'] for h in history[::-1]]
-
-        # ====================================================================
-        # NUOVI CALCOLI PER GRAFICI STATISTICHE AVANZATE
-        # ====================================================================
-
-        # 1. Match Record (W-T-L totali lifetime)
-        total_match_w = 0
-        total_match_t = 0
-        total_match_l = 0
-        has_match_data = False
-
-        for r in player_results:
-            if len(r) >= 13 and r[10] and r[11] and r[12]:
-                total_match_w += int(r[10])
-                total_match_t += int(r[11])
-                total_match_l += int(r[12])
-                has_match_data = True
-
-        match_record = {
-            'wins': total_match_w,
-            'ties': total_match_t,
-            'losses': total_match_l,
-            'has_data': has_match_data
-        }
-
-        # 2. Ranking Distribution (quante volte in ogni fascia)
-        rank_1st = sum(1 for r in player_results if r[3] and int(r[3]) == 1)
-        rank_2nd = sum(1 for r in player_results if r[3] and int(r[3]) == 2)
-        rank_3rd = sum(1 for r in player_results if r[3] and int(r[3]) == 3)
-        rank_top8 = sum(1 for r in player_results if r[3] and 4 <= int(r[3]) <= 8)
-        rank_other = sum(1 for r in player_results if r[3] and int(r[3]) > 8)
-
-        ranking_dist = {
-            'first': rank_1st,
-            'second': rank_2nd,
-            'third': rank_3rd,
-            'top8': rank_top8,
-            'other': rank_other
-        }
-
-        # 3. Radar Data (5 metriche normalizzate 0-100)
-        # Victory Rate: % tornei vinti
-        victory_rate = (tournament_wins / tournaments_played * 100) if tournaments_played > 0 else 0
-
-        # Avg Performance: punti medi normalizzati (max 25 = 100%)
-        avg_performance = min(100, (avg_points / 25 * 100)) if avg_points > 0 else 0
-
-        # Consistency: stabilità basata su deviazione standard (max dev 10 = 0%)
-        if len(points) > 1:
-            import statistics
-            std_dev = statistics.stdev(points)
-            consistency = max(0, (1 - std_dev / 10) * 100)
-        else:
-            consistency = 100  # Se ha giocato 1 solo torneo, è "perfettamente consistente"
-
-        radar_data = {
-            'win_rate': round(win_rate, 1),
-            'top8_rate': round(top8_rate, 1),
-            'victory_rate': round(victory_rate, 1),
-            'avg_performance': round(avg_performance, 1),
-            'consistency': round(consistency, 1)
-        }
-
-        # Achievement data
-        achievements_unlocked = []
-        achievement_points = 0
-        try:
-            ws_achievements = sheet.worksheet("Achievement_Definitions")
-            achievement_defs = {}
-            for row in ws_achievements.get_all_values()[4:]:
-                ach_id = safe_get(row, COL_ACHIEVEMENT_DEF, 'achievement_id')
-                if ach_id:
-                    achievement_defs[ach_id] = {
-                        'name': safe_get(row, COL_ACHIEVEMENT_DEF, 'name'),
-                        'description': safe_get(row, COL_ACHIEVEMENT_DEF, 'description'),
-                        'category': safe_get(row, COL_ACHIEVEMENT_DEF, 'category'),
-                        'rarity': safe_get(row, COL_ACHIEVEMENT_DEF, 'rarity'),
-                        'emoji': safe_get(row, COL_ACHIEVEMENT_DEF, 'emoji'),
-                        'points': safe_int(row, COL_ACHIEVEMENT_DEF, 'points', 0)
-                    }
-
-            ws_player_ach = sheet.worksheet("Player_Achievements")
-            for row in ws_player_ach.get_all_values()[4:]:
-                if safe_get(row, COL_PLAYER_ACH, 'membership') == membership:
-                    ach_id = safe_get(row, COL_PLAYER_ACH, 'achievement_id')
-                    if ach_id in achievement_defs:
-                        ach_info = achievement_defs[ach_id]
-                        achievements_unlocked.append({
-                            'id': ach_id,
-                            'name': ach_info['name'],
-                            'description': ach_info['description'],
-                            'category': ach_info['category'],
-                            'rarity': ach_info['rarity'],
-                            'emoji': ach_info['emoji'],
-                            'points': ach_info['points'],
-                            'unlocked_date': safe_get(row, COL_PLAYER_ACH, 'unlocked_date', '')
-                        })
-                        achievement_points += ach_info['points']
-        except Exception as e:
-            print(f"Achievement load error: {e}")
-            # Se achievement non esistono ancora, continua senza
-
-        player_data = {
-            'membership': membership,
-            'name': player_name,
-            'tcg': player_tcg,
-            'first_seen': first_seen,
-            'tournaments_played': tournaments_played,
-            'tournament_wins': tournament_wins,
-            'top8_count': top8_count,
-            'avg_points': round(avg_points, 1),
-            'best_rank': best_rank,
-            'win_rate': round(win_rate, 1),
-            'top8_rate': round(top8_rate, 1),
-            'trend': round(trend, 1),
-            'history': history,
-            'chart_labels': chart_labels,
-            'chart_data': chart_data,
-            'achievements': achievements_unlocked,
-            'achievement_points': achievement_points,
-            # Nuovi dati per grafici statistiche avanzate
-            'match_record': match_record,
-            'ranking_dist': ranking_dist,
-            'radar_data': radar_data
-        }
-        
-        return render_template('player.html', player=player_data)
+        if not len(cache.results_table().rows_for_member(membership)):
+            return _not_found('player', membership, 'Giocatore non trovato')
+        body = pages.get(version, ('player', membership))
+        if body is not None:
+            return body
+        player_data = profiles.get(cache, membership)
+        if player_data is None:
+            return _not_found('player', membership, 'Giocatore non trovato')
+
+        return pages.put(version, ('player', membership), render_template('player.html', player=player_data))
         
     except Exception as e:
         return render_template('error.html', error=f'Errore caricamento dati: {str(e)}'), 500
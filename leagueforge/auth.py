@@ -77,7 +77,7 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         if not is_admin_logged_in():
             flash('Accesso negato. Effettua il login.', 'warning')
-            return redirect(url_for('admin_login'))
+            return redirect(url_for('admin.login'))
         return f(*args, **kwargs)
     return decorated_function
 
@@ -47,7 +47,6 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 try:
     import gspread
-    from google.oauth2.service_account import Credentials
 except ImportError:
     print("❌ Errore: installa dipendenze con 'pip install gspread google-auth'")
     sys.exit(1)
@@ -104,11 +103,9 @@ def connect_to_sheets():
         print("   Imposta SHEET_ID in config.py o passa --sheet-id")
         sys.exit(1)
 
-    scopes = ['https://www.googleapis.com/auth/spreadsheets.readonly']
-    creds = Credentials.from_service_account_file(str(CREDENTIALS_FILE), scopes=scopes)
-    client = gspread.authorize(creds)
-
-    return client.open_by_key(SHEET_ID)
+    # Import qui: backup_sheets funziona anche senza config.py (--sheet-id)
+    from sheet_connection import get_spreadsheet, READONLY_SCOPES
+    return get_spreadsheet(SHEET_ID, scopes=READONLY_SCOPES, credentials_file=CREDENTIALS_FILE)
 
 
 def backup_worksheet(worksheet, output_dir: Path) -> dict:
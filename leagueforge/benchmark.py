@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================================
+LeagueForge - Benchmark suite
+=================================================================================
+
+Misura i percorsi caldi di import e webapp su leghe sintetiche
+deterministiche (synthetic_league.py) a tre scale: 1k, 50k e 500k righe
+Results, OP + PKM + RFB. Nessuna chiamata a Google Sheets.
+
+Benchmark:
+- load_results: lettura Results → ResultsTable → record/eventi (stats_builder)
+- compute_for_scope[stagione|ALL-OP]: payload stats completo di uno scope
+- seasonal_standings: aggregazione di update_seasonal_standings
+- batch_player_stats: batch_calculate_player_stats sui giocatori di un torneo
+- achievement_checks: check_simple + check_special sugli stessi giocatori
+- parse_tdf / parse_onepiece / parse_riftbound: parser dei file di import
+
+Ogni benchmark ha un setup non cronometrato; vale il minimo su REPEATS
+ripetizioni. I risultati si confrontano con benchmark_baseline.json:
+oltre TOLERANCE volte la baseline è una regressione. Le baseline sono
+tempi di una macchina precisa: rigenerarle con --save sulla macchina dove
+si confronta.
+
+UTILIZZO:
+    python benchmark.py                         # 1k + 50k, confronto con baseline
+    python benchmark.py --scale 500k
+    python benchmark.py --only compute_for_scope
+    python benchmark.py --save                  # aggiorna le baseline delle scale eseguite
+    python benchmark.py --check                 # exit 1 se ci sono regressioni
+=================================================================================
+"""
+
+import io
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import contextlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from synthetic_league import (
+    SCALES, SyntheticSheet, generate_league,
+    write_tdf, write_onepiece_csvs, write_riftbound_csvs,
+)
+
+BASELINE_FILE = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+# Ripetizioni per scala (si tiene il tempo minimo)
+REPEATS = {"1k": 5, "50k": 3, "500k": 1}
+
+# Rapporto oltre il quale un tempo è una regressione
+TOLERANCE = 1.3
+
+DEFAULT_SCALES = ("1k", "50k")
+
+
+# =============================================================================
+# CONTESTO (lega sintetica + file di import)
+# =============================================================================
+
+def build_context(scale: str, seed: int = 0, workdir: Optional[str] = None) -> Dict:
+    """
+    Lega sintetica della scala, già letta in ResultsTable, più i file di import.
+
+    Returns:
+        dict: sheet, table, season (stagione con più righe), tournament
+        (ultimo torneo OP), memberships, file di import
+    """
+    from results_table import load_results_table
+
+    sheet = SyntheticSheet(generate_league(SCALES[scale], seed=seed), sheet_id=f"bench-{scale}-{seed}")
+    table = load_results_table(sheet)
+    seasons = [s for s in table.by_season if s.startswith("OP")]
+    season = max(seasons, key=lambda s: (len(table.rows_for_season(s)), s))
+    op_tournaments = [tid for tid in table.tournament_ids if tid.startswith("OP")]
+    tournament = op_tournaments[-1]
+
+    workdir = workdir or tempfile.mkdtemp(prefix="lf_bench_")
+    round_files, classifica = write_onepiece_csvs(workdir, seed=seed)
+    return {
+        "scale": scale,
+        "sheet": sheet,
+        "table": table,
+        "season": season,
+        "tournament": tournament,
+        "memberships": [table.membership_of(i) for i in table.rows_for_tournament(tournament)],
+        "tdf": write_tdf(str(Path(workdir) / "synthetic.tdf"), seed=seed),
+        "op_rounds": round_files,
+        "op_final": classifica,
+        "rfb_rounds": write_riftbound_csvs(workdir, seed=seed),
+    }
+
+
+# =============================================================================
+# BENCHMARK (setup non cronometrato → funzione cronometrata)
+# =============================================================================
+
+def _load_results(ctx):
+    import stats_builder
+    from results_table import invalidate_results_table, parse_tournament_id
+    invalidate_results_table()
+    parse_tournament_id.cache_clear()   # parsing dei tid a freddo, come un processo nuovo
+    return lambda: stats_builder._load_results(ctx["sheet"])
+
+
+def _compute_for_scope(scope_key):
+    def setup(ctx):
+        from stats_builder import StatsState, _compute_for_scope
+        scope = ctx["season"] if scope_key == "season" else scope_key
+        # Aggregati parziali nel tempo misurato: sono la parte costosa del calcolo
+        return lambda: _compute_for_scope(
+            scope, StatsState(ctx["table"], [scope]).partials[scope], ctx["table"])
+    return setup
+
+
+def _seasonal_standings(ctx):
+    from import_base import compute_seasonal_standings
+    table, season = ctx["table"], ctx["season"]
+    n_tournaments = len({table.tid_of(i) for i in table.rows_for_season(season)})
+    max_to_count = n_tournaments - 2 if n_tournaments >= 8 else n_tournaments
+    return lambda: compute_seasonal_standings(table, season, max_to_count)
+
+
+def _batch_player_stats(ctx):
+    from achievements import batch_calculate_player_stats
+    return lambda: batch_calculate_player_stats(ctx["sheet"], ctx["memberships"])
+
+
+def _achievement_checks(ctx):
+    import achievements
+    achievements._achievement_cache = None
+    definitions = achievements.load_achievement_definitions(ctx["sheet"])
+    all_stats = achievements.batch_calculate_player_stats(ctx["sheet"], ctx["memberships"])
+
+    def run():
+        for membership, stats in all_stats.items():
+            achievements.check_simple_achievements(stats, definitions, set())
+            achievements.check_special_achievements(stats, definitions, set(), {})
+    return run
+
+
+def _parse_tdf(ctx):
+    from import_pokemon import parse_tdf
+    return lambda: parse_tdf(ctx["tdf"], "PKM-FS01")
+
+
+def _parse_onepiece(ctx):
+    from import_onepiece import parse_round_files, parse_classifica_finale
+
+    def run():
+        parse_round_files(ctx["op_rounds"])
+        parse_classifica_finale(ctx["op_final"])
+    return run
+
+
+def _parse_riftbound(ctx):
+    from import_riftbound import parse_csv_rounds
+    return lambda: parse_csv_rounds(ctx["rfb_rounds"])
+
+
+BENCHMARKS: Dict[str, Callable] = {
+    "load_results": _load_results,
+    "compute_for_scope[season]": _compute_for_scope("season"),
+    "compute_for_scope[ALL-OP]": _compute_for_scope("ALL-OP"),
+    "seasonal_standings": _seasonal_standings,
+    "batch_player_stats": _batch_player_stats,
+    "achievement_checks": _achievement_checks,
+    "parse_tdf": _parse_tdf,
+    "parse_onepiece": _parse_onepiece,
+    "parse_riftbound": _parse_riftbound,
+}
+
+
+def run_benchmarks(ctx: Dict, names: Optional[List[str]] = None, repeats: Optional[int] = None) -> Dict[str, float]:
+    """
+    Esegue i benchmark sul contesto di una scala.
+
+    Args:
+        ctx: build_context(scale)
+        names: Sottoinsieme di BENCHMARKS (anche per prefisso, es. 'compute_for_scope')
+        repeats: Ripetizioni (default: REPEATS[scala])
+
+    Returns:
+        dict: {benchmark: secondi (minimo)}
+    """
+    repeats = repeats or REPEATS.get(ctx["scale"], 3)
+    selected = [n for n in BENCHMARKS if not names or any(n == x or n.startswith(x) for x in names)]
+    timings = {}
+    for name in selected:
+        best = None
+        for _ in range(repeats):
+            # I parser stampano a console: output scartato
+            with contextlib.redirect_stdout(io.StringIO()):
+                run = BENCHMARKS[name](ctx)
+                gc.collect()
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = best
+    return timings
+
+
+# =============================================================================
+# BASELINE
+# =============================================================================
+
+def load_baseline(path: Path = BASELINE_FILE) -> Dict:
+    try:
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"scales": {}}
+
+
+def save_baseline(results: Dict[str, Dict[str, float]], path: Path = BASELINE_FILE) -> None:
+    """Aggiorna le baseline delle scale misurate (le altre restano)."""
+    baseline = load_baseline(path)
+    baseline["meta"] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(terse=True),
+        "saved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    scales = baseline.setdefault("scales", {})
+    for scale, timings in results.items():
+        scales[scale] = {name: round(seconds, 6) for name, seconds in timings.items()}
+    Path(path).write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def compare(timings: Dict[str, float], reference: Dict[str, float], tolerance: float = TOLERANCE) -> List[Dict]:
+    """
+    Confronto con la baseline di una scala.
+
+    Returns:
+        list: [{name, baseline, current, ratio, regression}] (baseline None
+        se il benchmark non ha ancora un riferimento)
+    """
+    rows = []
+    for name, current in timings.items():
+        base = reference.get(name)
+        ratio = current / base if base else None
+        rows.append({
+            "name": name,
+            "baseline": base,
+            "current": current,
+            "ratio": ratio,
+            "regression": ratio is not None and ratio > tolerance,
+        })
+    return rows
+
+
+def _print_report(scale, rows):
+    print(f"\n📏 Scala {scale}")
+    print(f"   {'benchmark':<28} {'baseline':>10} {'attuale':>10} {'rapporto':>9}")
+    for row in rows:
+        base = f"{row['baseline'] * 1000:.1f}ms" if row["baseline"] else "-"
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] else "-"
+        flag = "  ❌" if row["regression"] else ""
+        print(f"   {row['name']:<28} {base:>10} {row['current'] * 1000:>8.1f}ms {ratio:>9}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark LeagueForge su leghe sintetiche')
+    parser.add_argument('--scale', nargs='+', choices=list(SCALES), default=list(DEFAULT_SCALES),
+                        help='Scale da misurare (default: 1k 50k)')
+    parser.add_argument('--only', nargs='+', help='Solo questi benchmark (nome o prefisso)')
+    parser.add_argument('--repeats', type=int, default=None, help='Ripetizioni per benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='Seed della lega sintetica')
+    parser.add_argument('--save', action='store_true', help='Salva i tempi come nuove baseline')
+    parser.add_argument('--check', action='store_true', help='Exit 1 se ci sono regressioni')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Rapporto massimo ammesso')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("⏱️  LEAGUEFORGE BENCHMARK")
+    print("=" * 60)
+
+    baseline = load_baseline()
+    results = {}
+    regressions = 0
+    for scale in args.scale:
+        start = time.perf_counter()
+        ctx = build_context(scale, seed=args.seed)
+        print(f"🏗️  Lega {scale}: {len(ctx['table'])} righe Results "
+              f"({time.perf_counter() - start:.1f}s generazione)")
+        results[scale] = run_benchmarks(ctx, args.only, args.repeats)
+        rows = compare(results[scale], baseline.get("scales", {}).get(scale, {}), args.tolerance)
+        regressions += sum(row["regression"] for row in rows)
+        _print_report(scale, rows)
+
+    if args.save:
+        save_baseline(results)
+        print(f"\n💾 Baseline salvate in {BASELINE_FILE.name}")
+    if regressions:
+        print(f"\n⚠️  {regressions} regressioni oltre {args.tolerance:.2f}x")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("\n✅ Nessuna regressione")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,68 +6,533 @@ Legge Google Sheet ogni N minuti e mantiene cache locale
 """
 
 import gspread
-from google.oauth2.service_account import Credentials
+from gspread.utils import fill_gaps
+import hashlib
 import json
 import os
-from datetime import datetime, timedelta
-from config import SHEET_ID, CREDENTIALS_FILE, CACHE_REFRESH_MINUTES, CACHE_FILE
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+from config import CACHE_REFRESH_MINUTES, CACHE_FILE
+try:
+    from config import CACHE_BACKGROUND_REFRESH
+except ImportError:
+    # config.py creati prima di questa opzione: stale-while-revalidate attivo
+    CACHE_BACKGROUND_REFRESH = True
 from sheet_utils import (
     COL_CONFIG, COL_STANDINGS, COL_TOURNAMENTS,
     safe_get, safe_int, safe_float
 )
+import sheet_connection
+from results_table import ResultsTable
 
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
+# Fogli letti dalle route web (player, players, achievements, saga).
+# Vengono salvati nello snapshot come righe grezze (header inclusi), così
+# le route possono applicare lo stesso skip-header di prima senza API calls.
+SNAPSHOT_SHEETS = [
+    "Results",
+    "Players",
+    "Player_Stats",
+    "Achievement_Definitions",
+    "Player_Achievements",
 ]
 
+# Fogli letti ad ogni refresh: Config/Standings/Tournaments + snapshot route.
+# Tutti in UNA richiesta values:batchGet (vedi SheetCache._batch_get).
+REFRESH_SHEETS = [
+    "Config",
+    "Seasonal_Standings_PROV",
+    "Seasonal_Standings_FINAL",
+    "Tournaments",
+] + SNAPSHOT_SHEETS
+
+# Pausa minima tra due refresh in background falliti (es. rate limit),
+# per non rilanciare un fetch ad ogni richiesta mentre Google rifiuta.
+REFRESH_RETRY_SECONDS = 60
+
+# Fogli senza i quali il refresh non ha senso (gli altri possono mancare)
+REQUIRED_SHEETS = {"Config", "Tournaments"}
+
+
+# Formato su disco (schema_version 3): CACHE_FILE è un manifest compatto
+# (stagioni, riepiloghi, nomi degli shard). Standings + tornei di ogni stagione
+# e le righe di ogni foglio snapshot stanno in shard separati nella cartella
+# <CACHE_FILE>_shards/, letti solo quando una route li chiede.
+CACHE_SCHEMA_VERSION = 3
+
+# Shard non più referenziati dal manifest vengono cancellati dopo questo tempo,
+# contato da quando sono usciti dal manifest (un altro worker può avere ancora
+# in memoria il manifest precedente).
+SHARD_GC_SECONDS = 24 * 3600
+
+
+def _a1_sheet(name):
+    """Range A1 che copre l'intero foglio (nome quotato per spazi/simboli)."""
+    return "'" + name.replace("'", "''") + "'"
+
+
+def _shard_dir():
+    return os.path.splitext(CACHE_FILE)[0] + '_shards'
+
+
+def _manifest_shards(path):
+    """Nomi degli shard referenziati dal manifest su disco (vuoto se assente/illeggibile)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            payload = json.load(f).get('data') or {}
+        return (set(payload.get('season_shards', {}).values())
+                | set(payload.get('sheet_shards', {}).values()))
+    except (OSError, ValueError, AttributeError):
+        return set()
+
+
+def _dump_compact(obj):
+    """JSON senza spazi né indentazione (bytes UTF-8)."""
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _atomic_write(path, payload):
+    """
+    Scrive bytes su path in modo atomico.
+
+    Scrive su un file temporaneo nella stessa cartella e lo sostituisce con
+    os.replace(): chi legge vede il file vecchio o quello nuovo completo,
+    mai uno troncato (crash a metà scrittura, due processi insieme).
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.cache_', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class _ShardStore:
+    """
+    Gruppo di shard JSON (uno per chiave) caricati su richiesta.
+
+    `files` mappa chiave -> nome file nella cartella shard (vuoto per i dati
+    appena letti da Google e non ancora salvati); `loaded` contiene gli shard
+    già in memoria. Il nome file include un hash del contenuto, quindi gli
+    shard invariati (stagioni chiuse) non vengono mai riscritti.
+    """
+
+    def __init__(self, prefix, loaded=None, files=None, on_error=None):
+        self.prefix = prefix
+        self.loaded = dict(loaded or {})
+        self.files = dict(files or {})
+        self.on_error = on_error
+
+    def load(self, key):
+        if key in self.loaded:
+            return self.loaded[key]
+        filename = self.files.get(key)
+        if filename is None:
+            raise KeyError(key)
+        try:
+            with open(os.path.join(_shard_dir(), filename), 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Shard cache {filename} illeggibile: {e}")
+            if self.on_error:
+                self.on_error()
+            raise KeyError(key)
+        self.loaded[key] = value
+        return value
+
+    def digest(self, key):
+        """Hash del contenuto dello shard (dal nome file, senza leggerlo)."""
+        filename = self.files.get(key)
+        if filename:
+            return filename.rsplit('.', 2)[-2]
+        return hashlib.sha1(_dump_compact(self.load(key))).hexdigest()[:12]
+
+    def save(self, directory):
+        """Scrive gli shard non ancora su disco; ritorna {chiave: nome file}."""
+        for key, value in self.loaded.items():
+            if key in self.files:
+                continue
+            payload = _dump_compact(value)
+            digest = hashlib.sha1(payload).hexdigest()[:12]
+            safe_key = re.sub(r'[^A-Za-z0-9_-]', '_', str(key))
+            filename = f"{self.prefix}_{safe_key}.{digest}.json"
+            path = os.path.join(directory, filename)
+            if not os.path.exists(path):
+                _atomic_write(path, payload)
+            self.files[key] = filename
+        return dict(self.files)
+
+
+class _ShardView(Mapping):
+    """
+    Vista dict-like su uno _ShardStore (es. standings per stagione).
+
+    Le route usano .get(season_id, []) come con un dict: solo lo shard
+    richiesto viene letto da disco.
+    """
+
+    def __init__(self, store, keys, field=None):
+        self._store = store
+        self._keys = list(keys)
+        self._key_set = set(self._keys)
+        self._field = field
+
+    def __getitem__(self, key):
+        if key not in self._key_set:
+            raise KeyError(key)
+        value = self._store.load(key)
+        return value[self._field] if self._field else value
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._key_set
+
+    def digest(self, key):
+        """Hash dello shard di `key` (vedi _ShardStore.digest)."""
+        return self._store.digest(key)
+
+
+def _season_summary(standings_by_season, tournaments_by_season):
+    """Conteggi per stagione salvati nel manifest (landing senza shard)."""
+    summary = {}
+    for sid in dict.fromkeys(list(standings_by_season) + list(tournaments_by_season)):
+        memberships = [p.get('membership') for p in standings_by_season.get(sid, []) if p.get('membership')]
+        summary[sid] = {
+            'players': memberships,
+            'tournaments': len(tournaments_by_season.get(sid, []))
+        }
+    return summary
+
 class SheetCache:
-    def __init__(self):
+    def __init__(self, background_refresh=None):
         self.cache_data = None
         self.last_update = None
+        # Statistiche ultimo refresh: {'api_calls', 'duration_ms', 'at'}
+        self.last_refresh = None
+        self.last_error = None
+        # Stale-while-revalidate: serve lo snapshot corrente e aggiorna in un thread
+        self.background_refresh = CACHE_BACKGROUND_REFRESH if background_refresh is None else background_refresh
+        self._refresh_thread = None
+        self._last_failed_attempt = None
+        # Single-flight: un solo fetch alla volta, gli altri ne riusano l'esito
+        self._fetch_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._fetch_generation = 0
+        self._last_fetch_result = (False, None)
+        # Shard su disco dello snapshot corrente (vedi _ShardStore)
+        self._season_store = None
+        self._sheet_store = None
+        self._force_refresh = False
+        # (fingerprint Results, ResultsTable) costruita alla prima richiesta
+        self._results_table = None
+        self._results_table_lock = threading.Lock()
+        # Versione del contenuto (hash, vedi snapshot_version) e istante UTC
+        # in cui lo snapshot corrente è entrato in memoria
+        self._snapshot_version = None
+        self.snapshot_modified = None
         self.load_from_file()
-    
+
+    def _set_snapshot(self, base, season_store, sheet_store, standings_keys, tournaments_keys):
+        """Assembla cache_data: manifest + viste lazy sugli shard."""
+        standings = _ShardView(season_store, standings_keys, 'standings')
+        tournaments = _ShardView(season_store, tournaments_keys, 'tournaments')
+        self._season_store = season_store
+        self._sheet_store = sheet_store
+        self._snapshot_version = None
+        self.snapshot_modified = datetime.now(timezone.utc)
+        self.cache_data = {
+            'schema_version': CACHE_SCHEMA_VERSION,
+            'data_version': base.get('data_version'),
+            'seasons': base.get('seasons', []),
+            'season_summary': base.get('season_summary', {}),
+            'standings_by_season': standings,
+            'tournaments_by_season': tournaments,
+            'sheets': _ShardView(sheet_store, sheet_store.files or sheet_store.loaded),
+            # legacy aliases (back-compat, solo in memoria)
+            'standings': standings,
+            'tournaments': tournaments
+        }
+
+    def _set_snapshot_from_data(self, data_version, seasons, standings_by_season, tournaments_by_season, sheets):
+        """Snapshot da dati completi in memoria (fetch o cache file v2)."""
+        season_data = {}
+        for sid, rows in standings_by_season.items():
+            season_data.setdefault(sid, {})['standings'] = rows
+        for sid, rows in tournaments_by_season.items():
+            season_data.setdefault(sid, {})['tournaments'] = rows
+        base = {
+            'data_version': data_version,
+            'seasons': seasons,
+            'season_summary': _season_summary(standings_by_season, tournaments_by_season)
+        }
+        self._set_snapshot(
+            base,
+            _ShardStore('season', loaded=season_data, on_error=self._on_shard_error),
+            _ShardStore('sheet', loaded=sheets, on_error=self._on_shard_error),
+            list(standings_by_season), list(tournaments_by_season)
+        )
+
+    def _on_shard_error(self):
+        # Shard mancante/corrotto: al prossimo get_data() rilegge tutto da Google
+        self._force_refresh = True
+
     def load_from_file(self):
-        """Carica cache da file se esiste"""
+        """
+        Carica il manifest (schema 3) se esiste; gli shard restano su disco.
+
+        Un cache file schema 2 (tutto in un JSON) viene ancora letto e sarà
+        riscritto nel formato a shard al prossimo salvataggio.
+        """
         if os.path.exists(CACHE_FILE):
             try:
                 with open(CACHE_FILE, 'r', encoding='utf-8') as f:
                     data = json.load(f)
-                    self.cache_data = data.get('data')
-                    self.last_update = datetime.fromisoformat(data.get('timestamp'))
-            except:
-                pass
+                payload = data.get('data') or {}
+                timestamp = datetime.fromisoformat(data.get('timestamp'))
+                if payload.get('schema_version') == CACHE_SCHEMA_VERSION:
+                    self._set_snapshot(
+                        payload,
+                        _ShardStore('season', files=payload['season_shards'], on_error=self._on_shard_error),
+                        _ShardStore('sheet', files=payload['sheet_shards'], on_error=self._on_shard_error),
+                        payload['standings_keys'], payload['tournaments_keys']
+                    )
+                elif 'sheets' in payload:
+                    self._set_snapshot_from_data(
+                        payload.get('data_version'), payload.get('seasons', []),
+                        payload.get('standings_by_season', {}),
+                        payload.get('tournaments_by_season', {}),
+                        payload['sheets']
+                    )
+                else:
+                    # Cache senza snapshot dei fogli: needs_refresh() la rilegge
+                    self.cache_data = payload
+                self.last_update = timestamp
+                self.snapshot_modified = timestamp.astimezone(timezone.utc)
+            except (OSError, ValueError, TypeError, AttributeError, KeyError) as e:
+                # File illeggibile: si riparte da un fetch, ma senza nasconderlo
+                self.cache_data = None
+                self.last_update = None
+                print(f"⚠️ Cache file {CACHE_FILE} ignorato (illeggibile): {e}")
     
     def save_to_file(self):
-        """Salva cache su file"""
-        data = {
+        """
+        Salva cache su disco: shard nuovi, poi manifest (entrambi atomici).
+
+        Gli shard già presenti su disco (stesso hash) non vengono riscritti;
+        il manifest viene sostituito per ultimo, così punta sempre a shard
+        completi. Gli shard non più referenziati vengono rimossi dopo
+        SHARD_GC_SECONDS da quando escono dal manifest: quelli del manifest
+        precedente non più usati vengono "toccati" (mtime = ora), altrimenti
+        uno shard creato giorni fa sparirebbe subito sotto ai worker che
+        leggono ancora il manifest precedente.
+        """
+        directory = _shard_dir()
+        os.makedirs(directory, exist_ok=True)
+        season_files = self._season_store.save(directory)
+        sheet_files = self._sheet_store.save(directory)
+
+        data = self.cache_data
+        manifest = {
             'timestamp': self.last_update.isoformat(),
-            'data': self.cache_data
+            'data': {
+                'schema_version': CACHE_SCHEMA_VERSION,
+                'data_version': data.get('data_version'),
+                'seasons': data.get('seasons', []),
+                'season_summary': data.get('season_summary', {}),
+                'standings_keys': list(data['standings_by_season']),
+                'tournaments_keys': list(data['tournaments_by_season']),
+                'season_shards': season_files,
+                'sheet_shards': sheet_files
+            }
         }
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        referenced = set(season_files.values()) | set(sheet_files.values())
+        previous = _manifest_shards(CACHE_FILE)
+        _atomic_write(CACHE_FILE, _dump_compact(manifest))
+        for name in previous - referenced:
+            try:
+                os.utime(os.path.join(directory, name))
+            except OSError:
+                pass
+        self._remove_old_shards(directory, referenced)
+
+    def _remove_old_shards(self, directory, referenced):
+        # mtime = uscita dal manifest (vedi save_to_file) o creazione
+        cutoff = time.time() - SHARD_GC_SECONDS
+        for name in os.listdir(directory):
+            if name in referenced:
+                continue
+            path = os.path.join(directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
     
     def needs_refresh(self):
         """Controlla se cache deve essere refreshata"""
-        if not self.cache_data or not self.last_update:
+        if not self.cache_data or not self.last_update or self._force_refresh:
+            return True
+        # Cache scritta da una versione senza snapshot dei fogli: va riletta
+        if 'sheets' not in self.cache_data:
             return True
         age = datetime.now() - self.last_update
         return age > timedelta(minutes=CACHE_REFRESH_MINUTES)
     
     def connect_sheet(self):
-        """Connette a Google Sheet"""
-        creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-        client = gspread.authorize(creds)
-        return client.open_by_key(SHEET_ID)
+        """Connette a Google Sheet (handle condiviso, vedi sheet_connection)"""
+        return sheet_connection.get_spreadsheet()
     
-    def fetch_data(self):
-        """Legge dati da Google Sheet"""
+    def _batch_get(self, sheet, names):
+        """
+        Legge più fogli interi con UNA chiamata values:batchGet.
+
+        batchGet fallisce in blocco se anche un solo range non esiste: in quel
+        caso legge i titoli dei fogli (1 chiamata metadata) e riprova solo con
+        quelli esistenti. I fogli mancanti ritornano [].
+
+        Returns:
+            Tuple[Dict[str, list], int]: ({nome: righe}, chiamate API usate)
+        """
+        calls = 1
+        try:
+            response = sheet.values_batch_get([_a1_sheet(n) for n in names])
+            found = list(names)
+        except gspread.exceptions.APIError:
+            existing = {ws.title for ws in sheet.worksheets()}
+            calls += 1
+            found = [n for n in names if n in existing]
+            response = {'valueRanges': []}
+            if found:
+                response = sheet.values_batch_get([_a1_sheet(n) for n in found])
+                calls += 1
+
+        missing = REQUIRED_SHEETS - set(found)
+        if missing:
+            raise gspread.WorksheetNotFound(', '.join(sorted(missing)))
+
+        values = {n: [] for n in names}
+        for name, value_range in zip(found, response.get('valueRanges', [])):
+            # Stessa forma di get_all_values(): righe rettangolari
+            values[name] = fill_gaps(value_range.get('values', []))
+        return values, calls
+
+    def _read_data_version(self, sheet):
+        """
+        Versione dei dati = modifiedTime del file su Drive.
+
+        Ritorna None se non leggibile (es. scope Drive mancante): in quel caso
+        il refresh rilegge sempre tutto, come prima.
+        """
+        try:
+            return sheet_connection.get_modified_time(sheet)
+        except Exception as e:
+            print(f"⚠️ modifiedTime non disponibile, refresh completo: {e}")
+            return None
+
+    @property
+    def data_version(self):
+        """Versione dello snapshot in memoria (None se sconosciuta)."""
+        return self.cache_data.get('data_version') if self.cache_data else None
+
+    def snapshot_version(self):
+        """
+        Versione del contenuto dello snapshot in memoria.
+
+        Hash di data_version, stagioni e digest di tutti gli shard (stagioni
+        e fogli): cambia solo se cambiano i dati, uguale in tutti i worker
+        con lo stesso snapshot. Calcolata una volta per snapshot, senza
+        chiamate a Google. Usata per ETag (http_cache.py).
+
+        Returns:
+            str | None: None se non c'è uno snapshot completo
+        """
+        if self._snapshot_version is not None:
+            return self._snapshot_version
+        data = self.cache_data
+        if not data or self._sheet_store is None or self._season_store is None:
+            return None
+        h = hashlib.sha1(_dump_compact([data.get('data_version'), data.get('seasons', [])]))
+        for store, keys in ((self._season_store,
+                             dict.fromkeys(list(data['standings_by_season']) + list(data['tournaments_by_season']))),
+                            (self._sheet_store, data['sheets'])):
+            for key in keys:
+                try:
+                    digest = store.digest(key)
+                except KeyError:
+                    digest = '-'
+                h.update(f"{key}={digest};".encode('utf-8'))
+        self._snapshot_version = h.hexdigest()[:16]
+        return self._snapshot_version
+
+    def fetch_data(self, reuse_inflight=True):
+        """
+        Legge dati da Google Sheet (1 batchGet per tutti i fogli).
+
+        Prima controlla il modifiedTime del file: se coincide con quello dello
+        snapshot, rinnova solo il timestamp senza rileggere i fogli.
+
+        Single-flight: se un altro thread sta già facendo il fetch, aspetta
+        che finisca e ne ritorna l'esito invece di rifare le stesse letture.
+        Con reuse_inflight=False, dopo l'attesa fa comunque un fetch nuovo
+        (serve quando i dati sono cambiati dopo l'inizio di quello in corso).
+
+        Returns:
+            tuple: (success, error)
+        """
+        generation = self._fetch_generation
+        with self._fetch_lock:
+            if reuse_inflight and self._fetch_generation != generation:
+                # Fetch completato da un altro thread mentre aspettavamo
+                return self._last_fetch_result
+            result = self._fetch_from_sheet()
+            self._last_fetch_result = result
+            self._fetch_generation += 1
+            return result
+
+    def _fetch_from_sheet(self):
+        """Fetch vero e proprio (chiamare solo con _fetch_lock acquisito)."""
         try:
+            started = time.monotonic()
+            opens_before = sheet_connection.open_count()
             sheet = self.connect_sheet()
-            
+            # open_by_key (metadata) solo alla prima connessione del processo
+            api_calls = sheet_connection.open_count() - opens_before
+
+            # Change detection: se il file non è cambiato basta 1 chiamata leggera
+            data_version = self._read_data_version(sheet)
+            if data_version is not None:
+                api_calls += 1
+                if (self.has_snapshot() and not self._force_refresh
+                        and self.cache_data.get('data_version') == data_version):
+                    self.last_update = datetime.now()
+                    self.last_refresh = {
+                        'api_calls': api_calls,
+                        'duration_ms': int((time.monotonic() - started) * 1000),
+                        'at': self.last_update.isoformat(),
+                        'unchanged': True
+                    }
+                    self.save_to_file()
+                    return True, None
+
+            values, batch_calls = self._batch_get(sheet, REFRESH_SHEETS)
+            api_calls += batch_calls
+
             # Leggi Config per lista stagioni
-            ws_config = sheet.worksheet("Config")
-            config_data = ws_config.get_all_values()[4:]  # Skip header
+            config_data = values["Config"][4:]  # Skip header
             seasons = []
             for row in config_data:
                 if row and safe_get(row, COL_CONFIG, 'season_id'):
@@ -78,23 +543,10 @@ class SheetCache:
                         'status': safe_get(row, COL_CONFIG, 'status', 'UNKNOWN'),
                         'next_tournament': safe_get(row, COL_CONFIG, 'next_tournament')
                     })
-            
-            # Leggi Seasonal_Standings per ogni stagione
-            
-            # Leggi Standings PROV e FINAL (se esistono)
-            standings_by_season = { }
-            prov_rows = []
-            final_rows = []
-            try:
-                ws_prov = sheet.worksheet("Seasonal_Standings_PROV")
-                prov_rows = ws_prov.get_all_values()[3:]  # Skip header
-            except Exception:
-                prov_rows = []
-            try:
-                ws_final = sheet.worksheet("Seasonal_Standings_FINAL")
-                final_rows = ws_final.get_all_values()[3:]
-            except Exception:
-                final_rows = []
+
+            # Standings PROV e FINAL (vuote se il foglio non esiste)
+            prov_rows = values["Seasonal_Standings_PROV"][3:]  # Skip header
+            final_rows = values["Seasonal_Standings_FINAL"][3:]
 
             # Crea mappe per season_id
             prov_map = {}
@@ -135,10 +587,8 @@ class SheetCache:
                         'best_rank': safe_int(row, COL_STANDINGS, 'best_rank', 999),
                         'top8_count': safe_int(row, COL_STANDINGS, 'top8_count', 0)
                     })
-            # Leggi Tournaments 
             # Leggi Tournaments per metadata
-            ws_tournaments = sheet.worksheet("Tournaments")
-            tournaments_data = ws_tournaments.get_all_values()[3:]
+            tournaments_data = values["Tournaments"][3:]
             
             tournaments_by_season = {}
             for row in tournaments_data:
@@ -156,36 +606,160 @@ class SheetCache:
                     'participants': safe_int(row, COL_TOURNAMENTS, 'participants', 0),
                     'winner': safe_get(row, COL_TOURNAMENTS, 'winner', '')
                 })
-            
-            self.cache_data = {
-            'schema_version': 2,
-            'seasons': seasons,
-            'standings_by_season': standings_by_season,
-            'tournaments_by_season': tournaments_by_season,
-            # legacy aliases (back-compat)
-            'standings': standings_by_season,
-            'tournaments': tournaments_by_season
-        }
+
+            # Snapshot degli altri fogli usati dalle route (stesso batchGet)
+            sheets = {name: values[name] for name in SNAPSHOT_SHEETS}
+
+            self._set_snapshot_from_data(
+                data_version, seasons, standings_by_season, tournaments_by_season, sheets
+            )
+            self._force_refresh = False
             self.last_update = datetime.now()
+            self.last_refresh = {
+                'api_calls': api_calls,
+                'duration_ms': int((time.monotonic() - started) * 1000),
+                'at': self.last_update.isoformat(),
+                'unchanged': False
+            }
             self.save_to_file()
-            
+
             return True, None
             
         except Exception as e:
+            self.last_error = str(e)
+            # Token/sessione potrebbero essere invalidi: riconnetti al prossimo fetch
+            sheet_connection.reset_connection()
             return False, str(e)
     
+    def has_snapshot(self):
+        """True se in memoria c'è uno snapshot completo servibile subito."""
+        return bool(self.cache_data) and 'sheets' in self.cache_data
+
+    def is_refreshing(self):
+        """True se un refresh in background è in corso."""
+        return self._refresh_thread is not None and self._refresh_thread.is_alive()
+
+    def refresh_async(self):
+        """
+        Avvia fetch_data() in un thread daemon (se non già in corso).
+
+        Dopo un fetch fallito aspetta REFRESH_RETRY_SECONDS prima di
+        riprovare, così un rate limit non genera un fetch per ogni richiesta.
+
+        Returns:
+            bool: True se è stato avviato un nuovo refresh
+        """
+        with self._thread_lock:
+            if self.is_refreshing() or self._fetch_lock.locked():
+                return False
+            if self._last_failed_attempt and time.monotonic() - self._last_failed_attempt < REFRESH_RETRY_SECONDS:
+                return False
+            self._refresh_thread = threading.Thread(
+                target=self._background_fetch, name='SheetCache-refresh', daemon=True
+            )
+            self._refresh_thread.start()
+            return True
+
+    def _background_fetch(self):
+        success, error = self.fetch_data()
+        if success:
+            self._last_failed_attempt = None
+        else:
+            self._last_failed_attempt = time.monotonic()
+            print(f"⚠️ Refresh cache in background fallito: {error}")
+
     def get_data(self):
-        """Ottieni dati (con refresh automatico se necessario)"""
+        """
+        Ottieni dati (con refresh automatico se necessario).
+
+        Con background_refresh attivo e uno snapshot già in memoria, ritorna
+        subito i dati correnti e li aggiorna in background: nessuna richiesta
+        aspetta Google. Il fetch sincrono resta solo per il primo caricamento.
+
+        In modalità sincrona, se un altro thread sta già aggiornando e c'è uno
+        snapshot, ritorna quello invece di mettersi in coda.
+        """
         if self.needs_refresh():
-            success, error = self.fetch_data()
-            if not success and not self.cache_data:
-                # Primo caricamento fallito e no cache
-                return None, error, None
+            if self.background_refresh and self.has_snapshot():
+                self.refresh_async()
+            elif self.has_snapshot() and self._fetch_lock.locked():
+                # Refresh già in corso in un altro thread: servi lo snapshot attuale
+                pass
+            else:
+                success, error = self.fetch_data()
+                if not success and not self.cache_data:
+                    # Primo caricamento fallito e no cache
+                    return None, error, None
         
         age_minutes = int((datetime.now() - self.last_update).total_seconds() / 60) if self.last_update else 999
         is_stale = age_minutes > CACHE_REFRESH_MINUTES
         
         return self.cache_data, None, (is_stale, age_minutes)
 
+    def get_sheet_rows(self, name):
+        """
+        Righe grezze di un foglio dallo snapshot (header inclusi).
+
+        Sostituisce sheet.worksheet(name).get_all_values() nelle route web:
+        nessuna chiamata API finché la cache è valida.
+
+        Raises:
+            RuntimeError: Se la cache non è disponibile (primo fetch fallito)
+        """
+        data, err, meta = self.get_data()
+        if not data:
+            raise RuntimeError(err or 'Cache non disponibile')
+        return data.get('sheets', {}).get(name, [])
+
+    def sheet_fingerprint(self, name):
+        """
+        Fingerprint del contenuto di un foglio nello snapshot.
+
+        È l'hash già presente nel nome dello shard: costa zero finché il foglio
+        non cambia. Usato come chiave di validità da stats_cache.
+
+        Returns:
+            str | None: None se la cache non è disponibile
+        """
+        data, err, meta = self.get_data()
+        if not data or self._sheet_store is None:
+            return None
+        try:
+            return self._sheet_store.digest(name)
+        except KeyError:
+            return None
+
+    def results_table(self):
+        """
+        Results dello snapshot come ResultsTable colonnare e indicizzata.
+
+        Costruita una volta per versione del foglio (fingerprint dello shard)
+        e condivisa da stats_builder e dalle route: nessun re-parsing delle
+        righe grezze ad ogni richiesta.
+
+        Raises:
+            RuntimeError: Se la cache non è disponibile (primo fetch fallito)
+        """
+        data, err, meta = self.get_data()
+        if not data:
+            raise RuntimeError(err or 'Cache non disponibile')
+        # Righe e fingerprint dallo stesso snapshot: un refresh in background
+        # che lo sostituisce nel frattempo non può mescolarli
+        sheets = data.get('sheets', {})
+        rows = sheets.get("Results", [])
+        try:
+            fingerprint = sheets.digest("Results")
+        except KeyError:
+            fingerprint = None
+        # Lock: richieste concorrenti aspettano la stessa tabella invece di
+        # costruirne una ciascuna
+        with self._results_table_lock:
+            memo = self._results_table
+            if memo is not None and fingerprint is not None and memo[0] == fingerprint:
+                return memo[1]
+            table = ResultsTable(rows[3:])
+            self._results_table = (fingerprint, table)
+            return table
+
 # Istanza globale
 cache = SheetCache()
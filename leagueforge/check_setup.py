@@ -74,7 +74,7 @@ def check_dependencies():
             all_ok = False
 
     # Opzionali
-    optional = {'pandas': 'pandas', 'pdfplumber': 'pdfplumber'}
+    optional = {'pandas': 'pandas', 'pdfplumber': 'pdfplumber', 'numpy': 'numpy'}
     for module, package in optional.items():
         try:
             __import__(module)
@@ -62,12 +62,35 @@ SESSION_TIMEOUT = 30
 # ==============================================================================
 # CACHE SETTINGS
 # ==============================================================================
-# Ogni quanti minuti refreshare la cache dal Google Sheet
-CACHE_REFRESH_MINUTES = 5
+# Ogni quanti minuti controllare se il Google Sheet è cambiato.
+# Se il file non è stato modificato il controllo costa 1 sola chiamata leggera
+# (modifiedTime su Drive), quindi il valore può restare basso.
+CACHE_REFRESH_MINUTES = 2
 
 # Nome del file di cache locale
 CACHE_FILE = "cache_data.json"
 
+# Refresh in background (stale-while-revalidate): le pagine usano subito i dati
+# in cache e il refresh da Google Sheets avviene in un thread separato.
+# Metti False per il comportamento classico (refresh dentro la richiesta).
+CACHE_BACKGROUND_REFRESH = True
+
+# Processi per il calcolo parallelo delle stats dopo un import e per
+# `python stats_warmup.py` (None = uno per CPU, 1 = sequenziale).
+STATS_WARM_WORKERS = None
+
+# Secondi per cui una membership o uno scope inesistente nello snapshot
+# risponde 404 senza rileggere la cache (crawler, link sbagliati).
+NEGATIVE_CACHE_SECONDS = 60
+
+# max-age (secondi) delle pagine pubbliche per browser e reverse proxy.
+# Scaduto, il client rivalida con ETag e riceve 304 se i dati non sono cambiati.
+HTTP_CACHE_MAX_AGE = 30
+
+# Memoria massima (byte) per le pagine già renderizzate (classifica, stats,
+# player), riusate finché i dati non cambiano. 0 = disattivata.
+PAGE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
 # ==============================================================================
 # APP SETTINGS
 # ==============================================================================
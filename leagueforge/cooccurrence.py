@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - Co-occorrenze sparse giocatore × evento
+=====================================================
+
+Motore per le Tales basate su coppie: compagni di torneo (companions),
+rivali di podio (podium_rivals) e varietà di avversari in top 8
+(top8_mixture).
+
+Prima stats_builder enumerava tutte le coppie di ogni evento (O(P²) per
+evento: ~2.000 coppie per un torneo da 64) e teneva un contatore per ogni
+coppia mai vista. Qui si tiene solo l'incidenza sparsa giocatore → eventi
+e i top-N si cercano con un heap limitato:
+
+- i giocatori si visitano per numero di eventi decrescente
+- per ogni giocatore si contano i vicini non ancora visitati (coppia
+  contata una volta sola)
+- una coppia non può superare il numero di eventi del suo giocatore meno
+  presente: appena il giocatore corrente ha meno eventi del N-esimo
+  conteggio nell'heap, nessuna coppia rimasta può entrare e ci si ferma
+
+Spareggi identici al vecchio conteggio: a parità di conteggio vince la
+coppia comparsa prima nel foglio (riga del primo evento, posizioni
+nell'evento).
+
+UTILIZZO:
+    co = CoOccurrence()
+    co.add_group(first_row, ['0000000001', '0000000002', ...])  # 1 per evento
+    co.top_pairs(10)          # [((a, b), count), ...]
+    co.top_neighbourhoods(10) # [(membership, avversari unici), ...]
+"""
+
+import heapq
+from collections import Counter, defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+
+class CoOccurrence:
+    """
+    Incidenza sparsa giocatore × gruppo (evento, podio, top 8).
+
+    I gruppi vanno aggiunti in ordine di foglio (riga della prima riga
+    dell'evento): l'ordine fa da spareggio. I risultati sono in cache fino
+    al prossimo add_group().
+    """
+
+    __slots__ = ("groups", "incidence", "_mult", "_cache")
+
+    def __init__(self):
+        self.groups: List[Tuple[int, List[str]]] = []     # (prima riga, membri in ordine)
+        self.incidence: Dict[str, List[Tuple[int, int]]] = defaultdict(list)  # m -> [(gruppo, pos)]
+        self._mult: List[int] = []                          # molteplicità massima per gruppo
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.groups)
+
+    def add_group(self, first_row: int, members: Sequence[str]):
+        """Registra un gruppo (es. i giocatori di un evento in ordine di foglio)."""
+        g = len(self.groups)
+        members = list(members)
+        self.groups.append((first_row, members))
+        self._mult.append(1 if len(set(members)) == len(members) else max(members.count(m) for m in members))
+        for pos, m in enumerate(members):
+            self.incidence[m].append((g, pos))
+        self._cache.clear()
+
+    def _bound(self, m: str) -> int:
+        """
+        Limite superiore dei conteggi di coppia di m.
+
+        Ogni presenza di m conta al più la molteplicità massima del gruppo
+        (1 salvo righe doppie): in pratica il numero di eventi di m.
+        """
+        return sum(self._mult[g] for g, _ in self.incidence[m])
+
+    def top_pairs(self, n: int) -> List[Tuple[Tuple[str, str], int]]:
+        """
+        Le n coppie (a < b) che compaiono più spesso negli stessi gruppi.
+
+        Returns:
+            list: [((a, b), count)] per count decrescente, spareggio per
+            prima comparsa nel foglio
+        """
+        key = ("pairs", n)
+        if key not in self._cache:
+            self._cache[key] = self._top_pairs(n)
+        return self._cache[key]
+
+    def _top_pairs(self, n):
+        if n <= 0:
+            return []
+        bounds = {m: self._bound(m) for m in self.incidence}
+        order = sorted(bounds, key=lambda m: -bounds[m])
+        groups = self.groups
+        done = set()
+        best = []   # [(-count, chiave prima comparsa, coppia)], al più n, ordinati
+        for a in order:
+            threshold = -best[-1][0] if len(best) == n else 0
+            if bounds[a] < threshold:
+                break
+            # Conteggio vicini in C (Counter.update); chiavi di spareggio solo
+            # per i vicini che possono entrare nei top n
+            counts = Counter()
+            pos_a = defaultdict(list)
+            for g, p in self.incidence[a]:
+                counts.update(groups[g][1])
+                pos_a[g].append(p)
+            done.add(a)
+            candidates = [
+                (-c, self._first_pair(pos_a, b), (a, b) if a < b else (b, a))
+                for b, c in counts.items() if b not in done and c >= threshold
+            ]
+            if candidates:
+                best = heapq.nsmallest(n, candidates + best)
+        return [(pair, -neg) for neg, _, pair in best]
+
+    def _first_pair(self, pos_a, b):
+        """Chiave di prima comparsa della coppia: (riga gruppo, pos minore, pos maggiore)."""
+        for g, _ in self.incidence[b]:
+            if g in pos_a:
+                first_row = self.groups[g][0]
+                return min(
+                    (first_row, min(p, q), max(p, q))
+                    for p in pos_a[g] for q, m in enumerate(self.groups[g][1]) if m == b
+                )
+
+    def top_neighbourhoods(self, n: int) -> List[Tuple[str, int]]:
+        """
+        I n giocatori con più vicini distinti (es. avversari unici in top 8).
+
+        Ogni giocatore presente in almeno un gruppo è candidato, anche con 0
+        vicini. Spareggio per prima comparsa nel foglio.
+
+        Returns:
+            list: [(membership, vicini distinti)]
+        """
+        key = ("neighbourhoods", n)
+        if key not in self._cache:
+            self._cache[key] = self._top_neighbourhoods(n)
+        return self._cache[key]
+
+    def _top_neighbourhoods(self, n):
+        if n <= 0:
+            return []
+        groups = self.groups
+        bounds = {
+            m: sum(len(groups[g][1]) - 1 for g, _ in occ) for m, occ in self.incidence.items()
+        }
+        best = []   # [(-vicini, prima comparsa, membership)]
+        for m in sorted(bounds, key=lambda m: -bounds[m]):
+            if len(best) == n and bounds[m] < -best[-1][0]:
+                break
+            occ = self.incidence[m]
+            g0, p0 = occ[0]
+            neighbours = set()
+            for g, _ in occ:
+                neighbours.update(groups[g][1])
+            neighbours.discard(m)
+            best = heapq.nsmallest(n, best + [(-len(neighbours), (groups[g0][0], p0), m)])
+        return [(m, -neg) for neg, _, m in best]
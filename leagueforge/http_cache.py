@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - Risposte HTTP condizionali
+========================================
+
+ETag / Last-Modified per le pagine pubbliche, derivati dalla versione dello
+snapshot (SheetCache.snapshot_version) e non dall'HTML: la 304 si decide
+PRIMA di eseguire la view, quindi senza query sulla cache né render Jinja.
+
+- ETag debole: hash di versione snapshot + URL (path + query) + versione
+  dei template (file modificati in un deploy → ETag nuovi)
+- Last-Modified: modifiedTime del foglio (data_version) se disponibile,
+  altrimenti l'istante in cui lo snapshot è entrato in memoria
+- If-None-Match (prioritario) o If-Modified-Since → 304
+- Cache-Control: public, max-age=HTTP_CACHE_MAX_AGE (reverse proxy e browser)
+
+Solo le risposte 200 vengono marcate; una view che imposta da sé
+Cache-Control (es. stats ancora in preparazione → no-store) viene lasciata
+com'è.
+
+UTILIZZO:
+    from http_cache import conditional
+
+    @app.route('/classifica/<season_id>')
+    @conditional(lambda: cache)
+    def classifica(season_id): ...
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request
+
+try:
+    from config import HTTP_CACHE_MAX_AGE
+except ImportError:
+    # config.py creati prima di questa opzione
+    HTTP_CACHE_MAX_AGE = 30
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+
+def _templates_version():
+    """Hash di nomi, dimensioni e mtime dei template (uguale in tutti i worker di un deploy)."""
+    h = hashlib.sha1()
+    for root, dirs, files in os.walk(TEMPLATES_DIR):
+        dirs.sort()
+        for name in sorted(files):
+            try:
+                st = os.stat(os.path.join(root, name))
+            except OSError:
+                continue
+            h.update(f"{name}:{st.st_size}:{int(st.st_mtime)};".encode('utf-8'))
+    return h.hexdigest()[:8]
+
+
+TEMPLATES_VERSION = _templates_version()
+
+
+def _parse_data_version(value):
+    """modifiedTime di Drive (RFC 3339) → datetime UTC, None se non valido."""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def snapshot_last_modified(cache):
+    """
+    Istante dell'ultima modifica dei dati dello snapshot (UTC, senza
+    microsecondi): modifiedTime del foglio, altrimenti arrivo in memoria.
+
+    Returns:
+        datetime | None
+    """
+    last_modified = _parse_data_version(cache.data_version)
+    if last_modified is None and isinstance(cache.snapshot_modified, datetime):
+        last_modified = cache.snapshot_modified
+    if last_modified is not None:
+        last_modified = last_modified.replace(microsecond=0)
+    return last_modified
+
+
+def validators(cache):
+    """
+    (etag, last_modified) della richiesta corrente, None senza snapshot.
+
+    Solo stato in memoria: nessun get_data(), nessuna chiamata a Google.
+
+    Args:
+        cache: SheetCache (snapshot_version, data_version, snapshot_modified)
+    """
+    version = cache.snapshot_version()
+    if not isinstance(version, str):
+        return None
+    etag = hashlib.sha1(f"{TEMPLATES_VERSION}|{version}|{request.full_path}".encode('utf-8')).hexdigest()[:20]
+    return etag, snapshot_last_modified(cache)
+
+
+def is_not_modified(etag, last_modified):
+    """True se il client ha già questa versione (If-None-Match, poi If-Modified-Since)."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and last_modified is not None and last_modified <= since
+
+
+def _tag(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = f"public, max-age={HTTP_CACHE_MAX_AGE}"
+    return response
+
+
+def conditional(get_cache):
+    """
+    Decorator: 304 dalla versione dello snapshot, ETag/Last-Modified sulle 200.
+
+    Args:
+        get_cache: Funzione che ritorna la SheetCache (letta ad ogni
+            richiesta, così i test possono sostituire il modulo cache)
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            tags = validators(cache)
+            if tags is None:
+                return view(*args, **kwargs)
+            etag, last_modified = tags
+            if is_not_modified(etag, last_modified):
+                # La view non gira: get_data() avvia comunque il refresh se
+                # lo snapshot è scaduto (altrimenti con solo 304 non si aggiornerebbe)
+                cache.get_data()
+                return _tag(current_app.response_class(status=304), etag, last_modified)
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and 'Cache-Control' not in response.headers:
+                _tag(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
@@ -14,7 +14,7 @@ FUNZIONI:
 - write_results_to_sheet(): Scrittura Results (formato 13 colonne)
 - update_players(): Aggiornamento lifetime stats Players
 - update_seasonal_standings(): Aggiornamento classifica stagionale
-- finalize_import(): Achievement check + Player_Stats update
+- finalize_import(): Achievement check + Player_Stats update + stats precalcolate + invalidazione cache webapp
 - calculate_leagueforge_points(): Formula punti LeagueForge
 
 UTILIZZO:
@@ -33,11 +33,9 @@ import sys
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from collections import defaultdict
 
 try:
     import gspread
-    from google.oauth2.service_account import Credentials
 except ImportError:
     print("❌ Moduli mancanti. Esegui: pip install gspread google-auth")
     sys.exit(1)
@@ -53,27 +51,24 @@ def api_delay():
     time.sleep(API_DELAY_MS / 1000.0)
 
 try:
-    from config import SHEET_ID, CREDENTIALS_FILE
+    # Solo verifica che config.py esista: SHEET_ID e CREDENTIALS_FILE li
+    # legge sheet_connection.get_spreadsheet()
+    import config  # noqa: F401
 except ImportError:
     print("❌ config.py non trovato. Copia config_example.py e configura.")
     sys.exit(1)
 
+from sheet_connection import get_spreadsheet
+
 from sheet_utils import (
-    COL_CONFIG, COL_RESULTS, COL_PLAYERS, COL_PLAYER_STATS,
-    safe_get, safe_int, safe_float, fuzzy_match
+    COL_CONFIG, COL_PLAYERS, COL_PLAYER_STATS,
+    safe_get, fuzzy_match
 )
 from achievements import check_and_unlock_achievements
 from player_stats import update_player_stats_after_tournament, batch_update_player_stats
-
-# =============================================================================
-# CONSTANTS
-# =============================================================================
-
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
-]
-
+from invalidation import publish as publish_invalidation, scopes_for_season
+from stats_artifacts import write_artifacts
+from results_table import load_results_table, invalidate_results_table
 
 # =============================================================================
 # STANDARDIZED DATA STRUCTURE
@@ -167,9 +162,7 @@ def connect_sheet():
     Returns:
         gspread.Spreadsheet: Oggetto spreadsheet connesso
     """
-    creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID)
+    return get_spreadsheet()
 
 
 # =============================================================================
@@ -229,6 +222,7 @@ def delete_existing_tournament(sheet, tournament_id: str) -> bool:
             # Elimina dal basso verso l'alto
             for row_idx in sorted(rows_to_delete, reverse=True):
                 ws_results.delete_rows(row_idx)
+            invalidate_results_table()
             print(f"   🗑️  Eliminati {len(rows_to_delete)} risultati")
 
         # 2. Elimina da Tournaments
@@ -350,6 +344,7 @@ def write_results_to_sheet(sheet, tournament_data: Dict, test_mode: bool = False
     if rows:
         api_delay()
         safe_api_call(ws_results.append_rows, rows, value_input_option='RAW')
+        invalidate_results_table()
 
     print(f"✅ Results: {len(rows)} giocatori")
     return len(rows)
@@ -412,7 +407,6 @@ def update_players(sheet, tournament_data: Dict, test_mode: bool = False) -> Tup
         return 0, 0
 
     ws_players = sheet.worksheet("Players")
-    ws_results = sheet.worksheet("Results")
 
     tcg = tournament_data['tcg']
     tournament_date = tournament_data['date']
@@ -427,52 +421,48 @@ def update_players(sheet, tournament_data: Dict, test_mode: bool = False) -> Tup
             key = (row[0], row[2])  # membership, tcg
             existing_dict[key] = i
 
-    # Leggi TUTTI i results per calcolare lifetime stats
+    # Results condivisa con le altre fasi dell'import (una sola lettura)
     api_delay()
-    all_results = safe_api_call(ws_results.get_all_values)[3:]
-
-    # Calcola lifetime stats per TCG
-    lifetime_stats = defaultdict(lambda: {
-        'total_tournaments': 0,
-        'tournament_wins': 0,
-        'match_w': 0,
-        'match_t': 0,
-        'match_l': 0,
-        'total_points': 0,
-        'first_seen': None,
-        'last_seen': None
-    })
-
-    for row in all_results:
-        if len(row) < 10:
-            continue
-
-        membership = row[2]
-        # Estrai TCG da tournament_id (es. OP12_20251113 -> OP)
-        tid = row[1] if len(row) > 1 else ''
-        row_tcg = ''.join(c for c in tid.split('_')[0] if c.isalpha()).upper()
-        if not row_tcg:
-            row_tcg = tcg
-
-        key = (membership, row_tcg)
-        stats = lifetime_stats[key]
-
-        stats['total_tournaments'] += 1
-        if safe_int(row, COL_RESULTS, 'rank', 999) == 1:
-            stats['tournament_wins'] += 1
-
-        stats['match_w'] += safe_int(row, COL_RESULTS, 'match_w', 0) if len(row) > 10 else 0
-        stats['match_t'] += safe_int(row, COL_RESULTS, 'match_t', 0) if len(row) > 11 else 0
-        stats['match_l'] += safe_int(row, COL_RESULTS, 'match_l', 0) if len(row) > 12 else 0
-        stats['total_points'] += safe_float(row, COL_RESULTS, 'points_total', 0)
-
-        # Track date
-        result_date = tid.split('_')[1] if '_' in tid else ''
-        if result_date:
-            if not stats['first_seen'] or result_date < stats['first_seen']:
-                stats['first_seen'] = result_date
-            if not stats['last_seen'] or result_date > stats['last_seen']:
-                stats['last_seen'] = result_date
+    table = load_results_table(sheet)
+
+    def lifetime_stats_for(membership):
+        """Lifetime stats del giocatore per il TCG del torneo (None se nessun risultato)."""
+        stats = None
+        for i in table.rows_for_member(membership):
+            # TCG dal season ID (es. OP12 -> OP, PKM-FS25 -> PKM), dalla dimensione tornei
+            tournament = table.tournament_of(i)
+            if (tournament.tcg or tcg) != tcg:
+                continue
+            if stats is None:
+                stats = {
+                    'total_tournaments': 0,
+                    'tournament_wins': 0,
+                    'match_w': 0,
+                    'match_t': 0,
+                    'match_l': 0,
+                    'total_points': 0,
+                    'first_seen': None,
+                    'last_seen': None
+                }
+
+            stats['total_tournaments'] += 1
+            if table.rank[i] == 1:
+                stats['tournament_wins'] += 1
+
+            # Celle Match_W/T/L vuote (dati vecchi) contano 0
+            stats['match_w'] += max(table.match_w[i], 0)
+            stats['match_t'] += max(table.match_t[i], 0)
+            stats['match_l'] += max(table.match_l[i], 0)
+            stats['total_points'] += table.points_total[i]
+
+            # Track date
+            result_date = tournament.date_str
+            if result_date:
+                if not stats['first_seen'] or result_date < stats['first_seen']:
+                    stats['first_seen'] = result_date
+                if not stats['last_seen'] or result_date > stats['last_seen']:
+                    stats['last_seen'] = result_date
+        return stats
 
     # Prepara update/insert
     rows_to_update = []
@@ -482,7 +472,7 @@ def update_players(sheet, tournament_data: Dict, test_mode: bool = False) -> Tup
         membership = p['membership']
         key = (membership, tcg)
 
-        stats = lifetime_stats.get(key, {
+        stats = lifetime_stats_for(membership) or {
             'total_tournaments': 1,
             'tournament_wins': 1 if p['rank'] == 1 else 0,
             'match_w': p['wins'],
@@ -493,7 +483,7 @@ def update_players(sheet, tournament_data: Dict, test_mode: bool = False) -> Tup
             )['points_total'],
             'first_seen': tournament_date,
             'last_seen': tournament_date
-        })
+        }
 
         player_row = [
             membership,
@@ -535,80 +525,28 @@ def update_players(sheet, tournament_data: Dict, test_mode: bool = False) -> Tup
 # UPDATE SEASONAL STANDINGS
 # =============================================================================
 
-def update_seasonal_standings(sheet, season_id: str, tournament_date: str) -> int:
+def compute_seasonal_standings(table, season_id: str, max_to_count: int) -> List[Dict]:
     """
-    Aggiorna la classifica stagionale Seasonal_Standings_PROV.
-
-    Applica lo scarto dinamico:
-    - Se stagione < 8 tornei: conta tutto
-    - Se stagione >= 8 tornei: conta (totale - 2) migliori
-    - Se stagione ARCHIVED: conta tutto (dati storici)
+    Classifica stagionale dalla ResultsTable (parte in memoria di
+    update_seasonal_standings, senza letture né scritture sul foglio).
 
     Args:
-        sheet: Google Sheet connesso
+        table: ResultsTable (load_results_table)
         season_id: ID stagione
-        tournament_date: Data torneo
+        max_to_count: Tornei migliori da contare per giocatore (scarto)
 
     Returns:
-        int: Numero giocatori in classifica
+        List[Dict]: Giocatori ordinati per total_points decrescente
     """
-    ws_standings = sheet.worksheet("Seasonal_Standings_PROV")
-    ws_results = sheet.worksheet("Results")
-    ws_tournaments = sheet.worksheet("Tournaments")
-    ws_config = sheet.worksheet("Config")
-
-    # Leggi status season dalla Config
-    api_delay()
-    config_data = safe_api_call(ws_config.get_all_values)
-    season_status = None
-    for row in config_data[4:]:
-        if row and row[0] == season_id:
-            season_status = row[4].strip().upper() if len(row) > 4 else ""
-            break
-
-    # Conta tornei in stagione
-    api_delay()
-    all_tournaments = safe_api_call(ws_tournaments.get_all_values)
-    season_tournaments = [row for row in all_tournaments[3:] if row and row[1] == season_id]
-    total_tournaments = len(season_tournaments)
-
-    print(f"      Tornei stagione: {total_tournaments}")
-    print(f"      Status stagione: {season_status or 'ACTIVE'}")
-
-    # Calcola quanti tornei contare
-    if season_status == "ARCHIVED":
-        max_to_count = total_tournaments
-        print(f"      Scarto: NESSUNO (stagione ARCHIVED)")
-    elif total_tournaments < 8:
-        max_to_count = total_tournaments
-        print(f"      Scarto: NESSUNO (< 8 tornei)")
-    else:
-        max_to_count = total_tournaments - 2
-        print(f"      Scarto: Peggiori 2 (conta max {max_to_count})")
-
-    # Leggi tutti i risultati della stagione
-    api_delay()
-    all_results = safe_api_call(ws_results.get_all_values)
-
     # Raggruppa per giocatore
     player_data = {}
     name_map = {}
 
-    for row in all_results[3:]:
-        if not row or len(row) < 9:
-            continue
-
-        result_tournament_id = row[1]
-        if not result_tournament_id.startswith(season_id):
-            continue
+    for i in table.rows_for_season(season_id):
+        membership = table.membership_of(i)
+        ranking = table.rank[i]
 
-        membership = row[2]
-        points = float(row[8]) if row[8] else 0
-        ranking = int(row[3]) if row[3] else 999
-        match_w = int(row[10]) if len(row) > 10 and row[10] else 0
-        name = row[9] if len(row) > 9 and row[9] else membership
-
-        name_map[membership] = name
+        name_map[membership] = table.name_of(i)
 
         if membership not in player_data:
             player_data[membership] = {
@@ -617,9 +555,9 @@ def update_seasonal_standings(sheet, season_id: str, tournament_date: str) -> in
             }
 
         player_data[membership]['tournaments'].append({
-            'points': points,
+            'points': table.points_total[i],
             'rank': ranking,
-            'match_w': match_w
+            'match_w': max(table.match_w[i], 0)
         })
         player_data[membership]['best_rank'] = min(
             player_data[membership]['best_rank'], ranking
@@ -657,6 +595,65 @@ def update_seasonal_standings(sheet, season_id: str, tournament_date: str) -> in
     # Ordina per punti
     final_standings.sort(key=lambda x: x['total_points'], reverse=True)
 
+    return final_standings
+
+
+def update_seasonal_standings(sheet, season_id: str, tournament_date: str) -> int:
+    """
+    Aggiorna la classifica stagionale Seasonal_Standings_PROV.
+
+    Applica lo scarto dinamico:
+    - Se stagione < 8 tornei: conta tutto
+    - Se stagione >= 8 tornei: conta (totale - 2) migliori
+    - Se stagione ARCHIVED: conta tutto (dati storici)
+
+    Args:
+        sheet: Google Sheet connesso
+        season_id: ID stagione
+        tournament_date: Data torneo
+
+    Returns:
+        int: Numero giocatori in classifica
+    """
+    ws_standings = sheet.worksheet("Seasonal_Standings_PROV")
+    ws_tournaments = sheet.worksheet("Tournaments")
+    ws_config = sheet.worksheet("Config")
+
+    # Leggi status season dalla Config
+    api_delay()
+    config_data = safe_api_call(ws_config.get_all_values)
+    season_status = None
+    for row in config_data[4:]:
+        if row and row[0] == season_id:
+            season_status = row[4].strip().upper() if len(row) > 4 else ""
+            break
+
+    # Conta tornei in stagione
+    api_delay()
+    all_tournaments = safe_api_call(ws_tournaments.get_all_values)
+    season_tournaments = [row for row in all_tournaments[3:] if row and row[1] == season_id]
+    total_tournaments = len(season_tournaments)
+
+    print(f"      Tornei stagione: {total_tournaments}")
+    print(f"      Status stagione: {season_status or 'ACTIVE'}")
+
+    # Calcola quanti tornei contare
+    if season_status == "ARCHIVED":
+        max_to_count = total_tournaments
+        print(f"      Scarto: NESSUNO (stagione ARCHIVED)")
+    elif total_tournaments < 8:
+        max_to_count = total_tournaments
+        print(f"      Scarto: NESSUNO (< 8 tornei)")
+    else:
+        max_to_count = total_tournaments - 2
+        print(f"      Scarto: Peggiori 2 (conta max {max_to_count})")
+
+    # Risultati della stagione dall'indice per season ID
+    api_delay()
+    table = load_results_table(sheet)
+
+    final_standings = compute_seasonal_standings(table, season_id, max_to_count)
+
     # Trova righe esistenti di questa stagione
     api_delay()
     existing_standings = safe_api_call(ws_standings.get_all_values)
@@ -721,7 +718,9 @@ def finalize_import(
     test_mode: bool = False
 ) -> Dict:
     """
-    Finalizza l'import: achievement check + Player_Stats update.
+    Finalizza l'import: achievement check + Player_Stats update, stats
+    precalcolate di stagione e ALL-<TCG> (stats_artifacts.py), poi pubblica
+    l'invalidazione per la webapp (vedi invalidation.py).
 
     Args:
         sheet: Google Sheet connesso
@@ -733,7 +732,8 @@ def finalize_import(
     """
     stats = {
         'achievements_checked': 0,
-        'player_stats_updated': 0
+        'player_stats_updated': 0,
+        'stats_artifacts': 0
     }
 
     if test_mode:
@@ -794,6 +794,27 @@ def finalize_import(
     except Exception as e:
         print(f"   ⚠️  Errore Player_Stats (non bloccante): {e}")
 
+    # 3. Stats precalcolate (stagione + ALL-<TCG>) dalla Results già in memoria:
+    #    la webapp carica gli artifact invece di calcolarle su richiesta
+    print("   📦 Stats precalcolate...")
+    try:
+        written = write_artifacts(load_results_table(sheet), scopes_for_season(season_id, tcg))
+        stats['stats_artifacts'] = len(written)
+        print(f"   ✅ Stats: {', '.join(written) or 'nessuno scope'}")
+    except Exception as e:
+        print(f"   ⚠️  Errore stats precalcolate (non bloccante): {e}")
+
+    # 4. Invalidazione cache webapp (stagione, ALL-<TCG>, profili giocatori)
+    try:
+        publish_invalidation(
+            season_id, tcg,
+            [p['membership'] for p in tournament_data['participants']],
+            tournament_id=tournament_id
+        )
+        print("   🔄 Cache webapp invalidata")
+    except Exception as e:
+        print(f"   ⚠️  Errore invalidazione cache (non bloccante): {e}")
+
     return stats
 
 
@@ -63,12 +63,14 @@ REQUIREMENTS:
 
 import xml.etree.ElementTree as ET
 import gspread
-from google.oauth2.service_account import Credentials
 from datetime import datetime
 import sys
 import argparse
 from achievements import check_and_unlock_achievements
 from player_stats import update_player_stats_after_tournament
+from invalidation import publish as publish_invalidation, scopes_for_season
+from stats_artifacts import write_artifacts
+from results_table import load_results_table, invalidate_results_table
 from import_validator import (
     ImportValidator,
     validate_pokemon_tdf,
@@ -87,13 +89,12 @@ except ImportError:
     print("   Oppure esegui: python setup_wizard.py")
     sys.exit(1)
 
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+from sheet_connection import get_spreadsheet
+
 
 def connect_sheet():
     """Connette al Google Sheet usando credenziali da config.py"""
-    creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID)
+    return get_spreadsheet()
 
 def to_float(value):
     """
@@ -488,6 +489,7 @@ def import_to_sheet(data, test_mode=False):
         ws_results = sheet.worksheet("Results")
         if data['results']:
             ws_results.append_rows(data['results'], value_input_option='RAW')
+            invalidate_results_table()
     print(f"✅ Results: {len(data['results'])} giocatori")
 
     # 3. Matches (batch)
@@ -681,6 +683,26 @@ def import_to_sheet(data, test_mode=False):
         except Exception as e:
             print(f"   ⚠️  Errore Player_Stats (non bloccante): {e}")
 
+        # 8. Stats precalcolate (stagione + ALL-PKM), prima dell'invalidazione:
+        #    la webapp carica gli artifact invece di calcolarle su richiesta
+        print("   📦 Stats precalcolate...")
+        try:
+            written = write_artifacts(load_results_table(sheet), scopes_for_season(season_id, 'PKM'))
+            print(f"   ✅ Stats: {', '.join(written) or 'nessuno scope'}")
+        except Exception as e:
+            print(f"   ⚠️  Errore stats precalcolate (non bloccante): {e}")
+
+        # 9. Invalidazione cache webapp (stagione, ALL-PKM, profili giocatori)
+        try:
+            publish_invalidation(
+                season_id, 'PKM',
+                [result_row[2] for result_row in data['results']],
+                tournament_id=data['tournament'][0]
+            )
+            print("   🔄 Cache webapp invalidata")
+        except Exception as e:
+            print(f"   ⚠️  Errore invalidazione cache (non bloccante): {e}")
+
     if test_mode:
         print("\n⚠️  TEST COMPLETATO - Nessun dato scritto")
     else:
@@ -47,6 +47,7 @@ from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Any
 import gspread
 from google.oauth2.service_account import Credentials
+from results_table import invalidate_results_table
 
 
 # ============================================================================
@@ -1148,6 +1149,7 @@ def batch_delete_tournament(sheet: object, tournament_id: str,
             for row_idx in sorted(existing_info['results_rows'], reverse=True):
                 ws_results.delete_rows(row_idx)
                 deleted['results'] += 1
+            invalidate_results_table()
 
         # 2. Cancella Tournaments
         if existing_info['tournament_row']:
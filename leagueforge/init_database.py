@@ -26,7 +26,6 @@ from datetime import datetime
 
 try:
     import gspread
-    from google.oauth2.service_account import Credentials
 except ImportError:
     print("❌ Errore: installa dipendenze con 'pip install gspread google-auth'")
     sys.exit(1)
@@ -40,7 +39,7 @@ except ImportError:
     print("   Oppure esegui: python setup_wizard.py")
     sys.exit(1)
 
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+from sheet_connection import get_spreadsheet
 
 
 # ==============================================================================
@@ -150,9 +149,7 @@ def get_achievement_data():
 
 def connect_sheet():
     """Connette al Google Sheet."""
-    creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID)
+    return get_spreadsheet()
 
 
 def create_worksheet(sheet, name, config, force=False):
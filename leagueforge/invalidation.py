@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - Invalidazione cache dopo import
+=============================================
+
+Gli import girano in un processo separato dalla webapp (CLI o subprocess
+del pannello admin). A fine import, finalize_import() pubblica un evento su
+file in invalidations/; ogni worker della webapp lo vede alla richiesta
+successiva e aggiorna in background solo ciò che l'import ha toccato:
+snapshot SheetCache, stats della stagione e di ALL-<TCG>, profili giocatori.
+
+UTILIZZO:
+    # Import script
+    from invalidation import publish
+    publish('OP12', 'OP', memberships, tournament_id='OP12_2025-01-15')
+
+    # Webapp (una volta per processo)
+    listener = InvalidationListener(since=time.time())
+    events = listener.poll()   # [] se nulla di nuovo (1 os.stat, a regime)
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parent / "invalidations"
+
+# Eventi più vecchi vengono rimossi alla pubblicazione successiva
+EVENT_MAX_AGE_SECONDS = 24 * 3600
+
+# Risoluzione peggiore dell'mtime della cartella (ext3/HFS+ 1s, FAT 2s):
+# entro questo intervallo da una modifica un mtime invariato non basta
+MTIME_RESOLUTION_SECONDS = 2.0
+
+
+def scopes_for_season(season_id: str, tcg: str) -> List[str]:
+    """Scope stats toccati da un torneo della stagione: stagione + ALL-<TCG>."""
+    return [season_id, f"ALL-{tcg}"]
+
+
+def publish(season_id: str, tcg: str, memberships: Iterable[str] = (),
+            tournament_id: Optional[str] = None) -> Path:
+    """
+    Pubblica un evento di invalidazione (scrittura atomica).
+
+    Args:
+        season_id: Stagione del torneo importato
+        tcg: Codice TCG (OP, PKM, RFB)
+        memberships: Giocatori del torneo (profili da aggiornare)
+        tournament_id: ID torneo aggiunto (abilita l'aggiornamento incrementale delle stats)
+
+    Returns:
+        Path: File evento scritto
+    """
+    BASE_DIR.mkdir(parents=True, exist_ok=True)
+    event = {
+        'at': time.time(),
+        'tournament_id': tournament_id,
+        'season_id': season_id,
+        'scopes': scopes_for_season(season_id, tcg),
+        'players': sorted({str(m).zfill(10) for m in memberships if m})
+    }
+    # Nome ordinabile per tempo: i listener leggono solo i file successivi
+    path = BASE_DIR / f"{time.time_ns():020d}_{os.getpid()}.json"
+    fd, tmp = tempfile.mkstemp(prefix=".event_", suffix=".tmp", dir=str(BASE_DIR))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(event, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _remove_old_events()
+    return path
+
+
+def _remove_old_events() -> None:
+    cutoff = time.time() - EVENT_MAX_AGE_SECONDS
+    for p in BASE_DIR.glob("*.json"):
+        try:
+            if p.stat().st_mtime < cutoff:
+                p.unlink()
+        except OSError:
+            pass
+
+
+class InvalidationListener:
+    """
+    Legge gli eventi pubblicati dopo `since`, ognuno una sola volta.
+
+    poll() costa un os.stat() della cartella finché non arriva un evento
+    nuovo: può essere chiamato ad ogni richiesta.
+
+    Con mtime a risoluzione grossolana due eventi nello stesso secondo
+    lasciano la cartella con lo stesso mtime: se l'ultima lettura è di meno
+    di MTIME_RESOLUTION_SECONDS dopo l'mtime, la cartella si rilegge anche
+    a mtime invariato (evento pubblicato subito dopo la lettura).
+    """
+
+    def __init__(self, since: float):
+        self._last_name = f"{int(since * 1e9):020d}"
+        self._dir_mtime = None
+        self._listed_at = 0.0
+
+    def poll(self) -> List[Dict]:
+        try:
+            mtime = BASE_DIR.stat().st_mtime_ns
+        except OSError:
+            return []
+        if mtime == self._dir_mtime and self._listed_at - mtime / 1e9 > MTIME_RESOLUTION_SECONDS:
+            return []
+        self._dir_mtime = mtime
+        self._listed_at = time.time()
+
+        events = []
+        for p in sorted(BASE_DIR.glob("*.json")):
+            if p.name <= self._last_name:
+                continue
+            try:
+                events.append(json.loads(p.read_text(encoding='utf-8')))
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Evento invalidazione {p.name} illeggibile: {e}")
+            self._last_name = p.name
+        return events
@@ -25,20 +25,21 @@ import random
 
 try:
     import gspread
-    from google.oauth2.service_account import Credentials
 except ImportError:
     print("❌ Errore: installa dipendenze con 'pip install gspread google-auth'")
     sys.exit(1)
 
 # Importa configurazione
 try:
-    from config import SHEET_ID, CREDENTIALS_FILE
+    # Solo verifica che config.py esista: SHEET_ID e CREDENTIALS_FILE li
+    # legge sheet_connection.get_spreadsheet()
+    import config  # noqa: F401
 except ImportError:
     print("❌ Errore: config.py non trovato!")
     print("   Esegui prima: python setup_wizard.py")
     sys.exit(1)
 
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+from sheet_connection import get_spreadsheet
 
 
 # ==============================================================================
@@ -59,9 +60,7 @@ DEMO_PLAYERS = [
 
 def connect_sheet():
     """Connette al Google Sheet."""
-    creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID)
+    return get_spreadsheet()
 
 
 def generate_demo_tournament(tcg, season_id, days_ago=7):
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - Cache pagine renderizzate
+=======================================
+
+HTML già renderizzato di classifica.html, stats.html e player.html, servito
+come bytes finché lo snapshot non cambia.
+
+- Chiave: versione dello snapshot (SheetCache.snapshot_version) + argomenti
+  della route (es. ('classifica', 'OP12'))
+- LRU in memoria con tetto in byte (PAGE_CACHE_MAX_BYTES)
+- Quando arriva la versione corrente dello snapshot le pagine della
+  precedente si scartano tutte: dopo un import nessuna può più essere servita
+
+La versione va letta PRIMA dei dati usati dal render: se lo snapshot cambia
+a metà richiesta la pagina appartiene alla versione vecchia e non viene
+salvata (put di una versione diversa da quella in cache e da
+current_version()), mai sotto quella nuova.
+
+Si mettono in cache solo pagine definitive (niente 404/500, niente stats
+ancora in preparazione) e senza dati per utente.
+
+UTILIZZO:
+    from page_cache import PageCache
+    pages = PageCache(current_version=lambda: cache.snapshot_version())
+
+    version = cache.snapshot_version()
+    body = pages.get(version, ('player', membership))
+    if body is None:
+        body = pages.put(version, ('player', membership), render_template(...))
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+try:
+    from config import PAGE_CACHE_MAX_BYTES
+except ImportError:
+    # config.py creati prima di questa opzione
+    PAGE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+
+class PageCache:
+    """
+    Pagine renderizzate (bytes UTF-8) per versione dello snapshot.
+
+    Args:
+        max_bytes: Tetto della memoria occupata dalle pagine (0 = disattivata)
+        current_version: Funzione che ritorna la versione corrente dello
+            snapshot; una put di un'altra versione, rimasta indietro, non
+            sostituisce le pagine in cache (None = ogni versione nuova vince)
+    """
+
+    def __init__(self, max_bytes: int = PAGE_CACHE_MAX_BYTES, current_version=None):
+        self.max_bytes = max_bytes
+        self.current_version = current_version
+        self._pages: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._version: Optional[str] = None
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: Optional[str], key: Hashable) -> Optional[bytes]:
+        """Pagina in cache per (version, key), None se assente."""
+        if not isinstance(version, str):
+            return None
+        with self._lock:
+            page = self._pages.get((version, key))
+            if page is None:
+                self.misses += 1
+                return None
+            self._pages.move_to_end((version, key))
+            self.hits += 1
+            return page
+
+    def put(self, version: Optional[str], key: Hashable, page) -> bytes:
+        """
+        Salva la pagina renderizzata e la ritorna come bytes.
+
+        Senza versione (nessuno snapshot), di una versione già superata o
+        oltre il tetto la pagina non viene salvata ma è comunque ritornata.
+        """
+        body = page.encode('utf-8') if isinstance(page, str) else page
+        if not isinstance(version, str) or len(body) > self.max_bytes:
+            return body
+        # Fuori dal lock: current_version() può leggere la cache dei fogli
+        current = self.current_version() if self.current_version is not None else version
+        with self._lock:
+            if version != self._version:
+                if version != current:
+                    return body
+                self._drop_all()
+                self._version = version
+            old = self._pages.pop((version, key), None)
+            if old is not None:
+                self._size -= len(old)
+            self._pages[(version, key)] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._pages.popitem(last=False)
+                self._size -= len(evicted)
+        return body
+
+    def _drop_all(self):
+        self._pages.clear()
+        self._size = 0
+
+    def clear(self):
+        with self._lock:
+            self._drop_all()
+            self._version = None
+
+    def stats(self) -> Dict:
+        """Contatori per diagnostica (pagine, byte, hit/miss)."""
+        with self._lock:
+            return {
+                'pages': len(self._pages),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
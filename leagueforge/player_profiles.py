@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - Profili giocatore precalcolati
+============================================
+
+Il profilo di /player/<membership> è un documento (dict) calcolato una volta
+e servito finché i dati del giocatore non cambiano.
+
+- ProfileIndex: costruito UNA volta per snapshot. Righe Results per
+  membership (ResultsTable.by_member), TCG dal foglio Players, achievement
+  sbloccati per membership, definizioni achievement, stato stagioni.
+  Nessuno scan di Players / Player_Achievements per richiesta.
+- build_profile(): documento del giocatore, stessi campi di player.html.
+- ProfileStore: documenti in memoria. A ogni snapshot nuovo si scartano
+  solo i documenti dei giocatori i cui dati sono cambiati (confronto tra
+  il ProfileIndex vecchio e il nuovo), chiunque se ne accorga per primo:
+  una richiesta /player, il refresh in background o apply_invalidations.
+  Si svuota tutto solo se cambiano definizioni achievement o stato stagioni.
+
+UTILIZZO:
+    from player_profiles import profiles
+    doc = profiles.get(cache, '0000012345')         # None se senza risultati
+    profiles.refresh_players(cache, memberships)    # dopo un import
+"""
+
+import statistics
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sheet_utils import (
+    COL_PLAYERS, COL_ACHIEVEMENT_DEF, COL_PLAYER_ACH,
+    safe_get, safe_int
+)
+
+# Fogli dello snapshot letti dai profili (oltre a Config per lo stato stagioni)
+PROFILE_SHEETS = ("Results", "Players", "Achievement_Definitions", "Player_Achievements")
+
+
+class ProfileIndex:
+    """
+    Indici dello snapshot per i profili giocatore.
+
+    Args:
+        table: ResultsTable dello snapshot
+        players_rows: Righe Players senza header
+        definition_rows: Righe Achievement_Definitions senza header
+        unlocked_rows: Righe Player_Achievements senza header
+        seasons: data['seasons'] dello snapshot
+    """
+
+    def __init__(self, table, players_rows, definition_rows, unlocked_rows, seasons):
+        self.table = table
+
+        # TCG del giocatore: prima riga Players con quella membership
+        self.tcg_by_member: Dict[str, str] = {}
+        for row in players_rows:
+            membership = safe_get(row, COL_PLAYERS, 'membership')
+            if membership and membership not in self.tcg_by_member:
+                self.tcg_by_member[membership] = safe_get(row, COL_PLAYERS, 'tcg', 'OP')
+
+        self.achievement_defs: Dict[str, Dict] = {}
+        for row in definition_rows:
+            ach_id = safe_get(row, COL_ACHIEVEMENT_DEF, 'achievement_id')
+            if ach_id:
+                self.achievement_defs[ach_id] = {
+                    'name': safe_get(row, COL_ACHIEVEMENT_DEF, 'name'),
+                    'description': safe_get(row, COL_ACHIEVEMENT_DEF, 'description'),
+                    'category': safe_get(row, COL_ACHIEVEMENT_DEF, 'category'),
+                    'rarity': safe_get(row, COL_ACHIEVEMENT_DEF, 'rarity'),
+                    'emoji': safe_get(row, COL_ACHIEVEMENT_DEF, 'emoji'),
+                    'points': safe_int(row, COL_ACHIEVEMENT_DEF, 'points', 0)
+                }
+
+        # Achievement sbloccati: (achievement_id, unlocked_date) in ordine di foglio
+        self.unlocked_by_member: Dict[str, List[Tuple[str, str]]] = {}
+        for row in unlocked_rows:
+            membership = safe_get(row, COL_PLAYER_ACH, 'membership')
+            if membership:
+                self.unlocked_by_member.setdefault(membership, []).append((
+                    safe_get(row, COL_PLAYER_ACH, 'achievement_id'),
+                    safe_get(row, COL_PLAYER_ACH, 'unlocked_date', '')
+                ))
+
+        self.season_status = {s.get('id'): s.get('status', '') for s in seasons}
+
+    def member_signature(self, membership: str) -> Tuple:
+        """Dati del giocatore letti da build_profile, per confrontare due snapshot."""
+        table = self.table
+        rows = tuple(
+            (table.tid_of(i), table.name_of(i), table.rank[i], table.win_points[i],
+             table.points_total[i], table.match_record(i))
+            for i in table.rows_for_member(membership)
+        )
+        return (rows, self.tcg_by_member.get(membership),
+                tuple(self.unlocked_by_member.get(membership, ())))
+
+    @classmethod
+    def from_cache(cls, cache):
+        """Indice dallo snapshot SheetCache corrente."""
+        data, err, meta = cache.get_data()
+        if not data:
+            raise RuntimeError(err or 'Cache non disponibile')
+        return cls(
+            cache.results_table(),
+            cache.get_sheet_rows("Players")[3:],
+            cache.get_sheet_rows("Achievement_Definitions")[4:],
+            cache.get_sheet_rows("Player_Achievements")[4:],
+            data.get('seasons', []),
+        )
+
+
+def snapshot_key(cache) -> Tuple:
+    """
+    Versione dei dati dei profili: fingerprint dei fogli + stato stagioni.
+
+    Returns:
+        tuple: (fingerprint per foglio, stato stagioni); cambia quando cambia
+        qualsiasi dato usato da build_profile
+    """
+    data, err, meta = cache.get_data()
+    seasons = (data or {}).get('seasons', [])
+    status = tuple(sorted((str(s.get('id')), str(s.get('status', ''))) for s in seasons))
+    return tuple(cache.sheet_fingerprint(name) for name in PROFILE_SHEETS), status
+
+
+def build_profile(index: ProfileIndex, membership: str) -> Optional[Dict]:
+    """
+    Documento profilo del giocatore (campi usati da player.html).
+
+    Una sola passata sulle righe del giocatore per contatori, punti, match
+    record e distribuzione ranking.
+
+    Returns:
+        dict | None: None se il giocatore non ha risultati
+    """
+    table = index.table
+    player_rows = table.rows_for_member(membership)
+    if not player_rows:
+        return None
+
+    tournaments_played = len(player_rows)
+    points = []
+    total_wins = 0.0
+    first_seen = None
+    rank_counts = {'first': 0, 'second': 0, 'third': 0, 'top8': 0, 'other': 0}
+    total_match_w = total_match_t = total_match_l = 0
+    has_match_data = False
+    top8_count = 0
+    best_rank = None
+    for i in player_rows:
+        rk = table.rank[i]
+        points.append(table.points_total[i])
+        total_wins += table.win_points[i] / 3
+        if best_rank is None or rk < best_rank:
+            best_rank = rk
+        if rk <= 8:
+            top8_count += 1
+        if rk == 1:
+            rank_counts['first'] += 1
+        elif rk == 2:
+            rank_counts['second'] += 1
+        elif rk == 3:
+            rank_counts['third'] += 1
+        elif 4 <= rk <= 8:
+            rank_counts['top8'] += 1
+        elif 8 < rk < 999:  # 999 = rank mancante
+            rank_counts['other'] += 1
+        date_str = table.tournament_of(i).date_str
+        if first_seen is None or date_str < first_seen:
+            first_seen = date_str
+        match = table.match_record(i)
+        if match:
+            total_match_w += match[0]
+            total_match_t += match[1]
+            total_match_l += match[2]
+            has_match_data = True
+
+    tournament_wins = rank_counts['first']
+    avg_points = sum(points) / tournaments_played
+
+    # Win Rate (assumendo 4 round medi)
+    win_rate = total_wins / (tournaments_played * 4) * 100
+    top8_rate = top8_count / tournaments_played * 100
+
+    # Trend (ultimi 2 vs precedenti)
+    if len(points) >= 3:
+        recent = sum(points[-2:]) / 2
+        older = sum(points[:-2]) / len(points[:-2])
+        trend = ((recent - older) / older * 100) if older > 0 else 0
+    else:
+        trend = 0
+
+    # Storico tornei (ultimi 10, più recente prima)
+    history = []
+    for i in player_rows[-10:]:
+        tournament = table.tournament_of(i)
+        season_id = tournament.season_id if '_' in tournament.tid else ''
+
+        # Record W-T-L (Pokemon/Riftbound con pareggi) o W-L (One Piece)
+        match = table.match_record(i)
+        if match:
+            match_w, match_t, match_l = match
+            record = f"{match_w}-{match_t}-{match_l}" if match_t > 0 else f"{match_w}-{match_l}"
+        else:
+            # Dati vecchi senza Match_W/T/L: approssima da Win_Points (W*3 + T*1)
+            record = f"{int(table.win_points[i] / 3)}-?"
+
+        history.append({
+            'date': tournament.date_str,
+            'season': season_id,
+            'season_status': index.season_status.get(season_id, ''),
+            'rank': table.rank[i],
+            'points': table.points_total[i],
+            'record': record
+        })
+    history.reverse()
+
+    # Radar (5 metriche normalizzate 0-100)
+    victory_rate = tournament_wins / tournaments_played * 100
+    avg_performance = min(100, (avg_points / 25 * 100)) if avg_points > 0 else 0
+    if len(points) > 1:
+        # Stabilità: deviazione standard 10 = 0%
+        consistency = max(0, (1 - statistics.stdev(points) / 10) * 100)
+    else:
+        consistency = 100  # Un solo torneo: "perfettamente consistente"
+
+    achievements_unlocked = []
+    achievement_points = 0
+    for ach_id, unlocked_date in index.unlocked_by_member.get(membership, ()):
+        ach_info = index.achievement_defs.get(ach_id)
+        if ach_info is None:
+            continue
+        achievements_unlocked.append({
+            'id': ach_id,
+            'name': ach_info['name'],
+            'description': ach_info['description'],
+            'category': ach_info['category'],
+            'rarity': ach_info['rarity'],
+            'emoji': ach_info['emoji'],
+            'points': ach_info['points'],
+            'unlocked_date': unlocked_date
+        })
+        achievement_points += ach_info['points']
+
+    return {
+        'membership': membership,
+        'name': table.name_of(player_rows[0]),
+        'tcg': index.tcg_by_member.get(membership, 'OP'),
+        'first_seen': first_seen,
+        'tournaments_played': tournaments_played,
+        'tournament_wins': tournament_wins,
+        'top8_count': top8_count,
+        'avg_points': round(avg_points, 1),
+        'best_rank': best_rank,
+        'win_rate': round(win_rate, 1),
+        'top8_rate': round(top8_rate, 1),
+        'trend': round(trend, 1),
+        'history': history,
+        'chart_labels': [h['date'] for h in history[::-1]],
+        'chart_data': [h['points'] for h in history[::-1]],
+        'achievements': achievements_unlocked,
+        'achievement_points': achievement_points,
+        'match_record': {
+            'wins': total_match_w,
+            'ties': total_match_t,
+            'losses': total_match_l,
+            'has_data': has_match_data
+        },
+        'ranking_dist': rank_counts,
+        'radar_data': {
+            'win_rate': round(win_rate, 1),
+            'top8_rate': round(top8_rate, 1),
+            'victory_rate': round(victory_rate, 1),
+            'avg_performance': round(avg_performance, 1),
+            'consistency': round(consistency, 1)
+        }
+    }
+
+
+class ProfileStore:
+    """
+    Documenti profilo in memoria, validi per una versione dello snapshot.
+
+    I documenti non vanno modificati da chi li riceve (condivisi tra richieste).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key = None
+        self._index: Optional[ProfileIndex] = None
+        self._docs: Dict[str, Dict] = {}
+
+    def _sync(self, cache):
+        """
+        Allinea indice e documenti allo snapshot corrente (lock già preso).
+
+        Se definizioni achievement e stato stagioni non cambiano si scartano
+        solo i documenti dei giocatori con dati diversi nel nuovo indice
+        (tornei, righe Results, TCG, achievement sbloccati), altrimenti tutti.
+        """
+        key = snapshot_key(cache)
+        if key == self._key and self._index is not None:
+            return
+        old_key, old_index = self._key, self._index
+        self._index = ProfileIndex.from_cache(cache)
+        self._key = key
+        # Definizioni achievement e stato stagioni valgono per tutti i profili
+        same_globals = (old_index is not None and old_key[0][2] == key[0][2]
+                        and old_key[1] == key[1])
+        if not same_globals:
+            self._docs.clear()
+            return
+        for membership in list(self._docs):
+            if old_index.member_signature(membership) != self._index.member_signature(membership):
+                del self._docs[membership]
+
+    def get(self, cache, membership: str) -> Optional[Dict]:
+        """Profilo del giocatore (None se senza risultati nello snapshot)."""
+        with self._lock:
+            self._sync(cache)
+            doc = self._docs.get(membership)
+            if doc is None:
+                # Membership sconosciute non salvate (vedi negative cache in app.py)
+                doc = build_profile(self._index, membership)
+                if doc is not None:
+                    self._docs[membership] = doc
+            return doc
+
+    def refresh_players(self, cache, memberships: Iterable[str]) -> int:
+        """
+        Dopo un import: calcola subito i profili dei giocatori dell'evento
+        non ancora in memoria (quelli cambiati sono già stati scartati da
+        _sync, anche se una richiesta ha visto lo snapshot per prima).
+
+        Returns:
+            int: Profili ricalcolati
+        """
+        memberships = list(dict.fromkeys(memberships))
+        rebuilt = 0
+        with self._lock:
+            self._sync(cache)
+            for membership in memberships:
+                if membership in self._docs:
+                    continue
+                doc = build_profile(self._index, membership)
+                if doc is not None:
+                    self._docs[membership] = doc
+                    rebuilt += 1
+        return rebuilt
+
+    def clear(self):
+        with self._lock:
+            self._key = None
+            self._index = None
+            self._docs.clear()
+
+
+# Istanza globale (webapp)
+profiles = ProfileStore()
@@ -23,26 +23,26 @@ from collections import defaultdict
 
 try:
     import gspread
-    from google.oauth2.service_account import Credentials
 except ImportError:
     print("❌ Moduli mancanti. Esegui: pip install gspread google-auth")
     sys.exit(1)
 
 try:
-    from config import SHEET_ID, CREDENTIALS_FILE
+    # Solo verifica che config.py esista: SHEET_ID e CREDENTIALS_FILE li
+    # legge sheet_connection.get_spreadsheet()
+    import config  # noqa: F401
 except ImportError:
     print("❌ config.py non trovato. Copia config_example.py e configura.")
     sys.exit(1)
 
+from sheet_connection import get_spreadsheet
+
 from sheet_utils import (
-    COL_RESULTS, COL_CONFIG, COL_PLAYER_STATS,
-    safe_get, safe_int, safe_float, validate_sheet_headers
+    COL_CONFIG, COL_PLAYER_STATS,
+    safe_get, validate_sheet_headers
 )
+from results_table import load_results_table
 
-SCOPES = [
-    'https://www.googleapis.com/auth/spreadsheets',
-    'https://www.googleapis.com/auth/drive'
-]
 
 # Header del foglio Player_Stats
 PLAYER_STATS_HEADER = [
@@ -54,9 +54,7 @@ PLAYER_STATS_HEADER = [
 
 def connect_sheet():
     """Connette al Google Sheet."""
-    creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID)
+    return get_spreadsheet()
 
 
 def get_tcg_from_season(season_id: str) -> str:
@@ -79,9 +77,8 @@ def rebuild_stats(sheet, test_mode=False):
         int: Numero di righe scritte
     """
     print("📊 Lettura Results...")
-    ws_results = sheet.worksheet("Results")
-    all_results = ws_results.get_all_values()[3:]  # Skip header
-    print(f"   Trovate {len(all_results)} righe")
+    table = load_results_table(sheet)
+    print(f"   Trovate {len(table)} righe")
 
     # Aggrega stats per membership + tcg (INCLUDE stagioni ARCHIVED per stats lifetime)
     print("🧮 Calcolo statistiche...")
@@ -95,35 +92,28 @@ def rebuild_stats(sheet, test_mode=False):
         'total_points': 0
     })
 
-    for row in all_results:
-        tournament_id = safe_get(row, COL_RESULTS, 'tournament_id', '')
-        # Estrai season_id da tournament_id (es. "OP12_20251113" -> "OP12")
-        season_id = tournament_id.split('_')[0] if tournament_id and '_' in tournament_id else ''
+    # Righe già raggruppate per giocatore dall'indice della tabella
+    for membership, indices in table.by_member.items():
+        for i in indices:
+            tournament_id = table.tid_of(i)
+            season_id = table.season_of(i) if '_' in tournament_id else ''
 
-        membership = safe_get(row, COL_RESULTS, 'membership')
-        if not membership:
-            continue
+            tcg = get_tcg_from_season(season_id)
+            rank = table.rank[i]
 
-        tcg = get_tcg_from_season(season_id)
-        key = (membership, tcg)
-        rank = safe_int(row, COL_RESULTS, 'rank', 999)
-        name = safe_get(row, COL_RESULTS, 'name', '')
+            data = player_data[(membership, tcg)]
+            data['name'] = table.name_of(i)
+            data['tournaments'].append(tournament_id)
+            data['seasons'].add(season_id)
+            data['results_by_tournament'].append((tournament_id, rank))
 
-        data = player_data[key]
-        if name:
-            data['name'] = name
-        data['tournaments'].append(tournament_id)
-        data['seasons'].add(season_id)
-        data['results_by_tournament'].append((tournament_id, rank))
-
-        if rank == 1:
-            data['wins'] += 1
-        if rank <= 8:
-            data['top8'] += 1
+            if rank == 1:
+                data['wins'] += 1
+            if rank <= 8:
+                data['top8'] += 1
 
-        # Accumula total_points
-        points_total = safe_float(row, COL_RESULTS, 'points_total', 0)
-        data['total_points'] += points_total
+            # Accumula total_points
+            data['total_points'] += table.points_total[i]
 
     print(f"   Giocatori unici: {len(player_data)}")
 
@@ -148,19 +138,9 @@ def rebuild_stats(sheet, test_mode=False):
 
         # Ultimo risultato
         last_tournament, last_rank = sorted_results[-1] if sorted_results else ('', 999)
-        # Estrai data da tournament_id (formato: "OP11_20250619" o "OP11_2025-06-19")
-        last_date = ''
-        if last_tournament and '_' in last_tournament:
-            date_part = last_tournament.split("_")[1]
-            # Caso 1: Formato ISO con trattini (2025-06-19)
-            if len(date_part) == 10 and date_part[4] == '-' and date_part[7] == '-':
-                last_date = date_part
-            # Caso 2: Formato compatto (20250619)
-            elif len(date_part) == 8 and date_part.isdigit():
-                try:
-                    last_date = f"{date_part[:4]}-{date_part[4:6]}-{date_part[6:8]}"
-                except:
-                    pass
+        # Data dalla dimensione tornei ("OP11_20250619" o "OP11_2025-06-19" -> 2025-06-19)
+        last_info = table.tournaments.get(last_tournament)
+        last_date = last_info.date.strftime('%Y-%m-%d') if last_info and last_info.date else ''
 
         row = [
             membership,
@@ -1,19 +1,15 @@
 #!/usr/bin/env python3
 """Ricostruisce Players da Results (FIXED)"""
-import gspread
-from google.oauth2.service_account import Credentials
 from sheet_utils import COL_RESULTS, safe_get, safe_int, safe_float
 from api_utils import safe_api_call
+from results_table import parse_tournament_id
 import time
 
 print("🔧 REBUILD PLAYERS da Results (VERSIONE CORRETTA)...")
 
-from config import SHEET_ID, CREDENTIALS_FILE
+from sheet_connection import get_spreadsheet
 
-scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=scope)
-client = gspread.authorize(creds)
-sheet = client.open_by_key(SHEET_ID)
+sheet = get_spreadsheet()
 
 ws_results = sheet.worksheet("Results")
 print("  📖 Lettura Results...")
@@ -33,7 +29,9 @@ for row in all_results:
     tid = safe_get(row, COL_RESULTS, 'tournament_id')
     name = safe_get(row, COL_RESULTS, 'name')
 
-    tcg = ''.join(c for c in tid.split('_')[0] if c.isalpha()).upper() if tid else ''
+    # Stagione/TCG/data parsati una volta per torneo (memoizzato)
+    tournament = parse_tournament_id(tid) if tid else None
+    tcg = tournament.tcg if tournament else ''
 
     if not membership or not tcg:
         continue
@@ -68,7 +66,7 @@ for row in all_results:
     stats['match_l'] += safe_int(row, COL_RESULTS, 'match_l', 0)
     stats['total_points'] += safe_float(row, COL_RESULTS, 'points_total', 0)
 
-    date = tid.split('_')[1] if '_' in tid else ''
+    date = tournament.date_str
     if date:
         if not stats['first_seen'] or date < stats['first_seen']:
             stats['first_seen'] = date
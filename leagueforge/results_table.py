@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - Tabella Results colonnare
+=======================================
+
+Results letto UNA volta e tenuto in memoria per colonne (array tipizzati)
+con indici per giocatore, torneo, stagione e TCG. Sostituisce i parsing ad
+hoc delle righe grezze in stats_builder, achievements, import_base,
+rebuild_player_stats e nella route /player.
+
+- Colonne numeriche in array('i') / array('d'): ~4-8 byte per valore invece
+  di una stringa + dict per riga
+- Stringhe ripetute (tournament_id, membership, nome) salvate una volta
+  sola in tabelle dimensione; le colonne contengono solo codici interi
+- Indici prebuilt: lookup per giocatore o stagione O(k) invece di O(N)
+- Dimensione tornei (table.tournaments): stagione, TCG, data e partecipanti
+  per tournament_id, calcolata una volta per tabella; la data si parsa una
+  volta per torneo, non per riga
+
+UTILIZZO:
+    table = ResultsTable(rows[3:])          # righe Results senza header
+    for i in table.rows_for_member('0000012345'):
+        table.rank[i], table.points_total[i], table.tid_of(i)
+
+    # Import scripts: una lettura per processo, condivisa tra le fasi
+    table = load_results_table(sheet)
+    invalidate_results_table()              # dopo aver scritto su Results
+
+    t = table.tournaments['OP12_2025-01-15']
+    t.season_id, t.tcg, t.date, t.date_str, t.participants
+"""
+
+import hashlib
+from array import array
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sheet_utils import COL_RESULTS
+
+# Valore per celle Match_W/T/L vuote (dati vecchi senza record partite)
+MISSING = -1
+
+_EMPTY = array('i')
+
+
+def _to_float(x, default=0.0):
+    try:
+        s = str(x).strip()
+        if s.endswith('%'):
+            s = s[:-1]
+        return float(s.replace(',', '.'))
+    except (ValueError, TypeError):
+        return default
+
+
+def _to_int(x, default=0):
+    try:
+        return int(float(str(x).replace(',', '.').strip()))
+    except (ValueError, TypeError):
+        return default
+
+
+def season_from_tid(tid: str) -> str:
+    """Season ID dal tournament ID (es. 'OP12_2025-01-15' -> 'OP12')."""
+    return tid.split('_')[0] if '_' in tid else tid
+
+
+def tcg_from_season(season_id: str) -> str:
+    """Lettere iniziali del season ID (es. 'OP12' -> 'OP', 'PKM-FS25' -> 'PKM')."""
+    prefix = ''
+    for ch in str(season_id):
+        if ch.isalpha():
+            prefix += ch
+        else:
+            break
+    return prefix.upper()
+
+
+# Formati data accettati nella parte dopo '_' del tournament ID
+TID_DATE_FORMATS = ('%Y%m%d', '%Y-%m-%d', '%d%m%Y', '%Y.%m.%d')
+
+
+class TournamentInfo(NamedTuple):
+    """Riga della dimensione tornei."""
+    tid: str
+    season_id: str
+    tcg: str
+    date_str: str               # testo dopo '_' (es. '2025-01-15'), '' se assente
+    date: Optional[datetime]    # date_str parsata, None se formato sconosciuto
+    participants: int = 0
+
+
+@lru_cache(maxsize=65536)
+def parse_tournament_id(tid: str) -> TournamentInfo:
+    """
+    Stagione, TCG e data dal tournament ID (memoizzato: un parsing per ID).
+
+    'OP12_2025-01-15' -> season 'OP12', tcg 'OP', date_str '2025-01-15',
+    date datetime(2025, 1, 15). participants resta 0: dipende da Results
+    (vedi ResultsTable.tournaments).
+    """
+    tid = str(tid)
+    season_id = season_from_tid(tid)
+    date_str = tid.split('_')[1] if '_' in tid else ''
+    date = None
+    if '_' in tid:
+        part = tid.split('_', 1)[1]
+        for fmt in TID_DATE_FORMATS:
+            try:
+                date = datetime.strptime(part, fmt)
+                break
+            except ValueError:
+                pass
+    return TournamentInfo(tid, season_id, tcg_from_season(season_id), date_str, date)
+
+
+class ResultsTable:
+    """
+    Results in colonne con indici per membership, tournament_id, stagione, TCG.
+
+    Righe senza tournament_id o membership vengono scartate. La membership è
+    salvata così com'è nel foglio (già zero-padded dagli import).
+    """
+
+    def __init__(self, rows: Iterable[List[str]] = ()):
+        # Dimensioni: codice -> valore
+        self.tournament_ids: List[str] = []
+        self.tournament_seasons: List[str] = []
+        self.memberships: List[str] = []
+        self.names: List[str] = []
+
+        # Colonne (una entry per riga valida)
+        self.tournament_code = array('i')
+        self.member_code = array('i')
+        self.name_code = array('i')
+        self.rank = array('i')
+        self.win_points = array('d')
+        self.omw = array('d')
+        self.points_victory = array('d')
+        self.points_ranking = array('d')
+        self.points_total = array('d')
+        self.match_w = array('i')
+        self.match_t = array('i')
+        self.match_l = array('i')
+
+        # Indici: chiave -> array di indici riga (ordine del foglio)
+        self.by_member: Dict[str, array] = {}
+        self.by_tournament: Dict[str, array] = {}
+        self.by_season: Dict[str, array] = {}
+        self.by_tcg: Dict[str, array] = {}
+
+        self._digest: Optional[str] = None
+        self._tournaments: Optional[Dict[str, TournamentInfo]] = None
+        self._tournament_codes: Dict[str, int] = {}
+        self._tournament_tcgs: List[str] = []
+        self._member_codes: Dict[str, int] = {}
+        self._name_codes: Dict[str, int] = {}
+
+        for row in rows:
+            self.append_row(row)
+
+    def __len__(self):
+        return len(self.rank)
+
+    # Colonne e dimensioni: il resto (mappe dei codici, indici, dimensione
+    # tornei) si ricava da queste
+    _PICKLED = ('tournament_ids', 'tournament_seasons', 'memberships', 'names',
+                'tournament_code', 'member_code', 'name_code', 'rank', 'win_points', 'omw',
+                'points_victory', 'points_ranking', 'points_total', 'match_w', 'match_t',
+                'match_l', '_tournament_tcgs', '_digest')
+
+    def __getstate__(self):
+        """Solo colonne e dimensioni: pochi ms per passare la tabella a un processo worker."""
+        return {name: getattr(self, name) for name in self._PICKLED}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tournaments = None
+        self._tournament_codes = {tid: code for code, tid in enumerate(self.tournament_ids)}
+        self._member_codes = {m: code for code, m in enumerate(self.memberships)}
+        self._name_codes = {name: code for code, name in enumerate(self.names)}
+        self.by_member, self.by_tournament, self.by_season, self.by_tcg = {}, {}, {}, {}
+        for i, (t_code, m_code) in enumerate(zip(self.tournament_code, self.member_code)):
+            for index, key in ((self.by_member, self.memberships[m_code]),
+                               (self.by_tournament, self.tournament_ids[t_code]),
+                               (self.by_season, self.tournament_seasons[t_code]),
+                               (self.by_tcg, self._tournament_tcgs[t_code])):
+                bucket = index.get(key)
+                if bucket is None:
+                    bucket = index[key] = array('i')
+                bucket.append(i)
+
+    # ------------------------------------------------------------------
+    # Costruzione
+    # ------------------------------------------------------------------
+
+    def _code(self, codes, values, value):
+        code = codes.get(value)
+        if code is None:
+            code = len(values)
+            codes[value] = code
+            values.append(value)
+        return code
+
+    def append_row(self, row: List[str]) -> Optional[int]:
+        """Aggiunge una riga grezza di Results; ritorna l'indice o None se scartata."""
+        if not row:
+            return None
+        tid = row[COL_RESULTS['tournament_id']] if len(row) > COL_RESULTS['tournament_id'] else ''
+        membership = row[COL_RESULTS['membership']] if len(row) > COL_RESULTS['membership'] else ''
+        if not tid or not membership:
+            return None
+
+        def cell(key):
+            idx = COL_RESULTS[key]
+            return row[idx] if idx < len(row) else ''
+
+        t_code = self._tournament_codes.get(tid)
+        if t_code is None:
+            info = parse_tournament_id(tid)
+            t_code = self._code(self._tournament_codes, self.tournament_ids, tid)
+            self.tournament_seasons.append(info.season_id)
+            self._tournament_tcgs.append(info.tcg)
+        m_code = self._code(self._member_codes, self.memberships, membership)
+        n_code = self._code(self._name_codes, self.names, cell('name') or membership)
+
+        i = len(self.rank)
+        self._digest = None
+        self.tournament_code.append(t_code)
+        self.member_code.append(m_code)
+        self.name_code.append(n_code)
+        self.rank.append(_to_int(cell('rank'), 999) if cell('rank') else 999)
+        self.win_points.append(_to_float(cell('win_points')))
+        self.omw.append(_to_float(cell('omw')))
+        self.points_victory.append(_to_float(cell('points_victory')))
+        self.points_ranking.append(_to_float(cell('points_ranking')))
+        self.points_total.append(_to_float(cell('points_total')))
+        for column, key in ((self.match_w, 'match_w'), (self.match_t, 'match_t'), (self.match_l, 'match_l')):
+            column.append(_to_int(cell(key), MISSING) if cell(key) else MISSING)
+
+        if self._tournaments is not None:
+            # Dimensione già costruita: aggiornata sul posto (fold incrementali)
+            entry = self._tournaments.get(tid) or parse_tournament_id(tid)
+            field = int(max(0, self.points_ranking[i] + self.rank[i] - 1))
+            if tid not in self._tournaments or field > entry.participants:
+                self._tournaments[tid] = entry._replace(participants=max(field, entry.participants))
+        for index, key in ((self.by_member, membership), (self.by_tournament, tid),
+                           (self.by_season, self.tournament_seasons[t_code]),
+                           (self.by_tcg, self._tournament_tcgs[t_code])):
+            bucket = index.get(key)
+            if bucket is None:
+                bucket = index[key] = array('i')
+            bucket.append(i)
+        return i
+
+    def digest(self) -> str:
+        """
+        Versione del contenuto (hash delle colonne e delle dimensioni).
+
+        Dipende solo dai valori letti, non da come il foglio è stato
+        scaricato (get_all_values dell'import o snapshot della webapp):
+        stessi dati Results → stesso digest in entrambi i processi.
+        Calcolato una volta finché non si aggiungono righe.
+        """
+        if self._digest is None:
+            self._digest = self.prefix_digest(len(self))
+        return self._digest
+
+    def prefix_digest(self, n_rows: int) -> str:
+        """
+        Digest delle prime n_rows righe, uguale a digest() della tabella che
+        aveva solo quelle righe.
+
+        I codici delle dimensioni sono assegnati in ordine di prima
+        comparsa: le righe in coda non cambiano codici né valori del
+        prefisso. Usato per verificare che un import abbia solo aggiunto
+        righe (StatsState.update).
+        """
+        n_rows = min(n_rows, len(self))
+        h = hashlib.sha1()
+        for values, codes in ((self.tournament_ids, self.tournament_code),
+                              (self.memberships, self.member_code),
+                              (self.names, self.name_code)):
+            used = max(codes[:n_rows]) + 1 if n_rows else 0
+            h.update('\x1f'.join(values[:used]).encode('utf-8'))
+            h.update(b'\x1e')
+        for column in (self.tournament_code, self.member_code, self.name_code, self.rank,
+                       self.win_points, self.omw, self.points_victory, self.points_ranking,
+                       self.points_total, self.match_w, self.match_t, self.match_l):
+            h.update(column[:n_rows].tobytes())
+        return h.hexdigest()[:12]
+
+    @property
+    def tournaments(self) -> Dict[str, TournamentInfo]:
+        """
+        Dimensione tornei: {tournament_id: TournamentInfo} in ordine di comparsa.
+
+        Partecipanti = max(points_ranking + rank - 1) sulle righe del torneo
+        (il foglio non salva il numero di iscritti per riga). Calcolata con
+        una passata sulle colonne alla prima richiesta; append_row la
+        aggiorna sul posto.
+        """
+        if self._tournaments is None:
+            fields = [0] * len(self.tournament_ids)
+            codes, pr, rank = self.tournament_code, self.points_ranking, self.rank
+            for i in range(len(rank)):
+                f = int(max(0, pr[i] + rank[i] - 1))
+                if f > fields[codes[i]]:
+                    fields[codes[i]] = f
+            self._tournaments = {
+                tid: parse_tournament_id(tid)._replace(participants=fields[code])
+                for code, tid in enumerate(self.tournament_ids)
+            }
+        return self._tournaments
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def rows_for_member(self, membership: str) -> array:
+        return self.by_member.get(membership, _EMPTY)
+
+    def rows_for_tournament(self, tournament_id: str) -> array:
+        return self.by_tournament.get(tournament_id, _EMPTY)
+
+    def rows_for_season(self, season_id: str) -> array:
+        return self.by_season.get(season_id, _EMPTY)
+
+    def rows_for_tcg(self, tcg: str) -> array:
+        return self.by_tcg.get(str(tcg).upper(), _EMPTY)
+
+    def rows_for_scope(self, scope: str) -> array:
+        """Righe di una stagione (es. 'OP12') o di un TCG all-time ('ALL-OP')."""
+        scope = str(scope)
+        if scope.startswith('ALL-'):
+            return self.rows_for_tcg(scope.split('-', 1)[1])
+        return self.rows_for_season(scope)
+
+    def tid_of(self, i: int) -> str:
+        return self.tournament_ids[self.tournament_code[i]]
+
+    def season_of(self, i: int) -> str:
+        return self.tournament_seasons[self.tournament_code[i]]
+
+    def tournament_of(self, i: int) -> TournamentInfo:
+        return self.tournaments[self.tournament_ids[self.tournament_code[i]]]
+
+    def membership_of(self, i: int) -> str:
+        return self.memberships[self.member_code[i]]
+
+    def name_of(self, i: int) -> str:
+        return self.names[self.name_code[i]]
+
+    def match_record(self, i: int) -> Optional[Tuple[int, int, int]]:
+        """(W, T, L) della riga, None se il foglio non ha il record partite."""
+        w, t, l = self.match_w[i], self.match_t[i], self.match_l[i]
+        if MISSING in (w, t, l):
+            return None
+        return w, t, l
+
+
+# =============================================================================
+# CONDIVISIONE TRA FASI DI IMPORT
+# =============================================================================
+
+_shared: Dict[str, ResultsTable] = {}
+
+
+def load_results_table(sheet) -> ResultsTable:
+    """
+    ResultsTable dello spreadsheet, letta una sola volta per processo.
+
+    update_players, update_seasonal_standings e gli achievement di
+    finalize_import condividono la stessa lettura. Chi scrive su Results
+    deve chiamare invalidate_results_table().
+    """
+    key = getattr(sheet, 'id', None) or str(id(sheet))
+    table = _shared.get(key)
+    if table is None:
+        from api_utils import safe_api_call
+        ws = sheet.worksheet("Results")
+        table = ResultsTable(safe_api_call(ws.get_all_values)[3:])
+        _shared[key] = table
+    return table
+
+
+def invalidate_results_table() -> None:
+    """Dimentica le tabelle condivise (Results è stato modificato)."""
+    _shared.clear()
@@ -8,6 +8,7 @@ Flask Blueprints per organizzazione modulare delle routes.
 Struttura:
 - admin.py: Route admin (login, dashboard, import)
 - achievements.py: Route achievement (catalogo, dettaglio)
+- api.py: API JSON v1 in sola lettura (/api/v1/...)
 - (public routes rimangono in app.py per ora)
 
 Usage:
@@ -27,6 +28,8 @@ def register_blueprints(app):
     """
     from routes.admin import admin_bp
     from routes.achievements import achievements_bp
+    from routes.api import api_bp
 
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(achievements_bp)
+    app.register_blueprint(api_bp, url_prefix='/api/v1')
@@ -11,6 +11,7 @@ Blueprint per le route achievement:
 from flask import Blueprint, render_template
 
 from cache import cache
+from http_cache import conditional
 from sheet_utils import (
     COL_ACHIEVEMENT_DEF, COL_PLAYER_ACH, COL_PLAYERS,
     safe_get, safe_int
@@ -29,6 +30,7 @@ achievements_bp = Blueprint('achievements', __name__, template_folder='../templa
 # =============================================================================
 
 @achievements_bp.route('/achievements')
+@conditional(lambda: cache)
 def achievements_list():
     """
     Pagina catalogo achievement completo.
@@ -54,11 +56,8 @@ def achievements_list():
         Template: achievements.html con catalogo completo
     """
     try:
-        sheet = cache.connect_sheet()
-
-        # Carica achievement definitions
-        ws_achievements = sheet.worksheet("Achievement_Definitions")
-        achievement_rows = ws_achievements.get_all_values()[4:]
+        # Carica achievement definitions (snapshot cache, nessuna API call)
+        achievement_rows = cache.get_sheet_rows("Achievement_Definitions")[4:]
 
         achievements_by_category = {}
         total_achievements = 0
@@ -88,8 +87,7 @@ def achievements_list():
             total_points += ach['points']
 
         # Calcola % di unlock per ogni achievement
-        ws_player_ach = sheet.worksheet("Player_Achievements")
-        player_ach_rows = ws_player_ach.get_all_values()[4:]
+        player_ach_rows = cache.get_sheet_rows("Player_Achievements")[4:]
 
         unlock_counts = {}
         for row in player_ach_rows:
@@ -98,8 +96,7 @@ def achievements_list():
                 unlock_counts[ach_id] = unlock_counts.get(ach_id, 0) + 1
 
         # Conta giocatori totali
-        ws_players = sheet.worksheet("Players")
-        total_players = len([r for r in ws_players.get_all_values()[3:] if safe_get(r, COL_PLAYERS, 'membership')])
+        total_players = len([r for r in cache.get_sheet_rows("Players")[3:] if safe_get(r, COL_PLAYERS, 'membership')])
 
         # Aggiungi % unlock agli achievement
         for category in achievements_by_category:
@@ -130,6 +127,7 @@ def achievements_list():
 
 
 @achievements_bp.route('/achievement/<ach_id>')
+@conditional(lambda: cache)
 def achievement_detail(ach_id):
     """
     Pagina dettaglio singolo achievement.
@@ -150,11 +148,8 @@ def achievement_detail(ach_id):
         404: Se achievement non trovato
     """
     try:
-        sheet = cache.connect_sheet()
-
-        # 1. Carica info achievement da Achievement_Definitions
-        ws_achievements = sheet.worksheet("Achievement_Definitions")
-        achievement_rows = ws_achievements.get_all_values()[4:]
+        # 1. Carica info achievement da Achievement_Definitions (snapshot cache)
+        achievement_rows = cache.get_sheet_rows("Achievement_Definitions")[4:]
 
         achievement = None
         for row in achievement_rows:
@@ -174,8 +169,7 @@ def achievement_detail(ach_id):
             return render_template('error.html', error='Achievement non trovato'), 404
 
         # 2. Carica tutti i player che hanno sbloccato questo achievement
-        ws_player_ach = sheet.worksheet("Player_Achievements")
-        player_ach_rows = ws_player_ach.get_all_values()[4:]
+        player_ach_rows = cache.get_sheet_rows("Player_Achievements")[4:]
 
         unlocks_raw = []
         for row in player_ach_rows:
@@ -187,8 +181,7 @@ def achievement_detail(ach_id):
                 })
 
         # 3. Carica nomi giocatori da Players sheet
-        ws_players = sheet.worksheet("Players")
-        players_data = ws_players.get_all_values()[3:]
+        players_data = cache.get_sheet_rows("Players")[3:]
 
         player_names = {}
         for row in players_data:
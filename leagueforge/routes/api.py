@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - API JSON v1 (sola lettura)
+========================================
+
+Blueprint per bot Discord, schermi in negozio e altri client che oggi
+leggono le pagine HTML:
+- /api/v1/seasons - Elenco stagioni
+- /api/v1/standings/<season_id> - Classifica stagione
+- /api/v1/seasons/<season_id>/tournaments - Tornei della stagione
+- /api/v1/stats/<scope>?sections=hof,pulse - Sezioni stats (stagione o ALL-<TCG>)
+- /api/v1/players/<membership> - Profilo giocatore
+
+Tutto viene dallo snapshot in memoria (SheetCache, stats_cache,
+player_profiles): nessuna chiamata a Google nella richiesta.
+
+Formato compatto: le liste sono colonnari ({"cols": [...], "rows": [[...]]})
+invece di un oggetto per riga, JSON senza spazi. Ogni risposta porta la
+versione dello snapshot ("v").
+
+Costo per richiesta ripetuta:
+- ETag / If-None-Match → 304 prima della view (http_cache.conditional)
+- altrimenti il body già serializzato e compresso (gzip, o brotli se il
+  pacchetto è installato) viene da una PageCache per versione: niente
+  json.dumps né compressione finché lo snapshot non cambia
+"""
+
+import gzip
+import json
+
+from flask import Blueprint, current_app, jsonify, request
+
+from cache import cache
+from http_cache import conditional
+from page_cache import PageCache
+from player_profiles import profiles
+from stats_builder import SECTIONS
+
+try:
+    import brotli
+except ImportError:
+    # Opzionale: senza brotli si usa solo gzip
+    brotli = None
+
+
+# =============================================================================
+# BLUEPRINT DEFINITION
+# =============================================================================
+
+api_bp = Blueprint('api_v1', __name__)
+
+# Body JSON (grezzi e compressi) per versione snapshot + URL + encoding
+_bodies = PageCache(current_version=lambda: cache.snapshot_version())
+
+# Sotto questa dimensione la compressione non conviene
+MIN_COMPRESS_BYTES = 512
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+STANDINGS_COLS = (
+    ('pos', 'position'), ('membership', 'membership'), ('name', 'name'),
+    ('points', 'points'), ('played', 'tournaments_played'),
+    ('counted', 'tournaments_counted'), ('wins', 'total_wins'),
+    ('match_wins', 'match_wins'), ('best_rank', 'best_rank'), ('top8', 'top8_count'),
+)
+TOURNAMENT_COLS = (
+    ('id', 'tournament_id'), ('date', 'date'),
+    ('participants', 'participants'), ('winner', 'winner'),
+)
+SEASON_COLS = (
+    ('id', 'id'), ('tcg', 'tcg'), ('name', 'name'),
+    ('status', 'status'), ('next_tournament', 'next_tournament'),
+)
+HISTORY_COLS = (
+    ('date', 'date'), ('season', 'season'), ('rank', 'rank'),
+    ('points', 'points'), ('record', 'record'),
+)
+ACHIEVEMENT_COLS = (
+    ('id', 'id'), ('name', 'name'), ('category', 'category'), ('rarity', 'rarity'),
+    ('emoji', 'emoji'), ('points', 'points'), ('unlocked', 'unlocked_date'),
+)
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _columns(items, cols):
+    """Lista di dict → {"cols": [...], "rows": [[...], ...]}."""
+    return {
+        'cols': [name for name, _ in cols],
+        'rows': [[item.get(key) for _, key in cols] for item in items],
+    }
+
+
+def _error(message, status):
+    return jsonify({'error': message}), status
+
+
+def _accepted_encoding():
+    """Encoding migliore accettato dal client tra br (se disponibile) e gzip."""
+    accept = request.accept_encodings
+    if brotli is not None and accept['br']:
+        return 'br'
+    if accept['gzip']:
+        return 'gzip'
+    return 'identity'
+
+
+def _compress(raw, encoding):
+    if encoding == 'br':
+        return brotli.compress(raw, quality=BROTLI_QUALITY)
+    # mtime=0: stessi bytes in tutti i worker
+    return gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _send(version, build, store=True):
+    """
+    Risposta JSON compressa, dal body in cache se già serializzato.
+
+    Args:
+        version: Versione dello snapshot letta PRIMA dei dati
+        build: Funzione che ritorna il payload (dict), chiamata solo se il
+            body non è in cache
+        store: False per risposte provvisorie (es. stats in preparazione)
+    """
+    key_version = version if store else None
+    path = request.full_path
+    encoding = _accepted_encoding()
+    body = _bodies.get(key_version, (path, encoding))
+    if body is None:
+        raw = _bodies.get(key_version, (path, 'identity'))
+        if raw is None:
+            payload = dict(build(), v=version)
+            raw = _bodies.put(key_version, (path, 'identity'),
+                              json.dumps(payload, ensure_ascii=False, separators=(',', ':')))
+        if len(raw) < MIN_COMPRESS_BYTES:
+            encoding = 'identity'
+        if encoding != 'identity':
+            body = _bodies.put(key_version, (path, encoding), _compress(raw, encoding))
+        else:
+            body = raw
+
+    response = current_app.response_class(body, mimetype='application/json')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def _snapshot():
+    """(versione, data) con la versione letta prima dei dati; data None se cache assente."""
+    version = cache.snapshot_version()
+    data, err, meta = cache.get_data()
+    return version, data, err
+
+
+def _find_season(data, season_id):
+    return next((s for s in data.get('seasons', []) if s.get('id') == season_id), None)
+
+
+# =============================================================================
+# ROUTES
+# =============================================================================
+
+@api_bp.route('/seasons')
+@conditional(lambda: cache)
+def seasons():
+    """Elenco stagioni (incluse le ARCHIVED: il filtro lo fa il client)."""
+    version, data, err = _snapshot()
+    if not data:
+        return _error(err or 'Cache non disponibile', 503)
+    return _send(version, lambda: {'seasons': _columns(data.get('seasons', []), SEASON_COLS)})
+
+
+@api_bp.route('/standings/<season_id>')
+@conditional(lambda: cache)
+def standings(season_id):
+    """Classifica della stagione nell'ordine dello snapshot (posizione crescente)."""
+    version, data, err = _snapshot()
+    if not data:
+        return _error(err or 'Cache non disponibile', 503)
+    season = _find_season(data, season_id)
+    if season is None:
+        return _error('Stagione non trovata', 404)
+
+    def build():
+        rows = data.get('standings_by_season', {}).get(season_id, []) or []
+        return {
+            'season': season_id,
+            'status': season.get('status', ''),
+            'standings': _columns(rows, STANDINGS_COLS),
+        }
+    return _send(version, build)
+
+
+@api_bp.route('/seasons/<season_id>/tournaments')
+@conditional(lambda: cache)
+def season_tournaments(season_id):
+    """Tornei della stagione (foglio Tournaments)."""
+    version, data, err = _snapshot()
+    if not data:
+        return _error(err or 'Cache non disponibile', 503)
+    if _find_season(data, season_id) is None:
+        return _error('Stagione non trovata', 404)
+
+    def build():
+        rows = data.get('tournaments_by_season', {}).get(season_id, []) or []
+        return {'season': season_id, 'tournaments': _columns(rows, TOURNAMENT_COLS)}
+    return _send(version, build)
+
+
+@api_bp.route('/stats/<scope>')
+@conditional(lambda: cache)
+def stats(scope):
+    """
+    Sezioni stats di uno scope (tutte, o ?sections=hof,pulse).
+
+    Sezioni non ancora calcolate: elencate in "pending" (build avviato in
+    background come per la pagina /stats), risposta no-store e non in cache.
+    """
+    requested = request.args.get('sections')
+    sections = [s for s in requested.split(',') if s] if requested else list(SECTIONS)
+    unknown = [s for s in sections if s not in SECTIONS]
+    if unknown:
+        return _error(f"Sezioni sconosciute: {', '.join(unknown)}", 400)
+
+    version, data, err = _snapshot()
+    if not data:
+        return _error(err or 'Cache non disponibile', 503)
+    if not len(cache.results_table().rows_for_scope(scope)):
+        return _error('Scope non valido o nessun dato', 404)
+
+    # Import locale: app importa questo blueprint
+    from app import _stats_sections
+    found = _stats_sections(scope, sections, max_age=900)
+    pending = [s for s in sections if s not in found]
+    response = _send(version, lambda: {'scope': scope, 'sections': found, 'pending': pending},
+                     store=not pending)
+    if pending:
+        response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@api_bp.route('/players/<membership>')
+@conditional(lambda: cache)
+def player(membership):
+    """Profilo giocatore (documento di player_profiles, storico e achievement colonnari)."""
+    version, data, err = _snapshot()
+    if not data:
+        return _error(err or 'Cache non disponibile', 503)
+    if not len(cache.results_table().rows_for_member(membership)):
+        return _error('Giocatore non trovato', 404)
+    doc = profiles.get(cache, membership)
+    if doc is None:
+        return _error('Giocatore non trovato', 404)
+
+    def build():
+        # chart_* e radar_data sono derivati per i grafici della pagina HTML
+        skip = ('history', 'achievements', 'chart_labels', 'chart_data', 'radar_data')
+        out = {k: v for k, v in doc.items() if k not in skip}
+        out['history'] = _columns(doc['history'], HISTORY_COLS)
+        out['achievements'] = _columns(doc['achievements'], ACHIEVEMENT_COLS)
+        return out
+    return _send(version, build)
@@ -22,24 +22,24 @@ import sys
 from pathlib import Path
 
 import gspread
-from google.oauth2.service_account import Credentials
 
 # Importa configurazione da config.py
 try:
-    from config import SHEET_ID, CREDENTIALS_FILE
+    # Solo verifica che config.py esista: SHEET_ID e CREDENTIALS_FILE li
+    # legge sheet_connection.get_spreadsheet()
+    import config  # noqa: F401
 except ImportError:
     print("❌ Errore: config.py non trovato!")
     print("   Copia config.example.py in config.py e configura i valori.")
     print("   Oppure esegui: python setup_wizard.py")
     sys.exit(1)
 
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+from sheet_connection import get_spreadsheet
+
 
 def connect_sheet():
     """Connette al Google Sheet usando credenziali da config.py"""
-    creds = Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-    client = gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID)
+    return get_spreadsheet()
 
 def get_achievement_data():
     """
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - Connessione Google Sheets condivisa
+=================================================
+
+Un solo client gspread e un solo Spreadsheet aperto per processo, riusati da
+webapp (cache, stats_builder) e import scripts.
+
+Prima ogni connect_sheet() rileggeva il file credenziali, rifaceva
+l'autorizzazione e riapriva lo spreadsheet (1 lettura metadata) ad ogni
+chiamata. Ora:
+- credenziali lette una volta per (file, scopes)
+- il client usa una AuthorizedSession (requests, keep-alive) che rinnova il
+  token OAuth solo quando è scaduto
+- lo Spreadsheet aperto viene riusato: open_by_key() solo alla prima chiamata
+
+UTILIZZO:
+    from sheet_connection import get_spreadsheet
+    sheet = get_spreadsheet()
+
+    # Solo lettura (es. backup)
+    sheet = get_spreadsheet(scopes=READONLY_SCOPES)
+
+    # Dopo un errore di connessione: forza riconnessione alla prossima chiamata
+    reset_connection()
+"""
+
+import threading
+
+import gspread
+from google.oauth2.service_account import Credentials
+
+SCOPES = [
+    'https://www.googleapis.com/auth/spreadsheets',
+    'https://www.googleapis.com/auth/drive'
+]
+
+READONLY_SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
+
+DRIVE_FILES_URL = 'https://www.googleapis.com/drive/v3/files/{}'
+
+_lock = threading.Lock()
+_clients = {}        # (credentials_file, scopes) -> gspread.Client
+_spreadsheets = {}   # (credentials_file, scopes, sheet_id) -> gspread.Spreadsheet
+_open_count = 0      # open_by_key() eseguiti (1 lettura metadata ciascuno)
+
+
+def _default_config():
+    from config import SHEET_ID, CREDENTIALS_FILE
+    return SHEET_ID, CREDENTIALS_FILE
+
+
+def get_client(scopes=None, credentials_file=None):
+    """
+    Client gspread autorizzato, creato una sola volta per (file, scopes).
+
+    Args:
+        scopes: Lista scopes OAuth (default: SCOPES)
+        credentials_file: File credenziali service account (default: config)
+
+    Returns:
+        gspread.Client
+    """
+    if credentials_file is None:
+        credentials_file = _default_config()[1]
+    key = (str(credentials_file), tuple(scopes or SCOPES))
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            creds = Credentials.from_service_account_file(key[0], scopes=list(key[1]))
+            client = gspread.authorize(creds)
+            _clients[key] = client
+        return client
+
+
+def get_spreadsheet(sheet_id=None, scopes=None, credentials_file=None):
+    """
+    Spreadsheet aperto e condiviso (open_by_key solo alla prima chiamata).
+
+    Args:
+        sheet_id: ID del Google Sheet (default: config.SHEET_ID)
+        scopes: Lista scopes OAuth (default: SCOPES)
+        credentials_file: File credenziali service account (default: config)
+
+    Returns:
+        gspread.Spreadsheet
+    """
+    global _open_count
+    if sheet_id is None or credentials_file is None:
+        default_id, default_creds = _default_config()
+        sheet_id = sheet_id or default_id
+        credentials_file = credentials_file or default_creds
+
+    client = get_client(scopes, credentials_file)
+    key = (str(credentials_file), tuple(scopes or SCOPES), sheet_id)
+
+    with _lock:
+        spreadsheet = _spreadsheets.get(key)
+        if spreadsheet is None:
+            spreadsheet = client.open_by_key(sheet_id)
+            _spreadsheets[key] = spreadsheet
+            _open_count += 1
+        return spreadsheet
+
+
+def reset_connection():
+    """Dimentica client e spreadsheet: la prossima chiamata si riconnette."""
+    with _lock:
+        _clients.clear()
+        _spreadsheets.clear()
+
+
+def open_count():
+    """Numero di open_by_key() eseguiti dal processo (per contare le API call)."""
+    return _open_count
+
+
+def get_modified_time(spreadsheet):
+    """
+    modifiedTime del file su Drive: cambia ad ogni modifica dello spreadsheet.
+
+    Una sola chiamata con risposta di poche decine di byte, usata come
+    segnale di cambiamento prima di rileggere i fogli.
+
+    Returns:
+        str: Timestamp RFC 3339 (es. '2025-01-15T20:31:07.123Z')
+    """
+    if hasattr(spreadsheet, 'get_lastUpdateTime'):
+        return spreadsheet.get_lastUpdateTime()  # gspread >= 6
+    response = spreadsheet.client.request(
+        'get', DRIVE_FILES_URL.format(spreadsheet.id),
+        params={'fields': 'modifiedTime', 'supportsAllDrives': True}
+    )
+    return response.json()['modifiedTime']
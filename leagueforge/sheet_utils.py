@@ -247,6 +247,33 @@ def validate_sheet_headers(worksheet, col_map: dict, expected_headers: list,
         if not result['valid']:
             print("ERRORI:", result['errors'])
     """
+    try:
+        all_rows = worksheet.get_all_values()
+    except Exception as e:
+        if strict:
+            raise
+        return {
+            'valid': False,
+            'errors': [f"Errore durante validazione: {str(e)}"],
+            'warnings': []
+        }
+
+    return validate_header_rows(all_rows, col_map, expected_headers,
+                                header_row_index=header_row_index, strict=strict)
+
+
+def validate_header_rows(all_rows: list, col_map: dict, expected_headers: list,
+                         header_row_index: int = 2, strict: bool = False) -> dict:
+    """
+    Come validate_sheet_headers(), ma su righe già lette (es. snapshot cache).
+
+    Args:
+        all_rows: Righe del foglio (header inclusi), come da get_all_values()
+        col_map, expected_headers, header_row_index, strict: vedi validate_sheet_headers()
+
+    Returns:
+        dict: {'valid': bool, 'errors': list, 'warnings': list}
+    """
     result = {
         'valid': True,
         'errors': [],
@@ -255,7 +282,6 @@ def validate_sheet_headers(worksheet, col_map: dict, expected_headers: list,
 
     try:
         # Leggi riga header
-        all_rows = worksheet.get_all_values()
         if len(all_rows) <= header_row_index:
             result['valid'] = False
             result['errors'].append(f"Sheet ha solo {len(all_rows)} righe, impossibile leggere header alla riga {header_row_index + 1}")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================================
+LeagueForge - Artifact stats precalcolati
+=================================================================================
+
+Le stats di uno scope (stagione o ALL-<TCG>) vengono calcolate dall'import
+(finalize_import), con la ResultsTable già in memoria, e salvate come
+artifact JSON versionati. La webapp li carica e basta: nessun build_stats
+nel percorso di una richiesta.
+
+Un artifact è valido solo se:
+- `schema` == ARTIFACT_SCHEMA (formato payload; da incrementare quando
+  cambia la struttura delle sezioni in stats_builder)
+- `results_version` == digest della ResultsTable del lettore
+  (ResultsTable.digest(): stessi dati Results → stessa versione)
+
+File: stats_artifacts/stats_<scope>.json, scrittura atomica.
+
+UTILIZZO:
+    from stats_artifacts import write_artifacts, load_artifact
+    write_artifacts(table, ['OP12', 'ALL-OP'])       # import
+    payload = load_artifact('OP12', table.digest())  # webapp, None se assente/vecchio
+
+    python stats_artifacts.py                 # tutti gli scope dal foglio Results
+    python stats_artifacts.py OP12 ALL-OP     # solo alcuni
+=================================================================================
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from stats_builder import StatsState, all_scopes
+
+# Versione del formato payload (sezioni di stats_builder.SECTIONS)
+ARTIFACT_SCHEMA = 1
+
+BASE_DIR = Path(__file__).resolve().parent / "stats_artifacts"
+
+
+def _path_for(scope: str) -> Path:
+    safe = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in str(scope))
+    return BASE_DIR / f"stats_{safe}.json"
+
+
+def _write(path: Path, artifact: Dict) -> None:
+    """Scrittura atomica: la webapp non legge mai un file troncato."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".artifact_", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def write_artifacts(table, scopes: Optional[Iterable[str]] = None) -> Dict[str, str]:
+    """
+    Calcola gli scope (una sola passata su Results) e salva un artifact per scope.
+
+    Args:
+        table: ResultsTable aggiornata (es. load_results_table(sheet) dopo l'import)
+        scopes: Scope da scrivere (default: all_scopes(table))
+
+    Returns:
+        dict: {scope: percorso file}; gli scope senza dati non vengono scritti
+    """
+    scopes = list(dict.fromkeys(str(s) for s in (all_scopes(table) if scopes is None else scopes)))
+    if not scopes:
+        return {}
+    version = table.digest()
+    state = StatsState(table, scopes)
+    written = {}
+    for scope in scopes:
+        payload = state.payload(scope)
+        if not payload:
+            continue
+        path = _path_for(scope)
+        _write(path, {
+            "schema": ARTIFACT_SCHEMA,
+            "results_version": version,
+            "scope": scope,
+            "built_at": time.time(),
+            "sections": payload,
+        })
+        written[scope] = str(path)
+    return written
+
+
+def load_artifact(scope: str, results_version: Optional[str] = None) -> Optional[Dict]:
+    """
+    Payload precalcolato di uno scope.
+
+    Args:
+        scope: Season ID o ALL-<TCG>
+        results_version: Digest della ResultsTable corrente; None = qualsiasi
+            versione (solo schema controllato)
+
+    Returns:
+        dict | None: {sezione: dati}, None se assente, illeggibile o non
+        aggiornato
+    """
+    p = _path_for(scope)
+    try:
+        artifact = json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if artifact.get("schema") != ARTIFACT_SCHEMA:
+        return None
+    if results_version is not None and artifact.get("results_version") != results_version:
+        return None
+    return artifact.get("sections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera gli artifact stats da Results')
+    parser.add_argument('scopes', nargs='*', help='Scope da calcolare (default: tutti)')
+    args = parser.parse_args()
+
+    from sheet_connection import get_spreadsheet
+    from results_table import load_results_table
+
+    print("=" * 60)
+    print("📦 STATS ARTIFACTS")
+    print("=" * 60)
+    try:
+        start = time.perf_counter()
+        table = load_results_table(get_spreadsheet())
+        written = write_artifacts(table, args.scopes or None)
+        print(f"✅ {len(written)} artifact scritti in {time.perf_counter() - start:.2f}s "
+              f"(versione Results {table.digest()})")
+    except Exception as e:
+        print(f"❌ Errore: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,23 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
-import gspread
-from google.oauth2.service_account import Credentials
+import heapq
+from functools import cached_property
+from array import array
 from collections import defaultdict, Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
-from config import SHEET_ID, CREDENTIALS_FILE
+from sheet_connection import get_spreadsheet
+from results_table import ResultsTable, load_results_table, season_from_tid, parse_tournament_id
+from cooccurrence import CoOccurrence
 
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets','https://www.googleapis.com/auth/drive']
+# NumPy opzionale: spotlights con riduzioni raggruppate sulle colonne di
+# Results. Senza NumPy si usa il calcolo per giocatore in puro Python
+# (stesso payload).
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 def _zfill(s, n=10): 
     return str(s).zfill(n)
@@ -29,15 +38,7 @@ def _to_int(x, default=0):
         return default
 
 def _parse_date_from_tid(tid):
-    if not tid or '_' not in tid:
-        return None
-    part=tid.split('_',1)[1]
-    for fmt in ('%Y%m%d','%Y-%m-%d','%d%m%Y','%Y.%m.%d'):
-        try:
-            return datetime.strptime(part, fmt)
-        except:
-            pass
-    return None
+    return parse_tournament_id(tid).date if tid else None
 
 def _tcg_from_season_id(season_id):
     pref=''
@@ -53,102 +54,602 @@ def _stdev(vals):
     if n<2:
         return 0.0
     m=sum(vals)/n
-    return (sum((v-m)**2 for v in vals)/n)**0.5
+    return (sum((v-m)*(v-m) for v in vals)/n)**0.5
 
 def _connect_sheet():
-    creds=Credentials.from_service_account_file(CREDENTIALS_FILE, scopes=SCOPES)
-    client=gspread.authorize(creds)
-    return client.open_by_key(SHEET_ID)
+    return get_spreadsheet()
 
 def _load_results(sheet):
-    ws=sheet.worksheet("Results")
-    rows=ws.get_all_values()[3:]
-    results=[]; max_field=defaultdict(int); by_date={}
-    for row in rows:
-        if not row or len(row)<10:
-            continue
-        tid=row[1]
-        if not tid:
-            continue
-        season_id = tid.split('_')[0] if '_' in tid else tid
-        membership=_zfill(row[2],10)
-        name=row[9] if len(row)>9 and row[9] else membership
-        rank=_to_int(row[3],999)
-        win_points=_to_float(row[4],0.0)
-        omw=_to_float(row[5],0.0)
-        pv=_to_float(row[6],0.0)
-        pr=_to_float(row[7],0.0)
-        pt=_to_float(row[8],0.0)
-        date=_parse_date_from_tid(tid)
-        field=int(max(0, pr+rank-1))
-        if field>max_field[tid]:
-            max_field[tid]=field
-        if tid not in by_date:
-            by_date[tid]=date
-        results.append({
-            "tid":tid,"season_id":season_id,"membership":membership,"name":name,
-            "rank":rank,"win_points":win_points,"omw":omw,"pv":pv,"pr":pr,"pt":pt,"date":date
+    return _records_and_events(load_results_table(sheet))
+
+def _parse_results(rows):
+    """Converte le righe Results (header esclusi) in records + eventi."""
+    return _records_and_events(ResultsTable(rows))
+
+def _events_from_table(table, tournament_ids=None):
+    """{tid: {date, participants}} dalla dimensione tornei della tabella (data parsata una volta per torneo)."""
+    dim=table.tournaments
+    events={}
+    for tid in (dim if tournament_ids is None else tournament_ids):
+        t=dim.get(tid) or parse_tournament_id(tid)
+        events[tid]={"date":t.date,"participants":t.participants}
+    return events
+
+def _table_record(table, i, events):
+    """Record (dict) della riga i della tabella."""
+    tid=table.tid_of(i)
+    return {
+        "tid":tid,"season_id":table.season_of(i),"membership":_zfill(table.membership_of(i),10),
+        "name":table.name_of(i),"rank":table.rank[i],"win_points":table.win_points[i],
+        "omw":table.omw[i],"pv":table.points_victory[i],"pr":table.points_ranking[i],
+        "pt":table.points_total[i],"date":events[tid]["date"],"row":i
+    }
+
+def _table_records(table, indices, events):
+    """Records (dict per riga) solo per gli indici richiesti."""
+    return [_table_record(table, i, events) for i in indices]
+
+def _records_and_events(table):
+    events=_events_from_table(table)
+    return _table_records(table, range(len(table)), events), events
+
+def _first(entry, row):
+    """Contatore con riga di prima occorrenza: gli spareggi seguono l'ordine del foglio."""
+    if entry is None:
+        return [1, row]
+    entry[0]+=1
+    return entry
+
+def _pick_max(counts):
+    """(chiave, conteggio) col conteggio massimo; a parità la prima comparsa nel foglio."""
+    if not counts:
+        return None
+    k, (c, _) = min(counts.items(), key=lambda kv: (-kv[1][0], kv[1][1]))
+    return k, c
+
+def _player_metrics(m, evts):
+    """Metriche del giocatore che dipendono solo dai suoi eventi (cache per giocatore)."""
+    names=Counter(e["name"] for e in evts)
+    name=max(names.items(), key=lambda x: x[1])[0] if names else m
+    pts=[e["pt"] for e in evts]; n=len(pts)
+    mean_pts=(sum(pts)/n) if n else 0.0
+    tot=sum(pts)
+    top8_pts=sum(e["pt"] for e in evts if e["rank"]<=8)
+
+    # Un solo ordinamento per data: fenice, fastest riser, scalata
+    evts_sorted=sorted(evts, key=lambda e: (e["date"] or datetime.min, e["tid"]))
+    pts_sorted=[e["pt"] for e in evts_sorted]
+    if len(pts_sorted)>=3:
+        recent_avg=sum(pts_sorted[-2:])/2
+        older_avg=sum(pts_sorted[:-2])/len(pts_sorted[:-2])
+        rs_score=recent_avg-older_avg
+    else:
+        rs_score=0.0
+    riser=None
+    if len(pts_sorted)>=2:
+        last3=pts_sorted[-3:] if len(pts_sorted)>=3 else pts_sorted[-2:]
+        prev=pts_sorted[:-3] if len(pts_sorted)>=4 else pts_sorted[:-2]
+        prev_mean=(sum(prev)/len(prev)) if prev else 0.0
+        riser=sum(last3)/len(last3)-prev_mean
+    scalata=(evts_sorted[0]["rank"]-evts_sorted[-1]["rank"]) if n>=3 else None
+
+    dates=[e["date"] for e in evts if e.get("date")]
+    return {
+        "name":name, "last_name":evts[-1].get("name", m) if evts else m, "events":n,
+        "mean":mean_pts, "stdev":_stdev(pts), "total":tot,
+        "closer":(top8_pts/tot) if tot>0 else 0.0, "rising":rs_score,
+        "riser":riser, "scalata":scalata,
+        "top8":sum(1 for e in evts if (e.get("rank") or 999)<=8),
+        "first_date":min(dates) if dates else None,
+    }
+
+def _np_groups(groups):
+    """Righe dei gruppi (array('i') di indici) e id gruppo per riga, per np.bincount."""
+    lengths=[len(g) for g in groups]
+    rows=np.concatenate([_np_column(g) for g in groups]) if groups else np.zeros(0, dtype=np.intp)
+    gid=np.repeat(np.arange(len(groups)), lengths)
+    return rows, gid, lengths
+
+def _np_column(col):
+    return np.frombuffer(col, dtype=col.typecode) if len(col) else np.zeros(0)
+
+def _np_player_metrics(table, groups, events):
+    """
+    _player_metrics() di più giocatori in blocco, con riduzioni raggruppate
+    sulle colonne di Results.
+
+    Le somme sono np.bincount sulle righe già nell'ordine del calcolo per
+    giocatore (foglio, o cronologico per fenice/riser): sequenziali come
+    sum(), quindi stesso risultato bit per bit. Divisioni e radici restano
+    in Python.
+
+    Args:
+        table: ResultsTable delle righe dei record
+        groups: righe (array('i')) di ogni giocatore, in ordine di foglio
+        events: {tid: {date, participants}} dello scope
+
+    Returns:
+        list: dict di metriche, uno per gruppo
+    """
+    rows, gid, lengths = _np_groups(groups)
+    G=len(groups)
+    pts=_np_column(table.points_total)[rows]
+    rank=_np_column(table.rank)[rows]
+    tcode=_np_column(table.tournament_code)[rows]
+
+    # Media, stdev (popolazione), totale, closer: ordine del foglio
+    totals=np.bincount(gid, weights=pts, minlength=G).tolist()
+    top8_pts=np.bincount(gid, weights=np.where(rank<=8, pts, 0.0), minlength=G).tolist()
+    means=[(t/n) if n else 0.0 for t, n in zip(totals, lengths)]
+    dev=pts-np.array(means)[gid]
+    sq=np.bincount(gid, weights=dev*dev, minlength=G).tolist()
+    top8=np.bincount(gid, weights=(rank<=8)&(rank!=0), minlength=G).astype(int).tolist()
+
+    # Nome più frequente (a parità il primo visto) e ultimo nome
+    ncode=_np_column(table.name_code)[rows]
+    keys=gid.astype(np.int64)*max(len(table.names), 1)+ncode
+    uniq, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    owner=uniq//max(len(table.names), 1)
+    order=np.lexsort((first, -counts, owner))
+    best=order[np.unique(owner[order], return_index=True)[1]]
+    name_of_group=[table.names[c] for c in (uniq[best]%max(len(table.names), 1)).tolist()]
+    ends=np.cumsum(lengths)
+    last_names=[table.names[c] for c in ncode[ends-1].tolist()] if G else []
+
+    # Ordine cronologico (data o datetime.min, tid) come un solo rango per torneo
+    dates=[events.get(t, {}).get("date") for t in table.tournament_ids]
+    chrono=sorted(range(len(dates)), key=lambda c: (dates[c] or datetime.min, table.tournament_ids[c]))
+    chrono_rank=np.empty(max(len(dates), 1), dtype=np.intp); chrono_rank[chrono]=np.arange(len(dates))
+    has_date=np.array([d is not None for d in dates] or [False])
+    srt=np.lexsort((np.arange(len(rows)), chrono_rank[tcode], gid))
+    s_pts=pts[srt]; s_gid=gid[srt]; s_rank=rank[srt]
+    starts=ends-np.array(lengths, dtype=np.intp)
+    from_end=ends[s_gid]-1-np.arange(len(rows))                  # 0 = evento più recente
+    n_of=np.array(lengths, dtype=np.intp)[s_gid]
+    recent=np.bincount(s_gid, weights=np.where(from_end<2, s_pts, 0.0), minlength=G).tolist()
+    older=np.bincount(s_gid, weights=np.where(from_end>=2, s_pts, 0.0), minlength=G).tolist()
+    last3=np.bincount(s_gid, weights=np.where(from_end<3, s_pts, 0.0), minlength=G).tolist()
+    prev_mask=(n_of>=3)&(from_end>=np.where(n_of>=4, 3, 2))
+    prev=np.bincount(s_gid, weights=np.where(prev_mask, s_pts, 0.0), minlength=G).tolist()
+    first_rank=s_rank[starts].tolist() if G else []
+    last_rank=s_rank[ends-1].tolist() if G else []
+    dated=np.flatnonzero(has_date[tcode[srt]])
+    first_dates={}
+    if len(dated):
+        g_dated, at = np.unique(s_gid[dated], return_index=True)
+        first_dates=dict(zip(g_dated.tolist(), (dates[c] for c in tcode[srt][dated[at]].tolist())))
+
+    out=[]
+    for g, n in enumerate(lengths):
+        t=totals[g]
+        if n>=3:
+            rs_score=recent[g]/2-older[g]/(n-2)
+        else:
+            rs_score=0.0
+        riser=None
+        if n>=2:
+            n_prev=(n-3) if n>=4 else (n-2)
+            riser=last3[g]/min(n, 3)-((prev[g]/n_prev) if n_prev else 0.0)
+        out.append({
+            "name":name_of_group[g], "last_name":last_names[g], "events":n,
+            "mean":means[g], "stdev":((sq[g]/n)**0.5 if n>=2 else 0.0), "total":t,
+            "closer":(top8_pts[g]/t) if t>0 else 0.0, "rising":rs_score,
+            "riser":riser, "scalata":(first_rank[g]-last_rank[g]) if n>=3 else None,
+            "top8":top8[g], "first_date":first_dates.get(g),
         })
-    events={tid:{"date":by_date.get(tid),"participants":p} for tid,p in max_field.items()}
-    return results, events
+    return out
+
+def _np_big_stage(table, groups, events, q3):
+    """Media punti di ogni gruppo sugli eventi con partecipanti >= q3 (media mascherata)."""
+    rows, gid, _ = _np_groups(groups)
+    G=len(groups)
+    part_by_code=np.array([events.get(t, {}).get("participants", 0) for t in table.tournament_ids] or [0])
+    mask=part_by_code[_np_column(table.tournament_code)[rows]]>=q3
+    pts=_np_column(table.points_total)[rows]
+    sums=np.bincount(gid, weights=np.where(mask, pts, 0.0), minlength=G).tolist()
+    counts=np.bincount(gid, weights=mask, minlength=G).tolist()
+    return [(s/c) if c else 0.0 for s, c in zip(sums, counts)]
+
+def _q3(participants):
+    """Quantile 0.75 'lower' dei partecipanti (soglia Big Stage)."""
+    if not participants:
+        return 0
+    if np is not None:
+        return int(np.quantile(np.array(participants), 0.75, method="lower"))
+    return sorted(participants)[int(0.75*(len(participants)-1))]
+
+def _event_metrics(recs, event):
+    """Metriche di un evento completo (punti, equilibrio, top 8)."""
+    pts=[r["pt"] for r in recs]
+    out={"avg_points":(sum(pts)/len(pts)) if pts else 0.0, "n":len(pts), "stdev":None, "gap":None, "top8":None}
+    if len(pts)>=8:
+        out["stdev"]=_stdev(pts)
+        s=sorted(pts, reverse=True); out["gap"]=s[0]-s[7]
+    top8_recs=[r for r in recs if r["rank"]<=8]
+    if top8_recs:
+        avg_wp=sum(r["win_points"] for r in top8_recs)/len(top8_recs)
+        positive=sum(1 for r in top8_recs if r["win_points"]>=avg_wp)
+        out["top8"]={"positive":positive, "score":positive*event.get("participants", 0)}
+    return out
+
+class _ScopePartial:
+    """
+    Aggregati intermedi di uno scope, aggiornabili torneo per torneo.
+
+    - record raggruppati per giocatore ed evento (ordine del foglio)
+    - co-occorrenze sparse (cooccurrence.py) per companions, rivali di podio
+      e mix top 8
+    - contatori: ranking medi per mese, noni posti, vittorie, vittorie
+      underdog, somme KPI
+    - metriche per giocatore/evento in cache: dopo un import si ricalcolano
+      solo quelle dei giocatori e dell'evento nuovi
 
-def _scope_records(res, scope):
-    if str(scope).startswith("ALL-"):
-        tcg=str(scope).split('-',1)[1].upper()
-        return [r for r in res if _tcg_from_season_id(r["season_id"])==tcg]
-    return [r for r in res if r["season_id"]==scope]
+    Una stagione si costruisce con add() + seal() durante l'unica passata su
+    Results; uno scope ALL-<TCG> è merged() delle stagioni del TCG, senza
+    rileggere le righe.
+    """
+    __slots__=("by_player","player_rows","by_event","events","month_ranks","ninth","wins","underdog",
+               "co","rp","mix","n_entries","top8_entries","omw_sum","highest",
+               "_sealed","_player_cache","_event_cache","_big","_chrono")
+
+    def __init__(self):
+        self.by_player=defaultdict(list)
+        self.player_rows=defaultdict(_row_array)   # righe di by_player (backend NumPy)
+        self.by_event=defaultdict(list)
+        self.events={}
+        self.month_ranks={}   # (anno, mese, membership) -> [somma rank, n]
+        self.ninth={}         # membership -> [n, prima riga]
+        self.wins={}
+        self.underdog={}
+        self.co=CoOccurrence()     # giocatori per evento
+        self.rp=CoOccurrence()     # podio (rank <= 3)
+        self.mix=CoOccurrence()    # top 8
+        self.n_entries=0
+        self.top8_entries=0
+        self.omw_sum=0.0
+        self.highest=None
+        self._sealed=set()
+        self._player_cache={}
+        self._event_cache={}
+        self._big=(None, {})
+        self._chrono=None
+
+    def add(self, rec, event):
+        m=rec["membership"]; row=rec["row"]
+        self.by_player[m].append(rec)
+        self.player_rows[m].append(row)
+        self.by_event[rec["tid"]].append(rec)
+        if rec["tid"] not in self.events:
+            self._chrono=None
+        self.events[rec["tid"]]=event
+        self._player_cache.pop(m, None)
+        self._big[1].pop(m, None)
+
+        self.n_entries+=1
+        if rec["rank"]<=8:
+            self.top8_entries+=1
+        self.omw_sum+=rec["omw"]
+        if self.highest is None or rec["pt"]>self.highest["pt"]:
+            self.highest=rec
+        d=rec.get("date")
+        if d:
+            key=(d.year, d.month, m)
+            acc=self.month_ranks.get(key)
+            if acc is None:
+                acc=self.month_ranks[key]=[0, 0]
+            acc[0]+=rec.get("rank") or 999; acc[1]+=1
+        if rec["rank"]==9:
+            self.ninth[m]=_first(self.ninth.get(m), row)
+        if rec["rank"]==1:
+            self.wins[m]=_first(self.wins.get(m), row)
+            if event.get("participants", 0)>=10:
+                self.underdog[m]=_first(self.underdog.get(m), row)
+
+    def seal(self):
+        """Registra nelle co-occorrenze gli eventi completi non ancora registrati."""
+        for tid, recs in self.by_event.items():
+            if tid in self._sealed:
+                continue
+            self._sealed.add(tid)
+            self._add_groups(recs)
+
+    def _add_groups(self, recs):
+        first_row=recs[0]["row"]
+        self.co.add_group(first_row, [r["membership"] for r in recs])
+        self.rp.add_group(first_row, [r["membership"] for r in recs if r["rank"]<=3])
+        self.mix.add_group(first_row, [r["membership"] for r in recs if r["rank"]<=8])
+
+    @classmethod
+    def merged(cls, parts):
+        """
+        Merge di più parziali (già sigillati) mantenendo l'ordine del foglio.
+
+        Stagioni dello stesso TCG possono essere intercalate in Results: i
+        record vengono fusi per riga e i contatori portano la riga di prima
+        comparsa, così gli spareggi sono quelli del calcolo su tutte le righe.
+        Le metriche in cache dei giocatori presenti in una sola stagione
+        vengono riusate.
+        """
+        out=cls()
+        lists=defaultdict(list)
+        for p in parts:
+            for m, evts in p.by_player.items():
+                lists[m].append((p, evts))
+        for m in sorted(lists, key=lambda m: min(v[0]["row"] for _, v in lists[m])):
+            ls=lists[m]
+            if len(ls)==1:
+                p, evts=ls[0]
+                out.by_player[m]=list(evts)
+                out.player_rows[m]=array('i', p.player_rows[m])
+                if m in p._player_cache:
+                    out._player_cache[m]=p._player_cache[m]
+            else:
+                out.by_player[m]=list(heapq.merge(*(v for _, v in ls), key=_row))
+                out.player_rows[m]=array('i', (r["row"] for r in out.by_player[m]))
+
+        for tid, recs, p in sorted(((tid, recs, p) for p in parts for tid, recs in p.by_event.items()),
+                                   key=lambda x: x[1][0]["row"]):
+            out.by_event[tid]=list(recs)
+            out.events[tid]=p.events[tid]
+            out._sealed.add(tid)
+            out._add_groups(recs)
+            if tid in p._event_cache:
+                out._event_cache[tid]=p._event_cache[tid]
+
+        for p in parts:
+            for (y, mo, m), (tot, n) in p.month_ranks.items():
+                acc=out.month_ranks.setdefault((y, mo, m), [0, 0])
+                acc[0]+=tot; acc[1]+=n
+            for name in ("ninth", "wins", "underdog"):
+                dst=getattr(out, name)
+                for k, (c, first) in getattr(p, name).items():
+                    entry=dst.get(k)
+                    if entry is None:
+                        dst[k]=[c, first]
+                    else:
+                        entry[0]+=c; entry[1]=min(entry[1], first)
+            out.n_entries+=p.n_entries
+            out.top8_entries+=p.top8_entries
+            out.omw_sum+=p.omw_sum
+            if p.highest is not None and (out.highest is None or p.highest["pt"]>out.highest["pt"]
+                                          or (p.highest["pt"]==out.highest["pt"] and p.highest["row"]<out.highest["row"])):
+                out.highest=p.highest
+        return out
 
-def _events_in_scope(events, records):
-    tids={r["tid"] for r in records}
-    return {tid: events[tid] for tid in tids if tid in events}
+    def prime_metrics(self, table):
+        """
+        Metriche dei giocatori non in cache calcolate in blocco.
 
-def _compute_for_scope(scope, res, events):
-    recs=_scope_records(res, scope)
-    evs=_events_in_scope(events, recs)
+        Con NumPy sono riduzioni raggruppate sulle colonne di `table`
+        (_np_player_metrics); senza NumPy (o senza tabella) si ricade su
+        player_metrics() giocatore per giocatore.
+        """
+        missing=[m for m in self.by_player if m not in self._player_cache]
+        if np is None or table is None or not missing:
+            return
+        metrics=_np_player_metrics(table, [self.player_rows[m] for m in missing], self.events)
+        self._player_cache.update(zip(missing, metrics))
+
+    def player_metrics(self, m):
+        metrics=self._player_cache.get(m)
+        if metrics is None:
+            metrics=self._player_cache[m]=_player_metrics(m, self.by_player[m])
+        return metrics
+
+    def event_metrics(self, tid):
+        metrics=self._event_cache.get(tid)
+        if metrics is None:
+            metrics=self._event_cache[tid]=_event_metrics(self.by_event[tid], self.events[tid])
+        return metrics
+
+    def chronology(self):
+        """Eventi (tid, data, partecipanti) in ordine cronologico, ordinati una volta sola."""
+        if self._chrono is None:
+            evlist=[(tid, e.get("date"), e["participants"]) for tid, e in self.events.items()]
+            evlist.sort(key=lambda x: (x[1] or datetime.min, x[0]))
+            self._chrono=evlist
+        return self._chrono
+
+    def big_stage(self, q3, table=None):
+        """Media punti per giocatore sugli eventi con partecipanti >= q3 (cache per q3)."""
+        cached_q3, scores=self._big
+        if cached_q3!=q3:
+            scores={}
+            self._big=(q3, scores)
+        evs=self.events
+        if np is not None and table is not None and q3>0:
+            missing=[m for m in self.by_player if m not in scores]
+            if missing:
+                scores.update(zip(missing, _np_big_stage(table, [self.player_rows[m] for m in missing], evs, q3)))
+        for m, evts in self.by_player.items():
+            if m in scores:
+                continue
+            if q3>0:
+                big_evts=[e for e in evts if evs.get(e["tid"],{}).get("participants",0)>=q3]
+                scores[m]=(sum(e["pt"] for e in big_evts)/len(big_evts)) if big_evts else 0.0
+            else:
+                scores[m]=0.0
+        return scores
+
+def _row(rec):
+    return rec["row"]
+
+def _row_array():
+    return array('i')
+
+def all_scopes(table):
+    """Tutti gli scope disponibili: ogni stagione + ALL-<TCG> (dropdown stats + landing)."""
+    seasons=list(table.by_season)
+    tcgs=dict.fromkeys(_tcg_from_season_id(s) for s in seasons if _tcg_from_season_id(s))
+    return seasons+[f"ALL-{t}" for t in tcgs]
+
+def _season_partials(table, events, seasons, indices):
+    """Aggiunge le righe `indices` ai parziali delle stagioni in `seasons` (dict)."""
+    touched=set()
+    for i in indices:
+        season_id=table.season_of(i)
+        part=seasons.get(season_id)
+        if part is None:
+            continue
+        rec=_table_record(table, i, events)
+        part.add(rec, events[rec["tid"]])
+        touched.add(season_id)
+    for season_id in touched:
+        seasons[season_id].seal()
+    return touched
+
+class StatsState:
+    """
+    Aggregati intermedi di più scope, aggiornabili dopo un import.
+
+    build_stats() ne crea uno usa-e-getta; la webapp ne tiene uno vivo e,
+    quando un import aggiunge un torneo in coda a Results, chiama update():
+    il lavoro è proporzionale al torneo nuovo, non alla storia della stagione.
+
+    UTILIZZO:
+        state = StatsState(table, all_scopes(table))
+        state.payload('OP12')
+        if not state.update(new_table, ['OP12_2025-01-22']):
+            state = StatsState(new_table, all_scopes(new_table))   # rebuild
+    """
+
+    def __init__(self, table, scopes):
+        self.scopes=list(dict.fromkeys(str(s) for s in scopes))
+        self.events=_events_from_table(table)
+        self.table=table
+        self.n_rows=len(table)
+        self.digest=table.digest()
+
+        # Una sola passata su Results per tutti gli scope (ALL-* = merge stagioni)
+        self._all_tcgs={t.split('-',1)[1].upper() for t in self.scopes if t.startswith("ALL-")}
+        wanted={t for t in self.scopes if not t.startswith("ALL-")}
+        wanted.update(s for s in table.by_season if _tcg_from_season_id(s) in self._all_tcgs)
+        self.seasons={s: _ScopePartial() for s in table.by_season if s in wanted}
+        _season_partials(table, self.events, self.seasons, range(len(table)))
+
+        self.partials={}
+        for scope in self.scopes:
+            if scope.startswith("ALL-"):
+                tcg=scope.split('-',1)[1].upper()
+                self.partials[scope]=_ScopePartial.merged([part for season_id, part in self.seasons.items()
+                                                           if _tcg_from_season_id(season_id)==tcg])
+            else:
+                self.partials[scope]=self.seasons.get(scope) or _ScopePartial()
+
+    def update(self, table, tournament_ids):
+        """
+        Aggiunge agli aggregati i tornei appena importati.
+
+        Args:
+            table: ResultsTable aggiornata (i tornei nuovi sono in coda)
+            tournament_ids: ID dei tornei aggiunti dall'import
+
+        Returns:
+            list | None: Scope toccati, None se serve un rebuild completo
+            (torneo già presente = reimport, righe non in coda, righe
+            precedenti modificate)
+        """
+        tids=list(dict.fromkeys(tournament_ids))
+        if not tids or not all(tids) or any(t in self.events for t in tids):
+            return None
+        # Le righe già aggregate devono essere identiche (digest del prefisso)
+        if len(table)<self.n_rows or table.prefix_digest(self.n_rows)!=self.digest:
+            return None
+        new_rows=sorted(i for t in tids for i in table.rows_for_tournament(t))
+        if not new_rows or new_rows!=list(range(self.n_rows, len(table))):
+            return None
+
+        new_events=_events_from_table(table, tids)
+        self.events.update(new_events)
+        for tid in tids:
+            season_id=season_from_tid(tid)
+            if season_id not in self.seasons and (season_id in self.scopes or _tcg_from_season_id(season_id) in self._all_tcgs):
+                part=self.seasons[season_id]=_ScopePartial()
+                if season_id in self.scopes:
+                    self.partials[season_id]=part
+
+        # Stesse righe nei parziali di stagione e negli ALL-<TCG>
+        touched=_season_partials(table, self.events, self.seasons, new_rows)
+        all_parts={}
+        for scope, part in self.partials.items():
+            if scope.startswith("ALL-"):
+                all_parts[scope.split('-',1)[1].upper()]=part
+        for i in new_rows:
+            part=all_parts.get(table.tournament_of(i).tcg)
+            if part is not None:
+                rec=_table_record(table, i, self.events)
+                part.add(rec, self.events[rec["tid"]])
+        for part in all_parts.values():
+            part.seal()
+
+        self.table=table
+        self.n_rows=len(table)
+        self.digest=table.digest()
+        affected=[s for s in touched if s in self.partials]
+        affected+=[f"ALL-{_tcg_from_season_id(s)}" for s in touched if f"ALL-{_tcg_from_season_id(s)}" in self.partials]
+        return list(dict.fromkeys(affected))
+
+    def payload(self, scope, sections=None):
+        """Payload stats dello scope (derivato dagli aggregati); `sections` come in build_stats."""
+        return _compute_for_scope(scope, self.partials[str(scope)], self.table, sections)
+
+    def payloads(self, scopes=None, sections=None):
+        return {scope: self.payload(scope, sections) for scope in (scopes or self.scopes)}
+
+class _ScopeView:
+    """Pezzi condivisi tra le sezioni di uno scope, calcolati al primo uso."""
+
+    def __init__(self, partial, table=None):
+        self.partial=partial
+        self.table=table
+        self.evs=partial.events
+        self.by_player=partial.by_player
+
+    @cached_property
+    def metrics(self):
+        self.partial.prime_metrics(self.table)
+        return {m: self.partial.player_metrics(m) for m in self.by_player}
+
+    @cached_property
+    def name_of(self):
+        return {m: pm["last_name"] for m, pm in self.metrics.items()}
+
+    @cached_property
+    def first_date(self):
+        return {m: pm["first_date"] for m, pm in self.metrics.items() if pm["first_date"]}
+
+    @cached_property
+    def ev_metrics(self):
+        return {tid: self.partial.event_metrics(tid) for tid in self.partial.by_event}
+
+    @cached_property
+    def spotlights(self):
+        return _section_spotlights(self)
+
+def _section_spotlights(view):
+    """Spotlights: classifiche numeriche per giocatore."""
+    evs=view.evs; by_player=view.by_player; partial=view.partial; table=view.table
 
     # spotlights (numeriche)
-    by_player=defaultdict(list)
-    for r in recs:
-        by_player[r["membership"]].append(r)
     participants=[e["participants"] for e in evs.values() if e["participants"]>0]
-    q3=sorted(participants)[int(0.75*(len(participants)-1))] if participants else 0
+    q3=_q3(participants)
+    big=partial.big_stage(q3, table)
     mvp=[]; sharp=[]; metro=[]; phoenix=[]; bigs=[]; clos=[]
     events_per_player={m:len(v) for m,v in by_player.items() if v}
     avg_events=(sum(events_per_player.values())/len(events_per_player)) if events_per_player else 1.0
-    for m,evts in by_player.items():
-        # name più frequente
-        names=[e["name"] for e in evts]
-        name = max(set(names), key=names.count) if names else m
-        pts=[e["pt"] for e in evts]; n=len(pts)
-        mean_pts=(sum(pts)/n) if n else 0.0; st=_stdev(pts)
-        mvp_score=mean_pts*((n/avg_events) if avg_events>0 else 1.0)
+    metrics=view.metrics
+    for m,pm in metrics.items():
+        name=pm["name"]; n=pm["events"]
+        mvp_score=pm["mean"]*((n/avg_events) if avg_events>0 else 1.0)
         mvp.append({"membership":m,"name":name,"score":round(mvp_score,2),"events":n})
-        sharp.append({"membership":m,"name":name,"score":round(mean_pts,2),"events":n})
-        metro.append({"membership":m,"name":name,"score":round(st,2),"events":n})
-
-        # rising_star: miglioramento ranking stagionale (placeholder per ora)
-        # Calcolo trend punti come proxy
-        evts_sorted=sorted(evts, key=lambda e: (e["date"] or datetime.min, e["tid"]))
-        pts_sorted=[e["pt"] for e in evts_sorted]
-        if len(pts_sorted)>=3:
-            recent_avg=sum(pts_sorted[-2:])/2
-            older_avg=sum(pts_sorted[:-2])/len(pts_sorted[:-2])
-            rs_score=recent_avg-older_avg
-        else:
-            rs_score=0.0
-        phoenix.append({"membership":m,"name":name,"score":round(rs_score,2),"events":n})
-
+        sharp.append({"membership":m,"name":name,"score":round(pm["mean"],2),"events":n})
+        metro.append({"membership":m,"name":name,"score":round(pm["stdev"],2),"events":n})
+        # rising_star: trend punti come proxy (ultimi 2 vs precedenti)
+        phoenix.append({"membership":m,"name":name,"score":round(pm["rising"],2),"events":n})
         # big stage: media punti sugli eventi nel quartile superiore per partecipanti
-        if q3>0:
-            big_evts=[e for e in evts if evs.get(e["tid"],{}).get("participants",0)>=q3]
-            bs=(sum(e["pt"] for e in big_evts)/len(big_evts)) if big_evts else 0.0
-        else:
-            bs=0.0
-        bigs.append({"membership":m,"name":name,"score":round(bs,2),"events":n})
-
+        bigs.append({"membership":m,"name":name,"score":round(big[m],2),"events":n})
         # closer: quota punti da Top 8
-        top8_pts=sum(e["pt"] for e in evts if e["rank"]<=8); tot=sum(pts)
-        clos.append({"membership":m,"name":name,"score":round((top8_pts/tot) if tot>0 else 0.0,3),"events":n})
+        clos.append({"membership":m,"name":name,"score":round(pm["closer"],3),"events":n})
 
     def topn(lst, reverse=True, n=10, min_events=3):
         flt=[x for x in lst if x["events"]>=min_events]
@@ -169,26 +670,22 @@ def _compute_for_scope(scope, res, events):
         "big_match_player": topn(bigs, True, n=5),
         "finalista": topn(clos, True, n=5),
     }
+    return spot
+
+def _section_spot_narrative(view):
+    """Card narrative (usa gli spotlights)."""
+    evs=view.evs; partial=view.partial; spot=view.spotlights
+    metrics=view.metrics; name_of=view.name_of; first_date=view.first_date
 
-    # narrative
-    name_of = {}
-    first_date = {}
-    for r in recs:
-        m = r["membership"]
-        name_of[m] = r.get("name", m)
-        d = r.get("date")
-        if d and (m not in first_date or d < first_date[m]):
-            first_date[m] = d
-
-    evlist = sorted([(tid, e.get("date")) for tid, e in evs.items()], key=lambda x: (x[1] or datetime.min, x[0]))
+    evlist = partial.chronology()
     last_tid = evlist[-1][0] if len(evlist) >= 1 else None
     prev_tid = evlist[-2][0] if len(evlist) >= 2 else None
     last_date = evlist[-1][1] if len(evlist) >= 1 else None
 
     # Ironman
     ironman_m = None; ironman_n = 0
-    for m, evts in by_player.items():
-        n = len(evts)
+    for m, pm in metrics.items():
+        n = pm["events"]
         if n > ironman_n:
             ironman_n = n; ironman_m = m
     ironman = None
@@ -198,10 +695,10 @@ def _compute_for_scope(scope, res, events):
     # Rookie (<=3 eventi con migliore top8 rate)
     rookie = None
     cand = []
-    for m, evts in by_player.items():
-        n = len(evts)
+    for m, pm in metrics.items():
+        n = pm["events"]
         if n <= 3 and n > 0:
-            top8 = sum(1 for e in evts if (e.get("rank") or 999) <= 8)
+            top8 = pm["top8"]
             rate = (top8 / n) if n else 0.0
             cand.append((rate, top8, n, m))
     if cand:
@@ -212,10 +709,8 @@ def _compute_for_scope(scope, res, events):
     # Climber (evento vs precedente)
     climber_ev = None
     if last_tid and prev_tid:
-        rank_last = {}; rank_prev = {}
-        for r in recs:
-            if r.get("tid")==last_tid: rank_last[r["membership"]] = r.get("rank") or 999
-            if r.get("tid")==prev_tid: rank_prev[r["membership"]] = r.get("rank") or 999
+        rank_last = {r["membership"]: r.get("rank") or 999 for r in partial.by_event[last_tid]}
+        rank_prev = {r["membership"]: r.get("rank") or 999 for r in partial.by_event[prev_tid]}
         deltas = []
         for m in set(rank_last.keys()) & set(rank_prev.keys()):
             d = (rank_prev[m] - rank_last[m])
@@ -233,23 +728,13 @@ def _compute_for_scope(scope, res, events):
         if pm == 0:
             py -= 1; pm = 12
         prev_month = (py, pm)
-        by_mo = {}
-        for r in recs:
-            d = r.get("date")
-            if not d: 
-                continue
-            key = (d.year, d.month, r["membership"])
-            by_mo.setdefault(key, []).append(r.get("rank") or 999)
-        avg_rank = {}
-        for (y,m,mem), ranks in by_mo.items():
-            avg_rank[(y,m,mem)] = sum(ranks)/len(ranks)
         deltas = []
-        mems = {mem for (y,m,mem) in avg_rank.keys() if (y,m) in [cur_month, prev_month]}
+        mems = {mem for (y,m,mem) in partial.month_ranks.keys() if (y,m) in [cur_month, prev_month]}
         for mem in mems:
-            a = avg_rank.get((prev_month[0], prev_month[1], mem))
-            b = avg_rank.get((cur_month[0], cur_month[1], mem))
+            a = partial.month_ranks.get((prev_month[0], prev_month[1], mem))
+            b = partial.month_ranks.get((cur_month[0], cur_month[1], mem))
             if a is not None and b is not None:
-                d = a - b
+                d = a[0]/a[1] - b[0]/b[1]
                 deltas.append((d, mem))
         deltas.sort(reverse=True)
         if deltas and deltas[0][0] > 0:
@@ -276,8 +761,8 @@ def _compute_for_scope(scope, res, events):
     if last_date and evlist:
         start = last_date - timedelta(days=30)
         prev_start = start - timedelta(days=30)
-        cur_vals = [ (tid, evs[tid].get("participants") or 0) for tid, d in evlist if d and d>start ]
-        prev_vals = [ (tid, evs[tid].get("participants") or 0) for tid, d in evlist if d and (prev_start<d<=start) ]
+        cur_vals = [ (tid, evs[tid].get("participants") or 0) for tid, d, _ in evlist if d and d>start ]
+        prev_vals = [ (tid, evs[tid].get("participants") or 0) for tid, d, _ in evlist if d and (prev_start<d<=start) ]
         cur_avg = round( (sum(v for _,v in cur_vals)/len(cur_vals)) ,1) if cur_vals else 0.0
         prev_avg = round( (sum(v for _,v in prev_vals)/len(prev_vals)) ,1) if prev_vals else 0.0
         trend = round(cur_avg - prev_avg,1)
@@ -384,24 +869,24 @@ def _compute_for_scope(scope, res, events):
         })
     else:
         spot_narrative.append({"id":"attendance_pulse","icon":"📊","title":"Attendance Pulse","text":"N/A","proof":"","tag":"","tooltip":""})
+    return spot_narrative
 
-    # pulse KPI
+def _section_pulse(view):
+    """KPI e serie per evento."""
+    evs=view.evs; partial=view.partial; evlist=partial.chronology()
     kpi={}
     kpi["events_total"]=len(evs)
-    kpi["unique_players"]=len({r["membership"] for r in recs})
-    kpi["entries_total"]=len(recs)
+    kpi["unique_players"]=len(view.by_player)
+    kpi["entries_total"]=partial.n_entries
     parts=[e["participants"] for e in evs.values() if e["participants"]>0]
     kpi["avg_participants"]=round(sum(parts)/len(parts),2) if parts else 0.0
-    top8=sum(1 for r in recs if r["rank"]<=8)
-    kpi["top8_rate"]=round((top8/len(recs))*100,2) if recs else 0.0
-    omws=[r["omw"] for r in recs if r["omw"] is not None]
-    kpi["avg_omw"]=round(sum(omws)/len(omws),2) if omws else 0.0
+    kpi["top8_rate"]=round((partial.top8_entries/partial.n_entries)*100,2) if partial.n_entries else 0.0
+    kpi["avg_omw"]=round(partial.omw_sum/partial.n_entries,2) if partial.n_entries else 0.0
     
-    # Compleanno Lega - uso evlist_simple prima di ridefinirlo
-    evlist_simple = sorted([(tid, e.get("date")) for tid, e in evs.items()], key=lambda x: (x[1] or datetime.min, x[0]))
-    if evlist_simple:
-        first_event_date = min((d for _,d in evlist_simple if d), default=None)
-        last_event_date = max((d for _,d in evlist_simple if d), default=None)
+    # Compleanno Lega
+    if evlist:
+        first_event_date = min((d for _,d,_ in evlist if d), default=None)
+        last_event_date = max((d for _,d,_ in evlist if d), default=None)
         if first_event_date and last_event_date:
             giorni_attivi = (last_event_date - first_event_date).days
             kpi["compleanno_lega"] = {
@@ -429,51 +914,25 @@ def _compute_for_scope(scope, res, events):
     else:
         kpi["record_presenze"] = None
 
-    by_tid_pts=defaultdict(list)
-    for r in recs:
-        by_tid_pts[r["tid"]].append(r["pt"])
-    evlist=[(tid, e["date"], e["participants"]) for tid,e in evs.items()]
-    evlist.sort(key=lambda x:(x[1] or datetime.min, x[0]))
+    ev_metrics=view.ev_metrics
     series_entries=[]; series_avg=[]
     for tid,d,participants in evlist:
-        pts=by_tid_pts.get(tid,[])
-        avg=(sum(pts)/len(pts)) if pts else 0.0
+        avg=ev_metrics[tid]["avg_points"] if tid in ev_metrics else 0.0
         series_entries.append({"tid":tid,"date": d.isoformat() if d else "","participants":participants})
         series_avg.append({"tid":tid,"date": d.isoformat() if d else "","avg_points": round(avg,2)})
-    pulse={"kpi":kpi,"series":{"entries_per_event":series_entries,"avg_points_per_event":series_avg}}
-
-    # tales
-    by_event_players=defaultdict(list); by_event_podium=defaultdict(list); by_event_top8=defaultdict(list); name_of={}
-    def pairs(L):
-        out=[]; L=list(L)
-        for i in range(len(L)):
-            for j in range(i+1,len(L)):
-                a,b=L[i],L[j]
-                if a==b: continue
-                if a<b: out.append((a,b))
-                else: out.append((b,a))
-        return out
-    for r in recs:
-        by_event_players[r["tid"]].append(r["membership"])
-        if r["rank"]<=3: by_event_podium[r["tid"]].append(r["membership"])
-        if r["rank"]<=8: by_event_top8[r["tid"]].append(r["membership"])
-        name_of[r["membership"]]=r["name"]
-    co=Counter(); rp=Counter(); mix=defaultdict(set)
-    for tid, players in by_event_players.items():
-        for a,b in pairs(players): co[(a,b)]+=1
-    for tid, podium in by_event_podium.items():
-        for a,b in pairs(podium): rp[(a,b)]+=1
-    for tid, top8 in by_event_top8.items():
-        s=set(top8)
-        for p in s: mix[p].update(s-{p})
-    def fmt(cnt, topn=10):
+    return {"kpi": kpi, "series": {"entries_per_event": series_entries, "avg_points_per_event": series_avg}}
+
+def _section_tales(view):
+    """Tales: coppie, mix top 8, sfortuna, torneo competitivo, ultimo arrivato."""
+    evs=view.evs; partial=view.partial; ev_metrics=view.ev_metrics
+    name_of=view.name_of; first_date=view.first_date
+    def fmt(co, topn=10):
         out=[]
-        for (a,b), c in cnt.most_common(topn):
+        for (a,b), c in co.top_pairs(topn):
             out.append({"a":{"membership":a,"name":name_of.get(a,a)},"b":{"membership":b,"name":name_of.get(b,b)},"count":int(c)})
         return out
-    companions=fmt(co,10); rivals=fmt(rp,10)
-    mixture=[{"membership":m,"name":name_of.get(m,m),"unique_opponents":len(s)} for m,s in mix.items()]
-    mixture.sort(key=lambda x: x["unique_opponents"], reverse=True); mixture=mixture[:10]
+    companions=fmt(partial.co,10); rivals=fmt(partial.rp,10)
+    mixture=[{"membership":m,"name":name_of.get(m,m),"unique_opponents":n} for m,n in partial.mix.top_neighbourhoods(10)]
     tales={
         "companions":companions,
         "podium_rivals":rivals,
@@ -484,25 +943,19 @@ def _compute_for_scope(scope, res, events):
     }
     
     # Sfortuna Nera: 9° posto (fuori top8 per 1)
-    nono_posti = defaultdict(int)
-    for r in recs:
-        if r["rank"] == 9:
-            nono_posti[r["membership"]] += 1
-    if nono_posti:
-        top_sfortuna = max(nono_posti.items(), key=lambda x: x[1])
+    top_sfortuna = _pick_max(partial.ninth)
+    if top_sfortuna:
         m, cnt = top_sfortuna
         tales["sfortuna_nera"] = {"membership": m, "name": name_of.get(m,m), "count": cnt}
     
     # Torneo Competitivo: più giocatori con record positivo in top8
     torneo_comp = None
     best_comp_score = 0
-    for tid, players in by_event_top8.items():
-        top8_recs = [r for r in recs if r["tid"]==tid and r["rank"]<=8]
-        # Conta quanti hanno win_points >= media
-        if top8_recs:
-            avg_wp = sum(r["win_points"] for r in top8_recs) / len(top8_recs)
-            positive = sum(1 for r in top8_recs if r["win_points"] >= avg_wp)
-            comp_score = positive * evs[tid].get("participants", 0)
+    for tid, em in ev_metrics.items():
+        # Conta quanti hanno win_points >= media (precalcolato per evento)
+        if em["top8"]:
+            positive = em["top8"]["positive"]
+            comp_score = em["top8"]["score"]
             if comp_score > best_comp_score:
                 best_comp_score = comp_score
                 date_obj = evs[tid].get("date")
@@ -519,40 +972,34 @@ def _compute_for_scope(scope, res, events):
         ultimo_m = max(first_date.items(), key=lambda x: x[1])
         m, d = ultimo_m
         tales["ultimo_arrivato"] = {"membership": m, "name": name_of.get(m,m), "date": d.isoformat() if d else ""}
+    return tales
 
-    # HOF
+def _section_hof(view):
+    """Hall of Fame dello scope."""
+    evs=view.evs; partial=view.partial; ev_metrics=view.ev_metrics
+    metrics=view.metrics; name_of=view.name_of
     highest=None; biggest=None; most_bal=None; most_dom=None
-    for r in recs:
-        if (highest is None) or (r["pt"]>highest["pt"]):
-            highest={"membership":r["membership"],"name":r["name"],"pt":r["pt"],"tid":r["tid"]}
+    if partial.highest is not None:
+        r=partial.highest
+        highest={"membership":r["membership"],"name":r["name"],"pt":r["pt"],"tid":r["tid"]}
     for tid,e in evs.items():
         if (biggest is None) or (e["participants"]>biggest["participants"]):
             biggest={"tid":tid,"participants":e["participants"]}
-    for tid,pts in by_tid_pts.items():
-        if len(pts)<8: continue
-        sdev=_stdev(pts)
+    for tid,em in ev_metrics.items():
+        if em["stdev"] is None: continue
+        sdev=em["stdev"]
         if (most_bal is None) or (sdev<most_bal["stdev"]):
-            most_bal={"tid":tid,"stdev":round(sdev,2),"participants":len(pts)}
-    for tid,pts in by_tid_pts.items():
-        if len(pts)<8: continue
-        s=sorted(pts, reverse=True); gap=s[0]-s[7]
+            most_bal={"tid":tid,"stdev":round(sdev,2),"participants":em["n"]}
+    for tid,em in ev_metrics.items():
+        if em["gap"] is None: continue
+        gap=em["gap"]
         if (most_dom is None) or (gap>most_dom["gap"]):
-            most_dom={"tid":tid,"gap":round(gap,2),"participants":len(pts)}
+            most_dom={"tid":tid,"gap":round(gap,2),"participants":em["n"]}
     best_ph=None
-    by_pl=defaultdict(list)
-    for r in recs:
-        by_pl[r["membership"]].append(r)
-    for m,evts in by_pl.items():
-        evts_sorted=sorted(evts, key=lambda e: (e["date"] or datetime.min, e["tid"]))
-        pts_sorted=[e["pt"] for e in evts_sorted]
-        if len(pts_sorted)>=2:
-            last3=pts_sorted[-3:] if len(pts_sorted)>=3 else pts_sorted[-2:]
-            prev=pts_sorted[:-3] if len(pts_sorted)>=4 else pts_sorted[:-2]
-            prev_mean=(sum(prev)/len(prev)) if prev else 0.0
-            ph=sum(last3)/len(last3)-prev_mean
-            if (best_ph is None) or (ph>best_ph["score"]):
-                name=max((e["name"] for e in evts), key=lambda n: sum(1 for e in evts if e["name"]==n), default=m)
-                best_ph={"membership":m,"name":name,"score":round(ph,2)}
+    for m,pm in metrics.items():
+        ph=pm["riser"]
+        if ph is not None and ((best_ph is None) or (ph>best_ph["score"])):
+            best_ph={"membership":m,"name":pm["name"],"score":round(ph,2)}
 
     hof={
         "highest_single_score":highest,
@@ -566,84 +1013,87 @@ def _compute_for_scope(scope, res, events):
         "piu_punti": None
     }
     
-    # Underdog Hero: vittorie da fondo classifica (rank iniziale alto, finisce 1°)
-    # Approssimazione: chi vince con seed basso = tanti partecipanti - ranking finale
-    underdog_wins = []
-    for r in recs:
-        if r["rank"] == 1:
-            participants = evs[r["tid"]].get("participants", 0)
-            # Seed basso = participants alto e ranking 1
-            if participants >= 10:  # Almeno 10 partecipanti
-                underdog_wins.append({
-                    "membership": r["membership"],
-                    "name": r["name"],
-                    "tid": r["tid"],
-                    "participants": participants
-                })
-    if underdog_wins:
-        # Conta quante volte ha vinto da underdog
-        underdog_count = Counter(w["membership"] for w in underdog_wins)
-        top_underdog = max(underdog_count.items(), key=lambda x: x[1])
+    # Underdog Hero: vittorie in eventi con almeno 10 partecipanti
+    top_underdog = _pick_max(partial.underdog)
+    if top_underdog:
         m, cnt = top_underdog
         hof["underdog_hero"] = {"membership": m, "name": name_of.get(m, m), "wins": cnt}
     
     # Scalata Epica: maggior salto posizioni in classifica stagionale
     # Serve standings, ma qui non abbiamo accesso. Usiamo proxy: delta rank tra primo e ultimo torneo
     scalata_candidates = []
-    for m, evts in by_pl.items():
-        if len(evts) >= 3:
-            evts_sorted = sorted(evts, key=lambda e: (e["date"] or datetime.min, e["tid"]))
-            first_rank = evts_sorted[0]["rank"]
-            last_rank = evts_sorted[-1]["rank"]
-            delta = first_rank - last_rank
-            if delta > 0:  # Miglioramento
-                scalata_candidates.append({
-                    "membership": m,
-                    "name": name_of.get(m, m),
-                    "delta": delta,
-                    "events": len(evts)
-                })
+    for m, pm in metrics.items():
+        delta = pm["scalata"]
+        if delta is not None and delta > 0:  # Miglioramento
+            scalata_candidates.append({
+                "membership": m,
+                "name": name_of.get(m, m),
+                "delta": delta,
+                "events": pm["events"]
+            })
     if scalata_candidates:
         scalata_candidates.sort(key=lambda x: x["delta"], reverse=True)
         hof["scalata_epica"] = scalata_candidates[0]
     
     # Più Vittorie (rank=1)
-    vittorie_count = Counter()
-    for r in recs:
-        if r["rank"] == 1:
-            vittorie_count[r["membership"]] += 1
-    if vittorie_count:
-        top_vitt = max(vittorie_count.items(), key=lambda x: x[1])
+    top_vitt = _pick_max(partial.wins)
+    if top_vitt:
         m, cnt = top_vitt
         hof["piu_vittorie"] = {"membership": m, "name": name_of.get(m, m), "wins": cnt}
     
     # Più Punti Lifetime
-    punti_lifetime = defaultdict(float)
-    for r in recs:
-        punti_lifetime[r["membership"]] += r["pt"]
-    if punti_lifetime:
-        top_punti = max(punti_lifetime.items(), key=lambda x: x[1])
-        m, pts = top_punti
-        hof["piu_punti"] = {"membership": m, "name": name_of.get(m, m), "points": round(pts, 2)}
+    if metrics:
+        m, pm = max(metrics.items(), key=lambda x: x[1]["total"])
+        hof["piu_punti"] = {"membership": m, "name": name_of.get(m, m), "points": round(pm["total"], 2)}
+
+    return hof
 
-    return {"spotlights":spot,"spot_narrative":spot_narrative,"pulse": {"kpi": kpi, "series": {"entries_per_event": series_entries, "avg_points_per_event": series_avg}}, "tales":tales,"hof":hof}
+# Sezioni del payload stats, nell'ordine del payload completo
+SECTIONS = ("spotlights", "spot_narrative", "pulse", "tales", "hof")
 
+_SECTION_BUILDERS = {
+    "spotlights": lambda view: view.spotlights,
+    "spot_narrative": _section_spot_narrative,
+    "pulse": _section_pulse,
+    "tales": _section_tales,
+    "hof": _section_hof,
+}
 
-def build_stats(scopes):
+def _compute_for_scope(scope, partial, table=None, sections=None):
+    """
+    Payload stats dello scope.
+
+    `sections`: sottoinsieme di SECTIONS da calcolare (None = tutte). Le
+    sezioni non richieste non vengono calcolate e mancano dal payload.
+    """
+    view=_ScopeView(partial, table)
+    wanted=SECTIONS if sections is None else [s for s in SECTIONS if s in sections]
+    return {section: _SECTION_BUILDERS[section](view) for section in wanted}
+
+def build_stats(scopes, rows=None, table=None, sections=None):
     """
     Compatibilità:
     - Se `scopes` è una stringa come 'OP12', viene trattata come lista con un solo elemento.
     - Ritorna sempre un dict {scope: payload}. (La tua app può "spianare" se vuole un payload piatto.)
+    - `rows`: righe Results già lette (es. snapshot cache, header inclusi).
+      Se None, legge il foglio Results da Google Sheets.
+    - `table`: ResultsTable già costruita (es. cache.results_table()); ha
+      precedenza su `rows`.
+    - Tutti gli scope richiesti sono calcolati con una sola passata su Results:
+      passare all_scopes(table) per scaldare l'intero sito in un colpo.
+    - Per aggiornamenti dopo un import usare StatsState.update().
+    - `sections`: sottoinsieme di SECTIONS (es. ['spotlights']); le altre
+      sezioni non vengono calcolate né incluse. None = payload completo.
     """
-    sheet=_connect_sheet()
-    res, events=_load_results(sheet)
+    if table is None:
+        if rows is None:
+            table=load_results_table(_connect_sheet())
+        else:
+            table=ResultsTable(rows[3:])
 
     if isinstance(scopes, (list, tuple, set)):
         targets = [str(s) for s in scopes]
     else:
         targets = [str(scopes)]
 
-    out = {}
-    for scope in targets:
-        out[scope] = _compute_for_scope(scope, res, events)
-    return out
+    return StatsState(table, targets).payloads(sections=sections)
@@ -2,40 +2,122 @@
 """
 stats_cache.py
 A simple file-based cache for stats objects per scope.
+
+Two tiers:
+- in-memory LRU (MAX_MEMORY_ENTRIES scopes): hot scopes served with no disk I/O
+- stats_<scope>.json files: shared between workers and restarts
+
+Stats payloads are cached per section (key "<scope>.<section>", e.g.
+"OP12.hof", see get_sections/set_sections): a page that needs one section
+never waits for the others to be built.
+
+Entries can carry a fingerprint of the Results data they were built from.
+When the TTL has expired but the caller's fingerprint still matches, the
+entry is revalidated instead of being rebuilt; a different fingerprint is a
+miss even inside the TTL.
 """
 
-import os, json, time
+import os, json, time, tempfile, threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Callable, Dict, Any
 
 BASE_DIR = Path(__file__).resolve().parent / "stats_cache"
 BASE_DIR.mkdir(parents=True, exist_ok=True)
 
+MAX_MEMORY_ENTRIES = 160   # ~32 scopes x 5 sections
+
+_memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_lock = threading.Lock()
+
 def _path_for(scope: str) -> Path:
     safe = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in scope)
     return BASE_DIR / f"stats_{safe}.json"
 
-def get_cached(scope: str, max_age_seconds: int) -> Dict[str, Any] | None:
+def _is_valid(entry: Dict[str, Any], max_age_seconds: int, fingerprint: str | None) -> bool:
+    if fingerprint is not None:
+        return entry.get("_fingerprint") == fingerprint
+    return time.time() - entry.get("_cached_at", 0) <= max_age_seconds
+
+def _remember(scope: str, entry: Dict[str, Any]) -> None:
+    with _lock:
+        _memory[scope] = entry
+        _memory.move_to_end(scope)
+        while len(_memory) > MAX_MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+def get_cached(scope: str, max_age_seconds: int, fingerprint: str | None = None) -> Dict[str, Any] | None:
+    """
+    Stats for `scope`, or None on miss.
+
+    Without `fingerprint`, an entry is valid for `max_age_seconds`. With it,
+    an entry is valid only if it was built from the same Results data (its
+    age no longer matters: unchanged data is simply revalidated).
+    """
+    with _lock:
+        entry = _memory.get(scope)
+        if entry is not None:
+            _memory.move_to_end(scope)
+    if entry is not None and _is_valid(entry, max_age_seconds, fingerprint):
+        return entry.get("data")
+
     p = _path_for(scope)
     if not p.exists():
         return None
     try:
-        obj = json.loads(p.read_text(encoding="utf-8"))
-        ts = obj.get("_cached_at", 0)
-        if time.time() - ts <= max_age_seconds:
-            return obj.get("data")
-        return None
+        entry = json.loads(p.read_text(encoding="utf-8"))
     except Exception:
         return None
+    if not _is_valid(entry, max_age_seconds, fingerprint):
+        return None
+    _remember(scope, entry)
+    return entry.get("data")
 
-def set_cached(scope: str, data: Dict[str, Any]) -> None:
+def set_cached(scope: str, data: Dict[str, Any], fingerprint: str | None = None) -> None:
+    entry = {"_cached_at": time.time(), "_fingerprint": fingerprint, "data": data}
+    _remember(scope, entry)
     p = _path_for(scope)
-    payload = {"_cached_at": time.time(), "data": data}
-    p.write_text(json.dumps(payload, ensure_ascii=False, separators=(",",":")), encoding="utf-8")
+    # Atomic write: other workers never read a truncated file
+    fd, tmp = tempfile.mkstemp(prefix=".stats_", suffix=".tmp", dir=str(BASE_DIR))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(",",":"))
+        os.replace(tmp, p)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def section_key(scope: str, section: str) -> str:
+    """Cache key of one section of a scope (e.g. "OP12.hof")."""
+    return f"{scope}.{section}"
+
+def get_sections(scope: str, sections, max_age_seconds: int, fingerprint: str | None = None) -> Dict[str, Any]:
+    """Cached sections of `scope` as {section: data}; missing or stale sections are left out."""
+    found = {}
+    for section in sections:
+        data = get_cached(section_key(scope, section), max_age_seconds, fingerprint=fingerprint)
+        if data is not None:
+            found[section] = data
+    return found
+
+def set_sections(scope: str, payload: Dict[str, Any], fingerprint: str | None = None) -> None:
+    """Stores every section of a (full or partial) payload as its own entry."""
+    for section, data in payload.items():
+        set_cached(section_key(scope, section), data, fingerprint=fingerprint)
 
 def clear(scope: str) -> bool:
+    """Drops `scope` and all of its section entries."""
+    prefix = scope + "."
+    with _lock:
+        keys = [k for k in _memory if k == scope or k.startswith(prefix)]
+        for k in keys:
+            del _memory[k]
     p = _path_for(scope)
-    if p.exists():
-        p.unlink()
-        return True
-    return False
\ No newline at end of file
+    paths = [p] + sorted(BASE_DIR.glob(p.name[:-len(".json")] + ".*.json"))
+    removed = False
+    for path in paths:
+        if path.exists():
+            path.unlink()
+            removed = True
+    return removed or bool(keys)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+=================================================================================
+LeagueForge - Warm-up parallelo delle stats
+=================================================================================
+
+Calcola gli scope stats (stagioni + ALL-<TCG>) in un pool di processi e
+scrive ogni payload in stats_cache (una entry per sezione) appena è
+pronto. Il lavoro CPU-bound non condivide più il GIL con le richieste web:
+il processo webapp fa solo da coordinatore (snapshot di Results in
+ingresso, payload JSON in uscita).
+
+- Snapshot: la ResultsTable viene passata una volta a ogni worker
+  (initializer del pool), non una volta per scope
+- Scope più grandi (più righe) per primi: ALL-OP non resta in coda
+- Contesto "spawn": nessun fork di un processo Flask con thread e lock attivi
+- Tempi per scope stampati e restituiti
+- Con 1 worker, o se il pool non parte (es. host senza semafori, spawn o
+  initializer falliti), calcolo sequenziale nello stesso processo con una
+  sola passata su Results (i tempi per scope escludono allora la passata
+  condivisa); se il pool si rompe a metà si calcolano così solo gli scope
+  mancanti
+
+StatsWorker: un processo dedicato e persistente che tiene gli aggregati
+StatsState per i fold incrementali dopo un import. Costruzione degli
+aggregati e fold girano lì; la webapp invia la ResultsTable (solo colonne,
+pochi ms, vedi ResultsTable.__getstate__) e riceve i payload.
+
+UTILIZZO:
+    from stats_warmup import warm_scopes
+    timings = warm_scopes(cache.results_table(), fingerprint=fp)   # tutti gli scope
+    warm_scopes(table, ['OP12', 'ALL-OP'], workers=2)
+
+    worker = StatsWorker()
+    worker.rebuild(table)                        # aggregati nel processo worker
+    worker.fold(new_table, tids, ['OP12'])       # {scope: payload} o None
+
+    python stats_warmup.py                 # tutti gli scope dallo snapshot
+    python stats_warmup.py OP12 ALL-OP     # solo alcuni
+    python stats_warmup.py --workers 2
+=================================================================================
+"""
+
+import os
+import sys
+import time
+import threading
+import argparse
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Optional
+
+from stats_builder import StatsState, all_scopes
+
+try:
+    from config import STATS_WARM_WORKERS
+except ImportError:
+    STATS_WARM_WORKERS = None   # None = un worker per CPU
+
+# Snapshot di Results nel processo worker (impostato dall'initializer)
+_worker_table = None
+
+
+def _init_worker(table):
+    global _worker_table
+    _worker_table = table
+
+
+def _build_scope(scope):
+    """Payload di uno scope e secondi impiegati (eseguito nel worker)."""
+    start = time.perf_counter()
+    payload = StatsState(_worker_table, [scope]).payload(scope)
+    return scope, payload, time.perf_counter() - start
+
+
+# Aggregati StatsState nel processo StatsWorker
+_worker_state = None
+
+
+def _state_rebuild(table, scopes):
+    global _worker_state
+    _worker_state = None
+    _worker_state = StatsState(table, all_scopes(table) if scopes is None else scopes)
+    return len(_worker_state.scopes)
+
+
+def _state_fold(table, tournament_ids, scopes):
+    """Fold dei tornei nuovi; payload degli scope richiesti o None se serve un rebuild."""
+    global _worker_state
+    state = _worker_state
+    if state is None:
+        return None
+    if state.update(table, tournament_ids) is None:
+        _worker_state = None
+        return None
+    if not set(scopes) <= set(state.scopes):
+        return None
+    return state.payloads(scopes) if scopes else {}
+
+
+def _state_clear():
+    global _worker_state
+    _worker_state = None
+
+
+def _cpu_count():
+    """CPU utilizzabili dal processo (affinity/container), non quelle della macchina."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _store(scope, payload, fingerprint):
+    from stats_cache import set_sections, clear
+    if payload:
+        set_sections(scope, payload, fingerprint=fingerprint)
+    else:
+        clear(scope)
+
+
+def warm_scopes(table, scopes: Optional[Iterable[str]] = None, fingerprint: Optional[str] = None,
+                workers: Optional[int] = None, verbose: bool = True) -> Dict[str, float]:
+    """
+    Calcola gli scope in parallelo e li salva in stats_cache man mano.
+
+    Args:
+        table: ResultsTable (snapshot di Results)
+        scopes: Scope da calcolare (default: all_scopes(table))
+        fingerprint: Fingerprint di Results per le entry di stats_cache
+        workers: Processi (default: STATS_WARM_WORKERS o numero di CPU)
+        verbose: Stampa il tempo di ogni scope
+
+    Returns:
+        dict: {scope: secondi} nell'ordine di completamento
+    """
+    scopes = list(dict.fromkeys(str(s) for s in (all_scopes(table) if scopes is None else scopes)))
+    if not scopes:
+        return {}
+    # Prima gli scope con più righe: il più lento parte subito
+    scopes.sort(key=lambda s: len(table.rows_for_scope(s)), reverse=True)
+    workers = workers or STATS_WARM_WORKERS or _cpu_count()
+    workers = max(1, min(workers, len(scopes)))
+
+    timings = {}
+    start = time.perf_counter()
+
+    def done(scope, payload, seconds):
+        _store(scope, payload, fingerprint)
+        timings[scope] = seconds
+        if verbose:
+            print(f"   ⏱️  {scope}: {seconds:.2f}s")
+
+    pool = None
+    if workers > 1:
+        try:
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(table,),
+            )
+        except (OSError, NotImplementedError, ImportError) as e:
+            print(f"⚠️ Pool di processi non disponibile ({e}): warm-up sequenziale")
+            workers = 1
+
+    def sequential(todo):
+        # Stesso processo: una sola passata su Results per tutti gli scope
+        state = StatsState(table, todo)
+        for scope in todo:
+            t0 = time.perf_counter()
+            done(scope, state.payload(scope), time.perf_counter() - t0)
+
+    if pool is None:
+        sequential(scopes)
+    else:
+        try:
+            with pool:
+                futures = [pool.submit(_build_scope, scope) for scope in scopes]
+                for future in as_completed(futures):
+                    done(*future.result())
+        except BrokenProcessPool as e:
+            # Spawn o initializer falliti nei worker: si finisce qui
+            missing = [scope for scope in scopes if scope not in timings]
+            print(f"⚠️ Pool di processi interrotto ({e}): {len(missing)} scope in sequenziale")
+            workers = 1
+            sequential(missing)
+
+    if verbose:
+        print(f"🔥 Stats warm-up: {len(timings)} scope in {time.perf_counter() - start:.2f}s "
+              f"({workers} process{'i' if workers > 1 else 'o'})")
+    return timings
+
+
+class StatsWorker:
+    """
+    Processo dedicato che tiene gli aggregati StatsState fuori dal processo web.
+
+    Un solo processo ("spawn"), avviato al primo uso e riusato: le chiamate
+    vengono eseguite in ordine, quindi un fold inviato dopo un rebuild
+    lavora sugli aggregati nuovi. Se il processo non parte si lavora nello
+    stesso processo (come warm_scopes).
+    """
+
+    def __init__(self):
+        self._pool = None
+        self._inline = False
+        self._lock = threading.Lock()
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self._pool is None and not self._inline:
+                try:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+                except (OSError, NotImplementedError, ImportError) as e:
+                    print(f"⚠️ Processo stats non disponibile ({e}): aggregati nel processo web")
+                    self._inline = True
+            if self._pool is not None:
+                return self._pool.submit(fn, *args)
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def rebuild(self, table, scopes: Optional[Iterable[str]] = None) -> Future:
+        """Ricostruisce gli aggregati nel worker (default: all_scopes); non aspetta."""
+        return self._submit(_state_rebuild, table, None if scopes is None else list(scopes))
+
+    def fold(self, table, tournament_ids, scopes) -> Optional[Dict[str, Dict]]:
+        """
+        Aggiunge agli aggregati i tornei importati e calcola gli scope richiesti.
+
+        Returns:
+            dict | None: {scope: payload} (vuoto se scopes è vuoto); None se
+            gli aggregati mancano o non sono aggiornabili (serve un rebuild)
+        """
+        try:
+            return self._submit(_state_fold, table, list(tournament_ids), list(scopes)).result()
+        except Exception as e:
+            print(f"⚠️ Fold stats fallito: {e}")
+            self.clear()
+            return None
+
+    def clear(self):
+        """Scarta gli aggregati (il prossimo fold ritorna None)."""
+        try:
+            self._submit(_state_clear).result()
+        except Exception:
+            self.close()
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm-up parallelo stats_cache')
+    parser.add_argument('scopes', nargs='*', help='Scope da calcolare (default: tutti)')
+    parser.add_argument('--workers', type=int, default=None, help='Numero di processi')
+    args = parser.parse_args()
+
+    from cache import cache
+
+    print("=" * 60)
+    print("🔥 STATS WARM-UP")
+    print("=" * 60)
+    try:
+        table = cache.results_table()
+        warm_scopes(table, args.scopes or None, fingerprint=cache.sheet_fingerprint("Results"),
+                    workers=args.workers)
+    except Exception as e:
+        print(f"❌ Errore: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
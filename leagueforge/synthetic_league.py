@@ -0,0 +1,365 @@
+# -*- coding: utf-8 -*-
+"""
+LeagueForge - Lega sintetica deterministica
+===========================================
+
+Genera una lega finta (OP, PKM, RFB) di dimensione scelta, per benchmark
+e test di carico. Stesso seed → stessi dati, byte per byte.
+
+Riprende le idee di load_demo_data.generate_demo_tournament (record per
+rank, OMW casuale, formula punti LeagueForge) ma con:
+- pool di giocatori proporzionale alla lega, con "forza" fissa per
+  giocatore (classifiche credibili, stesse facce in testa)
+- un torneo al giorno per TCG, stagioni da SEASON_LENGTH tornei, prima
+  stagione di ogni TCG ARCHIVED
+- fogli completi con le righe di header come su Google Sheets (Results,
+  Tournaments, Config, Achievement_Definitions, Player_Achievements)
+- file di import sintetici: TDF Pokemon, CSV round + ClassificaFinale One
+  Piece, CSV round Riftbound
+
+UTILIZZO:
+    from synthetic_league import SCALES, generate_league, SyntheticSheet
+
+    values = generate_league(SCALES['50k'])     # {foglio: righe}
+    sheet = SyntheticSheet(values)              # sheet.worksheet('Results').get_all_values()
+
+    write_tdf(path, n_players=64)               # file per i parser di import
+    write_onepiece_csvs(directory)              # -> (round_files, classifica_finale)
+    write_riftbound_csvs(directory)             # -> round_files
+"""
+
+import csv
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import quoteattr
+
+# Righe Results delle tre scale di benchmark
+SCALES = {"1k": 1_000, "50k": 50_000, "500k": 500_000}
+
+# Tornei per stagione (>= 8: scatta lo scarto delle 2 peggiori)
+SEASON_LENGTH = 12
+
+# TCG: quota di righe, partecipanti per torneo, round, formato season ID
+TCG_PROFILES = {
+    "OP": {"share": 0.5, "field": (16, 48), "rounds": 5, "season": "OP{:02d}"},
+    "PKM": {"share": 0.3, "field": (12, 40), "rounds": 5, "season": "PKM-FS{:02d}"},
+    "RFB": {"share": 0.2, "field": (8, 32), "rounds": 4, "season": "RFB-S{}"},
+}
+
+FIRST_NAMES = ["Mario", "Luigi", "Anna", "Paolo", "Giulia", "Marco", "Sara", "Luca",
+               "Chiara", "Davide", "Elena", "Fabio", "Irene", "Matteo", "Noemi", "Stefano"]
+LAST_NAMES = ["Rossi", "Verdi", "Bianchi", "Neri", "Ferrari", "Colombo", "Romano", "Ricci",
+              "Greco", "Bruno", "Gallo", "Conti", "Costa", "Giordano", "Mancini", "Rizzo"]
+
+START_DATE = date(2020, 1, 4)
+
+# Definizioni achievement: tutti i requirement_type e i casi special di achievements.py
+ACHIEVEMENTS = [
+    ["ACH_LEG_001", "Debutto", "Gioca il primo torneo", "Legacy", "Common", "🎴", 10, "tournaments_played", 1],
+    ["ACH_LEG_002", "Veterano", "Gioca 25 tornei", "Legacy", "Rare", "🎖️", 50, "tournaments_played", 25],
+    ["ACH_GLO_001", "First Blood", "Vinci il tuo primo torneo", "Glory", "Uncommon", "🎬", 25, "tournament_wins", 1],
+    ["ACH_GLO_006", "Dynasty Builder", "Vinci 5 tornei totali", "Glory", "Legendary", "💎", 250, "tournament_wins", 5],
+    ["ACH_GLO_002", "Podium Climber", "Raggiungi 3 top8", "Glory", "Uncommon", "🎯", 25, "top8_count", 3],
+    ["ACH_CON_001", "Hot Streak", "2 top8 consecutivi", "Consistency", "Common", "🔥", 10, "special", "streak_top8_2"],
+    ["ACH_CON_002", "On Fire", "4 top8 consecutivi", "Consistency", "Rare", "☄️", 50, "special", "streak_top8_4"],
+    ["ACH_CON_003", "Unstoppable", "6 top8 consecutivi", "Consistency", "Epic", "🌋", 100, "special", "streak_top8_6"],
+    ["ACH_HRT_001", "Rookie Struggles", "Primi tornei difficili", "Heartbreak", "Common", "🥲", 10, "special", "rookie_struggles"],
+    ["ACH_HRT_002", "So Close", "Nono 3 volte", "Heartbreak", "Uncommon", "😩", 25, "special", "rank9_3x"],
+    ["ACH_HRT_003", "Eternal Second", "Secondo 3 volte senza vittorie", "Heartbreak", "Rare", "🥈", 50, "special", "second_3x_no_wins"],
+    ["ACH_HRT_004", "Never Top", "10 tornei senza top8", "Heartbreak", "Uncommon", "🌧️", 25, "special", "10tournaments_no_top8"],
+    ["ACH_WTF_001", "Lucky Seven", "Settimo posto", "Wildcards", "Common", "🍀", 10, "special", "rank_7"],
+    ["ACH_WTF_002", "Bronze Collector", "Terzo 3 volte", "Wildcards", "Uncommon", "🥉", 25, "special", "rank3_3x"],
+    ["ACH_TCG_001", "Multiverse", "3 tornei in 2 TCG", "Legacy", "Rare", "🌌", 50, "special", "multi_tcg_3+"],
+    ["ACH_TCG_002", "Double Threat", "2 top8 in 2 TCG", "Legacy", "Epic", "⚔️", 100, "special", "top8_2tcg"],
+    ["ACH_TCG_003", "Triple Crown", "Vittoria in tutti i TCG", "Legacy", "Legendary", "👑", 250, "special", "win_all_tcg"],
+]
+
+
+# =============================================================================
+# LEGA (fogli Google Sheets)
+# =============================================================================
+
+def _player_pool(rng, tcg, size):
+    """Giocatori del TCG: (membership, nome, forza). Membership distinte per TCG."""
+    base = {"OP": 1, "PKM": 4, "RFB": 7}[tcg] * 10_000_000
+    pool = []
+    for k in range(size):
+        name = f"{FIRST_NAMES[k % len(FIRST_NAMES)]} {LAST_NAMES[(k // len(FIRST_NAMES)) % len(LAST_NAMES)]} {k}"
+        pool.append((f"{base + k:010d}", name, rng.gauss(0, 1)))
+    return pool
+
+
+def _tournament_rows(rng, tid, entrants, rounds):
+    """Righe Results di un torneo: classifica per forza + rumore, record dal rank."""
+    standings = sorted(entrants, key=lambda p: p[2] + rng.gauss(0, 1.2), reverse=True)
+    n = len(standings)
+    rows = []
+    for rank, (membership, name, _) in enumerate(standings, start=1):
+        # Vittorie decrescenti col rank, come generate_demo_tournament
+        expected = rounds * (1 - (rank - 1) / max(n - 1, 1))
+        wins = max(0, min(rounds, int(round(expected + rng.uniform(-0.6, 0.6)))))
+        ties = 1 if wins < rounds and rng.random() < 0.05 else 0
+        losses = rounds - wins - ties
+        omw = round(40 + rng.random() * 30, 2)
+        points_victory = wins
+        points_ranking = n - rank + 1
+        rows.append([
+            f"{tid}_{membership}", tid, membership, str(rank), str(wins * 3 + ties), str(omw),
+            str(points_victory), str(points_ranking), str(points_victory + points_ranking),
+            name, str(wins), str(ties), str(losses),
+        ])
+    return rows
+
+
+def generate_league(n_rows: int, seed: int = 0, tcgs=("OP", "PKM", "RFB")) -> Dict[str, List[List[str]]]:
+    """
+    Fogli di una lega con circa n_rows righe Results (ultimo torneo intero).
+
+    Args:
+        n_rows: Righe Results desiderate (es. SCALES['50k'])
+        seed: Seed del generatore (stesso seed → stessi fogli)
+        tcgs: TCG da generare (quote da TCG_PROFILES, rinormalizzate)
+
+    Returns:
+        dict: {nome foglio: righe con header}, pronto per SyntheticSheet
+    """
+    rng = random.Random(seed)
+    total_share = sum(TCG_PROFILES[t]["share"] for t in tcgs)
+    results, tournaments, config = [], [], []
+
+    for tcg in tcgs:
+        profile = TCG_PROFILES[tcg]
+        target = int(n_rows * profile["share"] / total_share)
+        lo, hi = profile["field"]
+        pool = _player_pool(rng, tcg, max(hi * 2, target // 25))
+        day = 0
+        produced = 0
+        seasons = []
+        while produced < target:
+            season_num = day // SEASON_LENGTH + 1
+            season_id = profile["season"].format(season_num)
+            if not seasons or seasons[-1] != season_id:
+                seasons.append(season_id)
+            when = (START_DATE + timedelta(days=day)).isoformat()
+            tid = f"{season_id}_{when}"
+            entrants = rng.sample(pool, min(len(pool), rng.randint(lo, hi), target - produced + lo))
+            rows = _tournament_rows(rng, tid, entrants, profile["rounds"])
+            results.extend(rows)
+            tournaments.append([tid, season_id, when, str(len(rows)), tcg, str(profile["rounds"]),
+                                "Synthetic Store", rows[0][9]])
+            produced += len(rows)
+            day += 1
+        for k, season_id in enumerate(seasons):
+            status = "ARCHIVED" if k == 0 and len(seasons) > 1 else ("ACTIVE" if k == len(seasons) - 1 else "CLOSED")
+            config.append([season_id, tcg, f"{tcg} Season {k + 1}", str(k + 1), status,
+                           "", "", "", "", "", "", ""])
+
+    header3 = [["SYNTHETIC"], [""], [""]]
+    return {
+        "Results": header3 + results,
+        "Tournaments": header3 + tournaments,
+        "Config": header3 + [["Season_ID", "TCG", "Name", "Season_Num", "Status"]] + config,
+        "Achievement_Definitions": header3 + [["achievement_id", "name", "description", "category", "rarity",
+                                               "emoji", "points", "requirement_type", "requirement_value"]]
+                                   + [[str(v) for v in row] for row in ACHIEVEMENTS],
+        "Player_Achievements": header3 + [["membership", "achievement_id", "unlocked_date",
+                                           "tournament_id", "progress"]],
+    }
+
+
+class _SyntheticWorksheet:
+    """Worksheet in sola lettura (get_all_values come gspread)."""
+
+    def __init__(self, title, rows):
+        self.title = title
+        self._rows = rows
+
+    def get_all_values(self):
+        return [list(row) for row in self._rows]
+
+
+class SyntheticSheet:
+    """Spreadsheet in memoria con i fogli di generate_league (solo letture)."""
+
+    def __init__(self, values: Dict[str, List[List[str]]], sheet_id: Optional[str] = None):
+        self.id = sheet_id or f"synthetic-{id(self)}"
+        self._worksheets = {name: _SyntheticWorksheet(name, rows) for name, rows in values.items()}
+
+    def worksheet(self, name):
+        try:
+            return self._worksheets[name]
+        except KeyError:
+            raise KeyError(f"Foglio {name} non presente nella lega sintetica")
+
+
+# =============================================================================
+# FILE DI IMPORT (parser TDF / CSV)
+# =============================================================================
+
+def _swiss(rng, players, rounds):
+    """
+    Torneo svizzero simulato.
+
+    Returns:
+        (round_matches, records): per round [(p1, p2 | None, esito)] con
+        esito '1' / '2' / '3' (pareggio) / '5' (BYE); records {id: [w, l, t]}
+    """
+    records = {p[0]: [0, 0, 0] for p in players}
+    strength = {p[0]: p[2] for p in players}
+    round_matches = []
+    for _ in range(rounds):
+        order = sorted(records, key=lambda uid: (-(records[uid][0] * 3 + records[uid][2]), uid))
+        matches = []
+        if len(order) % 2:
+            bye = order.pop()
+            records[bye][0] += 1
+            matches.append((bye, None, "5"))
+        for a, b in zip(order[::2], order[1::2]):
+            roll = strength[a] - strength[b] + rng.gauss(0, 1)
+            if abs(roll) < 0.05:
+                outcome = "3"
+                records[a][2] += 1
+                records[b][2] += 1
+            elif roll > 0:
+                outcome = "1"
+                records[a][0] += 1
+                records[b][1] += 1
+            else:
+                outcome = "2"
+                records[b][0] += 1
+                records[a][1] += 1
+            matches.append((a, b, outcome))
+        round_matches.append(matches)
+    return round_matches, records
+
+
+def _final_order(records):
+    return sorted(records, key=lambda uid: (-(records[uid][0] * 3 + records[uid][2]), -records[uid][0], uid))
+
+
+def _entrants(seed, n_players, base):
+    rng = random.Random(seed)
+    players = [(str(base + k), FIRST_NAMES[k % len(FIRST_NAMES)], f"{LAST_NAMES[k % len(LAST_NAMES)]}{k}",
+                rng.gauss(0, 1)) for k in range(n_players)]
+    return rng, [(uid, first, last, s) for uid, first, last, s in players]
+
+
+def write_tdf(path: str, n_players: int = 64, rounds: int = 6, seed: int = 0) -> str:
+    """TDF Pokemon sintetico (formato letto da import_pokemon.parse_tdf)."""
+    rng, players = _entrants(seed, n_players, 4_000_000)
+    round_matches, records = _swiss(rng, [(p[0], None, p[3]) for p in players], rounds)
+    out = ['<?xml version="1.0" encoding="UTF-8"?>', '<tournament>',
+           '  <data><name>Synthetic Cup</name><id>SYN-0001</id><startdate>03/15/2025</startdate></data>',
+           '  <players>']
+    for uid, first, last, _ in players:
+        out.append(f'    <player userid={quoteattr(uid)}><firstname>{first}</firstname>'
+                   f'<lastname>{last}</lastname></player>')
+    out.append('  </players>')
+    out.append('  <rounds>')
+    for number, matches in enumerate(round_matches, start=1):
+        out.append(f'    <round number="{number}"><matches>')
+        for a, b, outcome in matches:
+            if b is None:
+                out.append(f'      <match outcome="5"><timestamp>03/15/2025 10:00:00</timestamp>'
+                           f'<player userid={quoteattr(a)}/></match>')
+            else:
+                out.append(f'      <match outcome="{outcome}"><timestamp>03/15/2025 10:00:00</timestamp>'
+                           f'<player1 userid={quoteattr(a)}/><player2 userid={quoteattr(b)}/></match>')
+        out.append('    </matches></round>')
+    out.append('  </rounds>')
+    out.append('  <standings><pod category="2">')
+    for place, uid in enumerate(_final_order(records), start=1):
+        out.append(f'    <player id={quoteattr(uid)} place="{place}"/>')
+    out.append('  </pod></standings>')
+    out.append('</tournament>')
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(out))
+    return path
+
+
+def write_onepiece_csvs(directory: str, n_players: int = 48, rounds: int = 5, seed: int = 0) -> Tuple[List[str], str]:
+    """
+    CSV One Piece sintetici: un file per round + ClassificaFinale.
+
+    Returns:
+        (round_files, classifica_finale): formato letto da
+        import_onepiece.parse_round_files / parse_classifica_finale
+    """
+    rng, players = _entrants(seed, n_players, 1_000_000)
+    names = {uid: f"{first} {last}" for uid, first, last, _ in players}
+    records = {uid: [0, 0, 0] for uid in names}
+    round_matches, _ = _swiss(rng, [(p[0], None, p[3]) for p in players], rounds)
+    round_files = []
+    for number, matches in enumerate(round_matches, start=1):
+        for a, b, outcome in matches:
+            if outcome in ("1", "5"):
+                records[a][0] += 1
+                if b is not None:
+                    records[b][1] += 1
+            elif outcome == "2":
+                records[b][0] += 1
+                records[a][1] += 1
+            else:
+                records[a][2] += 1
+                records[b][2] += 1
+        path = os.path.join(directory, f"R{number}.csv")
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL)
+            writer.writerow(["Rank", "Match Point", "Status", "Player Name - 1", "Membership Number - 1"])
+            for rank, uid in enumerate(_final_order(records), start=1):
+                w, _, t = records[uid]
+                writer.writerow([rank, w * 3 + t, "Active", names[uid], uid])
+        round_files.append(path)
+    final = os.path.join(directory, "ClassificaFinale.csv")
+    with open(final, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Ranking", "Membership Number", "User Name", "Win Points", "OMW %", "OOMW %",
+                         "Memo", "Deck URLs"])
+        for rank, uid in enumerate(_final_order(records), start=1):
+            w, _, t = records[uid]
+            writer.writerow([rank, uid, names[uid], w * 3 + t, f"{40 + rng.random() * 30:.2f}%",
+                             f"{40 + rng.random() * 30:.2f}%", "", ""])
+    return round_files, final
+
+
+def write_riftbound_csvs(directory: str, n_players: int = 32, rounds: int = 4, seed: int = 0) -> List[str]:
+    """CSV Riftbound sintetici a 22 colonne, uno per round (import_riftbound.parse_csv_rounds)."""
+    rng, players = _entrants(seed, n_players, 7_000_000)
+    info = {uid: (first, last) for uid, first, last, _ in players}
+    records = {uid: [0, 0, 0] for uid in info}
+    round_matches, _ = _swiss(rng, [(p[0], None, p[3]) for p in players], rounds)
+    round_files = []
+    for number, matches in enumerate(round_matches, start=1):
+        path = os.path.join(directory, f"riftbound_R{number}.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Table Number", "Feature Match", "Ghost Match", "Match Deck Checked",
+                             "Player 1 User ID", "Player 1 First Name", "Player 1 Last Name", "Player 1 Email",
+                             "Player 2 User ID", "Player 2 First Name", "Player 2 Last Name", "Player 2 Email",
+                             "Match Status", "Match Result", "Player 1 Round Record", "Player 2 Round Record",
+                             "Player 1 Event Record", "Player 2 Event Record", "Past Interactions",
+                             "Judge at table", "Registration", "Match Status"])
+            for table_number, (a, b, outcome) in enumerate(matches, start=1):
+                if b is None:
+                    records[a][0] += 1
+                    continue
+                if outcome == "1":
+                    records[a][0] += 1
+                    records[b][1] += 1
+                    result = f"{' '.join(info[a])}: 2-0-0"
+                elif outcome == "2":
+                    records[b][0] += 1
+                    records[a][1] += 1
+                    result = f"{' '.join(info[b])}: 2-1-0"
+                else:
+                    records[a][2] += 1
+                    records[b][2] += 1
+                    result = "Draw: 1-1-1"
+                wa, la, da = records[a]
+                wb, lb, db = records[b]
+                writer.writerow([table_number, "", "", "", a, *info[a], "", b, *info[b], "", "Completed",
+                                 result, "", "", f"{wa}-{la}-{da}", f"{wb}-{lb}-{db}", "", "", "", "Completed"])
+        round_files.append(path)
+    return round_files
@@ -160,6 +160,30 @@ def mock_achievement_definitions():
 # HELPER FUNCTIONS
 # =============================================================================
 
+# Membership sintetiche (10 cifre), in ordine: PLAYERS[0] = '0000000001'
+PLAYERS = [f"{k:010d}" for k in range(1, 41)]
+
+
+def tournament_rows(tid, players, match=True):
+    """
+    Righe Results di un torneo: players in ordine di classifica.
+
+    Punti, vittorie e OMW scendono con il rank; con match=False le colonne
+    W/T/L restano vuote (tornei importati senza i round).
+
+    USO (nei test):
+        from tests.conftest import PLAYERS, tournament_rows
+        rows = tournament_rows('OP12_2025-01-17', PLAYERS[:8])
+    """
+    n = len(players)
+    return [
+        [f"{tid}_{m}", tid, m, str(rank), str(max(0, 4 - rank) * 3), '50', str(max(0, 4 - rank)),
+         str(n - rank + 1), str(max(0, 4 - rank) + n - rank + 1), f"Player {m[-2:]}",
+         *((str(max(0, 4 - rank)), '0', str(min(3, rank - 1))) if match else ('', '', ''))]
+        for rank, m in enumerate(players, start=1)
+    ]
+
+
 def assert_page_loads(client, url, expected_status=200):
     """Helper: verifica che una pagina carichi correttamente."""
     response = client.get(url)
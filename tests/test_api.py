@@ -0,0 +1,181 @@
+"""
+LeagueForge - API v1 Tests
+==========================
+
+Test dell'API JSON in sola lettura (/api/v1).
+
+ESEGUI:
+    pytest tests/test_api.py -v
+"""
+
+import gzip
+import json
+
+import pytest
+from unittest.mock import patch
+
+from tests.conftest import PLAYERS, tournament_rows
+
+DATA = {
+    'seasons': [{'id': 'OP12', 'tcg': 'OP', 'name': 'One Piece S12', 'status': 'ACTIVE'},
+                {'id': 'OP11', 'tcg': 'OP', 'name': 'One Piece S11', 'status': 'CLOSED'}],
+    'standings_by_season': {
+        'OP12': [{'position': str(k), 'membership': m, 'name': f"Player {m[-2:]}", 'points': 50.0 - k,
+                  'tournaments_played': 3, 'tournaments_counted': 3, 'total_wins': 1, 'match_wins': 6,
+                  'best_rank': 1, 'top8_count': 2}
+                 for k, m in enumerate(PLAYERS, start=1)],
+    },
+    'tournaments_by_season': {
+        'OP12': [{'id': 'OP12_2025-01-17', 'tournament_id': 'OP12_2025-01-17', 'date': '2025-01-17',
+                  'participants': 40, 'winner': 'Player 01'}],
+    },
+}
+
+
+def _json(response):
+    body = response.data
+    if response.headers.get('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+@pytest.fixture(autouse=True)
+def clean_bodies():
+    from routes import api
+    api._bodies.clear()
+    yield
+    api._bodies.clear()
+
+
+@pytest.fixture
+def mock_cache():
+    from results_table import ResultsTable
+    table = ResultsTable(tournament_rows('OP12_2025-01-17', PLAYERS[:3]))
+    with patch('routes.api.cache') as mock_cache:
+        mock_cache.get_data.return_value = (DATA, None, (False, 0))
+        mock_cache.results_table.return_value = table
+        mock_cache.snapshot_version.return_value = 'v1'
+        mock_cache.data_version = None
+        yield mock_cache
+
+
+# =============================================================================
+# TEST: FORMATO
+# =============================================================================
+
+class TestPayloads:
+    """Payload colonnari dallo snapshot."""
+
+    def test_seasons(self, client, mock_cache):
+        payload = _json(client.get('/api/v1/seasons'))
+        assert payload['v'] == 'v1'
+        assert payload['seasons']['cols'][:2] == ['id', 'tcg']
+        assert [row[0] for row in payload['seasons']['rows']] == ['OP12', 'OP11']
+
+    def test_standings_columnar(self, client, mock_cache):
+        payload = _json(client.get('/api/v1/standings/OP12'))
+        cols = payload['standings']['cols']
+        first = dict(zip(cols, payload['standings']['rows'][0]))
+        assert first['membership'] == PLAYERS[0]
+        assert first['points'] == 49.0
+        assert len(payload['standings']['rows']) == len(PLAYERS)
+
+    def test_season_without_standings(self, client, mock_cache):
+        assert _json(client.get('/api/v1/standings/OP11'))['standings']['rows'] == []
+
+    def test_tournaments(self, client, mock_cache):
+        payload = _json(client.get('/api/v1/seasons/OP12/tournaments'))
+        assert payload['tournaments']['rows'] == [['OP12_2025-01-17', '2025-01-17', 40, 'Player 01']]
+
+    def test_player_profile(self, client, mock_cache):
+        from player_profiles import ProfileIndex, build_profile
+        with patch('routes.api.profiles') as profiles:
+            profiles.get.side_effect = lambda cache, m: build_profile(
+                ProfileIndex(cache.results_table(), [], [], [], []), m)
+            payload = _json(client.get(f'/api/v1/players/{PLAYERS[1]}'))
+        assert payload['tournaments_played'] == 1
+        assert payload['history']['cols'] == ['date', 'season', 'rank', 'points', 'record']
+        assert payload['history']['rows'][0][:3] == ['2025-01-17', 'OP12', 2]
+        assert 'chart_data' not in payload
+
+    @pytest.mark.parametrize('url', ['/api/v1/standings/XX12', '/api/v1/seasons/XX12/tournaments',
+                                     '/api/v1/stats/XX12', f'/api/v1/players/{PLAYERS[-1]}'])
+    def test_not_found(self, client, mock_cache, url):
+        response = client.get(url)
+        assert response.status_code == 404
+        assert 'error' in response.get_json()
+        assert response.get_etag() == (None, None)
+
+    def test_unavailable_cache(self, client, mock_cache):
+        mock_cache.get_data.return_value = (None, 'Errore Google', (False, 0))
+        response = client.get('/api/v1/seasons')
+        assert response.status_code == 503
+        assert response.get_json() == {'error': 'Errore Google'}
+
+
+# =============================================================================
+# TEST: STATS
+# =============================================================================
+
+class TestStats:
+    """Sezioni dallo stats_cache; quelle mancanti non finiscono in cache."""
+
+    def test_sections_filter(self, client, mock_cache):
+        with patch('app._stats_sections', return_value={'hof': {'x': 1}}) as sections:
+            payload = _json(client.get('/api/v1/stats/OP12?sections=hof'))
+        assert sections.call_args[0][1] == ['hof']
+        assert payload['sections'] == {'hof': {'x': 1}}
+        assert payload['pending'] == []
+
+    def test_unknown_section(self, client, mock_cache):
+        assert client.get('/api/v1/stats/OP12?sections=nope').status_code == 400
+
+    def test_pending_not_cached(self, client, mock_cache):
+        with patch('app._stats_sections', return_value={}):
+            response = client.get('/api/v1/stats/OP12?sections=hof')
+            assert response.headers['Cache-Control'] == 'no-store'
+            assert _json(response)['pending'] == ['hof']
+        with patch('app._stats_sections', return_value={'hof': {'x': 1}}):
+            assert _json(client.get('/api/v1/stats/OP12?sections=hof'))['sections'] == {'hof': {'x': 1}}
+
+
+# =============================================================================
+# TEST: COMPRESSIONE, ETAG, CACHE DEI BODY
+# =============================================================================
+
+class TestTransport:
+    """Costo quasi nullo per le richieste ripetute."""
+
+    def test_gzip_when_accepted(self, client, mock_cache):
+        response = client.get('/api/v1/standings/OP12', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Vary'] == 'Accept-Encoding'
+        plain = client.get('/api/v1/standings/OP12')
+        assert 'Content-Encoding' not in plain.headers
+        assert gzip.decompress(response.data) == plain.data
+        assert len(response.data) < len(plain.data)
+
+    def test_small_body_not_compressed(self, client, mock_cache):
+        response = client.get('/api/v1/seasons/OP12/tournaments', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_brotli_when_available(self, client, mock_cache):
+        brotli = pytest.importorskip('brotli')
+        response = client.get('/api/v1/standings/OP12', headers={'Accept-Encoding': 'gzip, br'})
+        assert response.headers['Content-Encoding'] == 'br'
+        assert json.loads(brotli.decompress(response.data))['v'] == 'v1'
+
+    def test_etag_304(self, client, mock_cache):
+        etag = client.get('/api/v1/standings/OP12').headers['ETag']
+        response = client.get('/api/v1/standings/OP12', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_body_serialized_once_per_version(self, client, mock_cache):
+        from routes import api
+        with patch('routes.api._columns', wraps=api._columns) as columns:
+            for _ in range(3):
+                client.get('/api/v1/standings/OP12', headers={'Accept-Encoding': 'gzip'})
+            assert columns.call_count == 1
+            mock_cache.snapshot_version.return_value = 'v2'
+            assert _json(client.get('/api/v1/standings/OP12', headers={'Accept-Encoding': 'gzip'}))['v'] == 'v2'
+            assert columns.call_count == 2
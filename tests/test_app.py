@@ -11,6 +11,8 @@ ESEGUI:
 import pytest
 from unittest.mock import patch, MagicMock
 
+from tests.conftest import PLAYERS, tournament_rows
+
 
 # =============================================================================
 # TEST: PAGINE PUBBLICHE
@@ -178,3 +180,206 @@ class TestApiEndpoints:
             response = client.get('/api/refresh')
             # Deve restituire JSON o redirect
             assert response.status_code in [200, 302]
+
+
+# =============================================================================
+# TEST: NORMALIZZAZIONE PAYLOAD STATS
+# =============================================================================
+
+class TestNormalizeBuilderResult:
+    """Default solo per le sezioni non richieste al builder."""
+
+    def test_full_payload_gets_every_default(self):
+        from app import _normalize_builder_result
+        payload = _normalize_builder_result({'OP12': {}}, 'OP12')
+        assert payload['hof']['fastest_riser'] is None
+        assert payload['pulse']['kpi']['events_total'] == 0
+
+    def test_requested_sections_left_as_built(self):
+        from app import _normalize_builder_result
+        payload = _normalize_builder_result({'OP12': {'spotlights': {'dominatore': []}}}, 'OP12',
+                                            sections=['spotlights'])
+        assert payload['spotlights'] == {'dominatore': []}
+        assert payload['hof']['highest_single_score'] is None
+        assert payload['tales']['companions'] == []
+
+
+# =============================================================================
+# TEST: STATS SENZA CALCOLO NELLA RICHIESTA
+# =============================================================================
+
+class TestStatsSections:
+    """Le route leggono cache o artifact; i buchi vanno in background."""
+
+    @pytest.fixture
+    def results(self, tmp_path, monkeypatch):
+        import stats_artifacts
+        import stats_cache
+        from results_table import ResultsTable
+        monkeypatch.setattr(stats_cache, 'BASE_DIR', tmp_path)
+        monkeypatch.setattr(stats_artifacts, 'BASE_DIR', tmp_path / 'artifacts')
+        stats_cache._memory.clear()
+        yield ResultsTable(tournament_rows('OP12_2025-01-17', PLAYERS[:3]))
+        stats_cache._memory.clear()
+
+    def test_cold_scope_scheduled_not_built(self, results):
+        import app
+        scheduled = []
+        with patch('app.cache') as mock_cache, \
+                patch('app._schedule_stats_build', side_effect=scheduled.append), \
+                patch('stats_builder.StatsState.payload', side_effect=AssertionError('build nella richiesta')):
+            mock_cache.results_table.return_value = results
+            mock_cache.sheet_fingerprint.return_value = 'fp'
+            assert app._stats_sections('OP12', app.SECTIONS) == {}
+        assert scheduled == [['OP12']]
+
+    def test_artifact_served(self, results):
+        import app
+        from stats_artifacts import write_artifacts
+        write_artifacts(results, ['OP12'])
+        with patch('app.cache') as mock_cache, patch('app._schedule_stats_build') as schedule:
+            mock_cache.results_table.return_value = results
+            mock_cache.sheet_fingerprint.return_value = 'fp'
+            out = app._stats_sections('OP12', ['spotlights', 'hof'])
+        assert list(out) == ['spotlights', 'hof']
+        schedule.assert_not_called()
+
+
+# =============================================================================
+# TEST: NEGATIVE CACHE (membership / scope inesistenti)
+# =============================================================================
+
+class TestNegativeCache:
+    """404 dagli indici dello snapshot, poi senza rileggere la cache."""
+
+    @pytest.fixture(autouse=True)
+    def clean(self):
+        import app
+        app._forget_missing()
+        yield
+        app._forget_missing()
+
+    @pytest.fixture
+    def mock_cache(self):
+        from results_table import ResultsTable
+        table = ResultsTable(tournament_rows('OP12_2025-01-17', PLAYERS[:2]))
+        with patch('app.cache') as mock_cache:
+            mock_cache.get_data.return_value = ({'seasons': []}, None, (False, 0))
+            mock_cache.results_table.return_value = table
+            yield mock_cache
+
+    def test_unknown_player_remembered(self, client, mock_cache):
+        assert client.get('/player/0000009999').status_code == 404
+        calls = mock_cache.get_data.call_count
+        response = client.get('/player/0000009999')
+        assert response.status_code == 404
+        assert b'Giocatore non trovato' in response.data
+        assert mock_cache.get_data.call_count == calls
+
+    def test_unknown_scope_skips_stats_lookup(self, client, mock_cache):
+        with patch('app._stats_sections', side_effect=AssertionError('lookup stats')):
+            assert client.get('/stats/OP99').status_code == 404
+            calls = mock_cache.get_data.call_count
+            assert client.get('/stats/OP99').status_code == 404
+        assert mock_cache.get_data.call_count == calls
+
+    def test_forget_after_import(self, client, mock_cache):
+        import app
+        with patch('app.profiles') as profiles:
+            profiles.get.return_value = None
+            client.get('/player/0000000001')
+        assert app._known_missing('player', '0000000001') is not None
+        app._forget_missing()
+        assert app._known_missing('player', '0000000001') is None
+
+    def test_disabled_with_zero_ttl(self, monkeypatch):
+        import app
+        monkeypatch.setattr(app, 'NEGATIVE_CACHE_SECONDS', 0)
+        app._remember_missing('player', 'x', 'page')
+        assert app._known_missing('player', 'x') is None
+
+    def test_bounded(self, monkeypatch):
+        import app
+        monkeypatch.setattr(app, 'NEGATIVE_CACHE_MAX_ENTRIES', 3)
+        for k in range(5):
+            app._remember_missing('player', str(k), 'page')
+        assert app._known_missing('player', '0') is None
+        assert app._known_missing('player', '4') == 'page'
+
+
+# =============================================================================
+# TEST: CACHE PAGINE RENDERIZZATE
+# =============================================================================
+
+class TestRenderedPages:
+    """HTML riusato finché la versione dello snapshot non cambia."""
+
+    @pytest.fixture(autouse=True)
+    def clean(self):
+        from app import pages
+        pages.clear()
+        yield
+        pages.clear()
+
+    @pytest.fixture
+    def mock_cache(self):
+        from results_table import ResultsTable
+        table = ResultsTable(tournament_rows('OP12_2025-01-17', PLAYERS[:2]))
+        with patch('app.cache') as mock_cache, patch('http_cache.HTTP_CACHE_MAX_AGE', 0):
+            mock_cache.get_data.return_value = ({'seasons': []}, None, (False, 0))
+            mock_cache.results_table.return_value = table
+            mock_cache.snapshot_version.return_value = 'v1'
+            mock_cache.data_version = None
+            yield mock_cache
+
+    @pytest.fixture
+    def profile(self):
+        from player_profiles import ProfileIndex, build_profile
+        with patch('app.profiles') as profiles:
+            profiles.get.side_effect = lambda cache, m: build_profile(
+                ProfileIndex(cache.results_table(), [], [], [], []), m)
+            yield profiles
+
+    def test_player_page_reused(self, client, mock_cache, profile):
+        first = client.get('/player/0000000001')
+        assert first.status_code == 200
+        second = client.get('/player/0000000001')
+        assert second.data == first.data
+        assert profile.get.call_count == 1
+
+    def test_new_snapshot_renders_again(self, client, mock_cache, profile):
+        client.get('/player/0000000001')
+        mock_cache.snapshot_version.return_value = 'v2'
+        assert client.get('/player/0000000001').status_code == 200
+        assert profile.get.call_count == 2
+
+    def test_pending_stats_not_stored(self, client, mock_cache):
+        from app import pages
+        with patch('app._stats_sections', return_value={}):
+            response = client.get('/stats/OP12')
+        assert response.headers['Cache-Control'] == 'no-store'
+        assert pages.get('v1', ('stats', 'OP12')) is None
+
+    CLASSIFICA_DATA = {
+        'seasons': [{'id': 'OP12', 'name': 'OP12', 'status': 'ACTIVE'}],
+        'standings_by_season': {'OP12': [{'position': '1', 'membership': '0000000001',
+                                          'name': 'Player 01', 'points': 10.0}]},
+    }
+
+    def test_classifica_key_ignores_cache_age(self, client, mock_cache):
+        from app import pages
+        mock_cache.get_data.return_value = (self.CLASSIFICA_DATA, None, (False, 1))
+        first = client.get('/classifica/OP12')
+        assert first.status_code == 200
+        hits = pages.stats()['hits']
+        mock_cache.get_data.return_value = (self.CLASSIFICA_DATA, None, (False, 4))
+        assert client.get('/classifica/OP12').data == first.data
+        assert pages.stats()['hits'] == hits + 1
+
+    def test_stale_classifica_not_stored(self, client, mock_cache):
+        from app import pages
+        mock_cache.get_data.return_value = (self.CLASSIFICA_DATA, None, (True, 7))
+        response = client.get('/classifica/OP12')
+        assert response.headers['Cache-Control'] == 'no-store'
+        assert 'Dati di 7 minuti fa' in response.get_data(as_text=True)
+        assert pages.get('v1', ('classifica', 'OP12')) is None
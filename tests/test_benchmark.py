@@ -0,0 +1,141 @@
+"""
+LeagueForge - Benchmark Tests
+=============================
+
+Test del generatore di leghe sintetiche e del runner dei benchmark.
+
+ESEGUI:
+    pytest tests/test_benchmark.py -v
+    pytest tests/test_benchmark.py -v -m "not slow"
+"""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def fresh_results_cache():
+    """Ogni lega sintetica viene riletta (cache ResultsTable per sheet.id)."""
+    from results_table import invalidate_results_table
+    invalidate_results_table()
+    yield
+    invalidate_results_table()
+
+
+# =============================================================================
+# GENERATORE
+# =============================================================================
+
+class TestSyntheticLeague:
+    """Lega sintetica deterministica."""
+
+    def test_same_seed_same_league(self):
+        from synthetic_league import generate_league
+        assert generate_league(1000, seed=3) == generate_league(1000, seed=3)
+        assert generate_league(1000, seed=3)["Results"] != generate_league(1000, seed=4)["Results"]
+
+    def test_row_count_near_scale(self):
+        from synthetic_league import generate_league
+        for n in (1000, 5000):
+            rows = generate_league(n)["Results"][3:]
+            assert n <= len(rows) < n * 1.1
+
+    def test_covers_every_tcg(self):
+        from synthetic_league import SyntheticSheet, generate_league
+        from results_table import load_results_table
+        table = load_results_table(SyntheticSheet(generate_league(1000), sheet_id="t-cover"))
+        prefixes = {s.split("-")[0].rstrip("0123456789") for s in table.by_season}
+        assert {"OP", "PKM", "RFB"} <= prefixes
+
+    def test_first_season_archived(self):
+        from synthetic_league import generate_league
+        config = generate_league(5000)["Config"][4:]
+        status = {row[0]: row[4] for row in config}
+        assert status["OP01"] == "ARCHIVED"
+        assert "ACTIVE" in status.values()
+
+    def test_sheet_exposes_worksheets(self):
+        from synthetic_league import SyntheticSheet, generate_league
+        sheet = SyntheticSheet(generate_league(1000), sheet_id="t-ws")
+        assert sheet.id == "t-ws"
+        assert len(sheet.worksheet("Results").get_all_values()) > 1000
+        with pytest.raises(Exception):
+            sheet.worksheet("Missing")
+
+
+class TestImportFiles:
+    """I file sintetici passano per i parser reali."""
+
+    def test_parse_tdf(self, tmp_path):
+        from synthetic_league import write_tdf
+        from import_pokemon import parse_tdf
+        data = parse_tdf(write_tdf(str(tmp_path / "t.tdf"), n_players=16, rounds=4), "PKM-FS01")
+        assert len(data["players"]) == 16
+
+    def test_parse_onepiece(self, tmp_path):
+        from synthetic_league import write_onepiece_csvs
+        from import_onepiece import parse_round_files, parse_classifica_finale
+        rounds, final = write_onepiece_csvs(str(tmp_path), n_players=12, rounds=3)
+        assert len(rounds) == 3
+        assert parse_round_files(rounds)
+        assert len(parse_classifica_finale(final)) == 12
+
+    def test_parse_riftbound(self, tmp_path):
+        from synthetic_league import write_riftbound_csvs
+        from import_riftbound import parse_csv_rounds
+        rounds = write_riftbound_csvs(str(tmp_path), n_players=10, rounds=3)
+        assert len(rounds) == 3
+        assert parse_csv_rounds(rounds)
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+class TestCompare:
+    """Confronto con la baseline."""
+
+    def test_regression_over_tolerance(self):
+        from benchmark import compare
+        rows = {r["name"]: r for r in compare({"a": 1.5, "b": 1.1, "c": 0.5}, {"a": 1.0, "b": 1.0, "c": 1.0})}
+        assert rows["a"]["regression"]
+        assert not rows["b"]["regression"]
+        assert not rows["c"]["regression"]
+
+    def test_missing_baseline_is_not_regression(self):
+        from benchmark import compare
+        row = compare({"new": 9.0}, {})[0]
+        assert row["baseline"] is None and row["ratio"] is None
+        assert not row["regression"]
+
+    def test_save_keeps_other_scales(self, tmp_path):
+        from benchmark import save_baseline, load_baseline
+        path = tmp_path / "baseline.json"
+        save_baseline({"1k": {"a": 0.1}}, path)
+        save_baseline({"50k": {"a": 2.0}}, path)
+        baseline = load_baseline(path)
+        assert set(baseline["scales"]) == {"1k", "50k"}
+        assert "python" in baseline["meta"]
+
+    def test_shipped_baseline_covers_benchmarks(self):
+        from benchmark import BENCHMARKS, load_baseline
+        scales = load_baseline()["scales"]
+        assert {"1k", "50k"} <= set(scales)
+        assert set(scales["1k"]) == set(BENCHMARKS)
+
+
+@pytest.mark.slow
+class TestRunBenchmarks:
+    """Runner completo sulla scala 1k."""
+
+    def test_runs_every_benchmark(self, tmp_path):
+        from benchmark import BENCHMARKS, build_context, run_benchmarks
+        ctx = build_context("1k", workdir=str(tmp_path))
+        timings = run_benchmarks(ctx, repeats=1)
+        assert set(timings) == set(BENCHMARKS)
+        assert all(t >= 0 for t in timings.values())
+
+    def test_only_by_prefix(self, tmp_path):
+        from benchmark import build_context, run_benchmarks
+        ctx = build_context("1k", workdir=str(tmp_path))
+        timings = run_benchmarks(ctx, ["compute_for_scope"], repeats=1)
+        assert set(timings) == {"compute_for_scope[season]", "compute_for_scope[ALL-OP]"}
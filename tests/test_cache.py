@@ -0,0 +1,609 @@
+"""
+LeagueForge - Cache Tests
+========================
+
+Test dello snapshot SheetCache (nessuna connessione reale a Google Sheets).
+
+ESEGUI:
+    pytest tests/test_cache.py -v
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+
+# =============================================================================
+# FAKE SPREADSHEET
+# =============================================================================
+
+SHEET_VALUES = {
+    'Config': [
+        [], [], [], [],
+        ['OP12', 'OP', 'One Piece S12', '12', 'ACTIVE'],
+    ],
+    'Seasonal_Standings_PROV': [
+        [], [], [],
+        ['OP12', '0000012345', 'Mario Rossi', '45', '5', '5', '2', '12', '1', '4', '1'],
+    ],
+    'Seasonal_Standings_FINAL': [[], [], []],
+    'Tournaments': [
+        [], [], [],
+        ['OP12_2025-01-15', 'OP12', '2025-01-15', '16', '4', '', '', 'Mario Rossi'],
+    ],
+    'Results': [
+        [], [], [],
+        ['OP12_2025-01-15_0000012345', 'OP12_2025-01-15', '0000012345', '1', '12', '60',
+         '4', '16', '20', 'Mario Rossi', '4', '0', '0'],
+    ],
+    'Players': [[], [], [], ['0000012345', 'Mario Rossi', 'OP']],
+    'Player_Stats': [[], [], []],
+    'Achievement_Definitions': [[], [], [], []],
+}
+
+
+class FakeSpreadsheet:
+    """Simula gspread.Spreadsheet contando le letture."""
+
+    def __init__(self, values):
+        self.values = values
+        self.reads = 0
+        self.batch_calls = 0
+
+    def values_batch_get(self, ranges):
+        import gspread
+        self.batch_calls += 1
+        names = [r.strip("'") for r in ranges]
+        if any(n not in self.values for n in names):
+            response = MagicMock()
+            response.json.return_value = {'error': {'code': 400, 'message': 'Unable to parse range'}}
+            raise gspread.exceptions.APIError(response)
+        return {'valueRanges': [{'range': r, 'values': self.values[n]} for r, n in zip(ranges, names)]}
+
+    def worksheets(self):
+        out = []
+        for name in self.values:
+            ws = MagicMock()
+            ws.title = name
+            out.append(ws)
+        return out
+
+    def worksheet(self, name):
+        import gspread
+        if name not in self.values:
+            raise gspread.WorksheetNotFound(name)
+        ws = MagicMock()
+
+        def _get_all_values():
+            self.reads += 1
+            return self.values[name]
+
+        ws.get_all_values.side_effect = _get_all_values
+        return ws
+
+
+@pytest.fixture
+def sheet_cache(tmp_path, monkeypatch):
+    """SheetCache con file cache isolato e spreadsheet finto."""
+    import cache as cache_module
+    monkeypatch.setattr(cache_module, 'CACHE_FILE', str(tmp_path / 'cache_data.json'))
+
+    fake = FakeSpreadsheet(SHEET_VALUES)
+    sc = cache_module.SheetCache()
+    monkeypatch.setattr(sc, 'connect_sheet', lambda: fake)
+    return sc, fake
+
+
+# =============================================================================
+# TEST: SNAPSHOT FOGLI
+# =============================================================================
+
+class TestSheetSnapshot:
+    """Le route leggono i fogli dallo snapshot, non da Google Sheets."""
+
+    def test_fetch_includes_snapshot_sheets(self, sheet_cache):
+        sc, fake = sheet_cache
+        success, error = sc.fetch_data()
+        assert success, error
+
+        sheets = sc.cache_data['sheets']
+        assert sheets['Results'][3][2] == '0000012345'
+        assert sheets['Players'][3][0] == '0000012345'
+
+    def test_missing_sheet_is_empty(self, sheet_cache):
+        """Player_Achievements non esiste: snapshot vuoto, nessun errore."""
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        assert sc.get_sheet_rows('Player_Achievements') == []
+
+    def test_get_sheet_rows_no_extra_reads(self, sheet_cache):
+        """Letture ripetute entro il TTL non toccano il foglio."""
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        reads_after_fetch = fake.reads
+
+        for _ in range(5):
+            sc.get_sheet_rows('Results')
+            sc.get_sheet_rows('Achievement_Definitions')
+
+        assert fake.reads == reads_after_fetch
+
+    def test_old_cache_without_sheets_needs_refresh(self, sheet_cache):
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        del sc.cache_data['sheets']
+        assert sc.needs_refresh()
+
+
+# =============================================================================
+# TEST: REFRESH CON BATCHGET
+# =============================================================================
+
+class TestBatchRefresh:
+    """Il refresh legge tutti i fogli con values:batchGet."""
+
+    def test_refresh_uses_batch_get(self, sheet_cache):
+        sc, fake = sheet_cache
+        values = dict(SHEET_VALUES, Player_Achievements=[[], [], [], []])
+        fake.values = values
+
+        success, error = sc.fetch_data()
+        assert success, error
+        assert fake.batch_calls == 1
+        assert fake.reads == 0  # nessun get_all_values() per foglio
+        # Spreadsheet già aperto (sheet_connection): solo il batchGet
+        assert sc.last_refresh['api_calls'] == 1
+
+    def test_missing_sheet_falls_back_to_existing(self, sheet_cache):
+        """Player_Achievements manca: batchGet ritentato solo sui fogli esistenti."""
+        sc, fake = sheet_cache
+        success, error = sc.fetch_data()
+        assert success, error
+        assert fake.batch_calls == 2
+        assert sc.last_refresh['api_calls'] == 3  # batchGet + worksheets() + retry
+        assert sc.cache_data['standings_by_season']['OP12'][0]['name'] == 'Mario Rossi'
+
+    def test_missing_required_sheet_fails(self, sheet_cache):
+        sc, fake = sheet_cache
+        fake.values = {k: v for k, v in SHEET_VALUES.items() if k != 'Config'}
+        success, error = sc.fetch_data()
+        assert not success
+        assert 'Config' in error
+
+    def test_ragged_rows_are_padded(self, sheet_cache):
+        """Come get_all_values(): righe con celle finali vuote vengono riempite."""
+        sc, fake = sheet_cache
+        fake.values = dict(SHEET_VALUES, Players=[[], [], [], ['0000012345', 'Mario Rossi', 'OP', 'x'], ['0000067890']])
+        sc.fetch_data()
+        players = sc.get_sheet_rows('Players')
+        assert players[4] == ['0000067890', '', '', '']
+
+
+# =============================================================================
+# TEST: STALE-WHILE-REVALIDATE
+# =============================================================================
+
+class TestBackgroundRefresh:
+    """Con snapshot scaduto, get_data() risponde subito e aggiorna in background."""
+
+    def _expire(self, sc):
+        from datetime import datetime, timedelta
+        sc.last_update = datetime.now() - timedelta(hours=2)
+
+    def _gate(self, fake):
+        """Blocca values_batch_get finché il test non rilascia l'evento."""
+        import threading
+        gate = threading.Event()
+        original = fake.values_batch_get
+
+        def _blocked(ranges):
+            gate.wait(timeout=5)
+            return original(ranges)
+
+        fake.values_batch_get = _blocked
+        return gate
+
+    def test_stale_snapshot_served_immediately(self, sheet_cache):
+        sc, fake = sheet_cache
+        sc.background_refresh = True
+        sc.fetch_data()
+        old_data = sc.cache_data
+        self._expire(sc)
+        gate = self._gate(fake)
+
+        data, err, meta = sc.get_data()
+        assert err is None
+        assert data is old_data
+        assert meta[0] is True  # is_stale
+        assert meta[1] >= 120
+        assert sc.is_refreshing()
+
+        gate.set()
+        sc._refresh_thread.join(timeout=5)
+        assert sc.cache_data is not old_data
+        assert not sc.needs_refresh()
+        assert sc.get_data()[2][0] is False
+
+    def test_single_background_thread(self, sheet_cache):
+        sc, fake = sheet_cache
+        sc.background_refresh = True
+        sc.fetch_data()
+        self._expire(sc)
+        gate = self._gate(fake)
+
+        assert sc.refresh_async() is True
+        thread = sc._refresh_thread
+        for _ in range(3):
+            sc.get_data()
+        assert sc._refresh_thread is thread
+
+        gate.set()
+        thread.join(timeout=5)
+
+    def test_first_load_is_synchronous(self, sheet_cache):
+        sc, fake = sheet_cache
+        sc.background_refresh = True
+        data, err, meta = sc.get_data()
+        assert err is None
+        assert data['standings_by_season']['OP12'][0]['name'] == 'Mario Rossi'
+        assert sc._refresh_thread is None
+
+    def test_failed_refresh_keeps_old_data(self, sheet_cache):
+        sc, fake = sheet_cache
+        sc.background_refresh = True
+        sc.fetch_data()
+        self._expire(sc)
+        fake.values = {}
+        sc.get_data()
+        sc._refresh_thread.join(timeout=5)
+
+        data, err, meta = sc.get_data()
+        assert data['standings_by_season']['OP12'][0]['name'] == 'Mario Rossi'
+        assert meta[0] is True
+        assert sc.last_error
+        assert sc.refresh_async() is False  # attesa REFRESH_RETRY_SECONDS
+
+    def test_synchronous_mode(self, sheet_cache):
+        sc, fake = sheet_cache
+        sc.background_refresh = False
+        sc.fetch_data()
+        self._expire(sc)
+        data, err, meta = sc.get_data()
+        assert meta[0] is False
+        assert sc._refresh_thread is None
+
+
+# =============================================================================
+# TEST: SINGLE-FLIGHT E SCRITTURA ATOMICA
+# =============================================================================
+
+class TestSingleFlight:
+    """Un solo fetch alla volta, file cache mai troncato."""
+
+    def test_concurrent_fetch_runs_once(self, sheet_cache):
+        import threading
+        sc, fake = sheet_cache
+        gate = threading.Event()
+        original = fake.values_batch_get
+
+        def _blocked(ranges):
+            gate.wait(timeout=5)
+            return original(ranges)
+
+        fake.values_batch_get = _blocked
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(sc.fetch_data())) for _ in range(5)]
+        for t in threads:
+            t.start()
+        gate.set()
+        for t in threads:
+            t.join(timeout=5)
+
+        assert len(results) == 5
+        assert all(ok for ok, err in results)
+        # 1 fetch: batchGet + retry per Player_Achievements mancante
+        assert fake.batch_calls == 2
+
+    def test_sync_mode_serves_old_data_while_fetching(self, sheet_cache):
+        from datetime import datetime, timedelta
+        sc, fake = sheet_cache
+        sc.background_refresh = False
+        sc.fetch_data()
+        old_data = sc.cache_data
+        sc.last_update = datetime.now() - timedelta(hours=2)
+
+        with sc._fetch_lock:  # simula un fetch in corso in un altro thread
+            data, err, meta = sc.get_data()
+        assert data is old_data
+        assert meta[0] is True
+
+    def test_save_is_atomic(self, sheet_cache, monkeypatch):
+        import json
+        import os
+        import cache as cache_module
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        with open(cache_module.CACHE_FILE, encoding='utf-8') as f:
+            before = f.read()
+
+        def _crash(*args, **kwargs):
+            raise OSError('disk full')
+
+        # Crash dopo aver scritto il file temporaneo, prima di os.replace()
+        monkeypatch.setattr(cache_module.os, 'fsync', _crash)
+        sc.cache_data['seasons'].append({'id': 'OP13'})
+        with pytest.raises(OSError):
+            sc.save_to_file()
+
+        with open(cache_module.CACHE_FILE, encoding='utf-8') as f:
+            assert f.read() == before
+        assert json.loads(before)['data']['seasons'][0]['id'] == 'OP12'
+        leftovers = [n for n in os.listdir(os.path.dirname(cache_module.CACHE_FILE)) if n.endswith('.tmp')]
+        assert leftovers == []
+
+    def test_corrupt_file_is_reported(self, tmp_path, monkeypatch, capsys):
+        import cache as cache_module
+        path = tmp_path / 'cache_data.json'
+        path.write_text('{"timestamp": "2025-01-', encoding='utf-8')
+        monkeypatch.setattr(cache_module, 'CACHE_FILE', str(path))
+
+        sc = cache_module.SheetCache()
+        assert sc.cache_data is None
+        assert 'illeggibile' in capsys.readouterr().out
+
+
+# =============================================================================
+# TEST: CHANGE DETECTION
+# =============================================================================
+
+class TestChangeDetection:
+    """Se il modifiedTime non cambia, il refresh non rilegge i fogli."""
+
+    @pytest.fixture
+    def versioned(self, sheet_cache):
+        sc, fake = sheet_cache
+        fake.modified = '2025-01-15T20:00:00.000Z'
+        fake.get_lastUpdateTime = lambda: fake.modified
+        return sc, fake
+
+    def test_unchanged_sheet_costs_one_call(self, versioned):
+        sc, fake = versioned
+        sc.fetch_data()
+        first_update = sc.last_update
+        batch_before = fake.batch_calls
+
+        success, error = sc.fetch_data()
+        assert success, error
+        assert fake.batch_calls == batch_before
+        assert sc.last_refresh['api_calls'] == 1
+        assert sc.last_refresh['unchanged'] is True
+        assert sc.last_update >= first_update
+        assert not sc.needs_refresh()
+
+    def test_changed_sheet_is_reloaded(self, versioned):
+        sc, fake = versioned
+        sc.fetch_data()
+        batch_before = fake.batch_calls
+
+        fake.modified = '2025-01-16T09:30:00.000Z'
+        success, error = sc.fetch_data()
+        assert success, error
+        assert fake.batch_calls > batch_before
+        assert sc.last_refresh['unchanged'] is False
+        assert sc.data_version == '2025-01-16T09:30:00.000Z'
+
+    def test_version_unavailable_falls_back_to_full_read(self, sheet_cache):
+        """FakeSpreadsheet senza Drive: ogni refresh rilegge tutto."""
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        batch_before = fake.batch_calls
+        sc.fetch_data()
+        assert fake.batch_calls > batch_before
+        assert sc.data_version is None
+
+
+# =============================================================================
+# TEST: FORMATO SU DISCO (SCHEMA 3, SHARD)
+# =============================================================================
+
+class TestShardedCacheFile:
+    """Manifest compatto + uno shard per stagione, letti solo su richiesta."""
+
+    def _two_seasons(self, fake):
+        values = dict(SHEET_VALUES)
+        values['Config'] = SHEET_VALUES['Config'] + [['OP11', 'OP', 'One Piece S11', '11', 'CLOSED']]
+        values['Seasonal_Standings_FINAL'] = [[], [], [], ['OP11', '0000067890', 'Luigi Verdi', '30']]
+        fake.values = values
+
+    def test_manifest_is_compact_without_aliases(self, sheet_cache):
+        import json
+        import cache as cache_module
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        with open(cache_module.CACHE_FILE, encoding='utf-8') as f:
+            raw = f.read()
+        manifest = json.loads(raw)['data']
+
+        assert manifest['schema_version'] == 3
+        assert '\n' not in raw
+        assert 'standings' not in manifest and 'tournaments' not in manifest
+        assert 'standings_by_season' not in manifest
+        assert set(manifest['season_shards']) == {'OP12'}
+
+    def test_seasons_loaded_lazily(self, sheet_cache):
+        import cache as cache_module
+        sc, fake = sheet_cache
+        self._two_seasons(fake)
+        sc.fetch_data()
+
+        warm = cache_module.SheetCache()
+        assert warm._season_store.loaded == {}
+        assert warm.cache_data['season_summary']['OP11']['players'] == ['0000067890']
+
+        standings = warm.cache_data['standings_by_season'].get('OP12', [])
+        assert standings[0]['name'] == 'Mario Rossi'
+        assert set(warm._season_store.loaded) == {'OP12'}
+        assert warm.cache_data['standings']['OP12'] is standings  # alias in memoria
+        assert warm.get_sheet_rows('Results')[3][2] == '0000012345'
+
+    def test_unchanged_shards_not_rewritten(self, sheet_cache):
+        import os
+        import cache as cache_module
+        sc, fake = sheet_cache
+        self._two_seasons(fake)
+        sc.fetch_data()
+        shard_dir = cache_module._shard_dir()
+        op11 = sc._season_store.files['OP11']
+        mtime = os.path.getmtime(os.path.join(shard_dir, op11))
+
+        fake.values['Results'] = fake.values['Results'] + [['OP12_2025-01-22_0000012345']]
+        sc.fetch_data()
+        assert sc._season_store.files['OP11'] == op11
+        assert os.path.getmtime(os.path.join(shard_dir, op11)) == mtime
+
+    def test_reads_schema_2_file(self, tmp_path, monkeypatch):
+        import json
+        import cache as cache_module
+        path = tmp_path / 'cache_data.json'
+        path.write_text(json.dumps({
+            'timestamp': '2025-01-15T20:00:00',
+            'data': {
+                'schema_version': 2,
+                'seasons': [{'id': 'OP12'}],
+                'standings_by_season': {'OP12': [{'membership': '0000012345', 'name': 'Mario Rossi'}]},
+                'tournaments_by_season': {},
+                'sheets': {'Results': [[], [], []]},
+                'standings': {'OP12': []},
+                'tournaments': {}
+            }
+        }), encoding='utf-8')
+        monkeypatch.setattr(cache_module, 'CACHE_FILE', str(path))
+
+        sc = cache_module.SheetCache()
+        assert sc.cache_data['standings_by_season']['OP12'][0]['name'] == 'Mario Rossi'
+        assert sc.cache_data['season_summary']['OP12']['players'] == ['0000012345']
+
+    def test_old_shard_kept_after_leaving_manifest(self, sheet_cache):
+        import os
+        import time
+        import cache as cache_module
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        shard_dir = cache_module._shard_dir()
+        results = os.path.join(shard_dir, sc._sheet_store.files['Results'])
+        week_ago = time.time() - 7 * 24 * 3600
+        os.utime(results, (week_ago, week_ago))
+        other_worker = cache_module.SheetCache()  # manifest precedente, shard non ancora letti
+
+        fake.values['Results'] = fake.values['Results'] + [['OP12_2025-01-22_0000012345']]
+        sc.fetch_data()
+        assert os.path.exists(results)
+        assert other_worker.get_sheet_rows('Results')[3][2] == '0000012345'
+        assert not other_worker.needs_refresh()
+
+        # Fuori dal manifest da oltre SHARD_GC_SECONDS: rimosso al salvataggio successivo
+        os.utime(results, (week_ago, week_ago))
+        fake.values['Results'] = fake.values['Results'] + [['OP12_2025-01-29_0000012345']]
+        sc.fetch_data()
+        assert not os.path.exists(results)
+
+    def test_missing_shard_forces_refresh(self, sheet_cache):
+        import os
+        import cache as cache_module
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        shard_dir = cache_module._shard_dir()
+        os.remove(os.path.join(shard_dir, sc._season_store.files['OP12']))
+
+        warm = cache_module.SheetCache()
+        assert warm.cache_data['standings_by_season'].get('OP12', []) == []
+        assert warm.needs_refresh()
+
+
+class TestSheetFingerprint:
+    """Fingerprint di Results per stats_cache."""
+
+    def test_fingerprint_tracks_results_content(self, sheet_cache):
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        first = sc.sheet_fingerprint('Results')
+        assert first
+
+        fake.values = dict(SHEET_VALUES, Players=[[], [], [], ['0000099999', 'Nuovo', 'OP']])
+        sc.fetch_data()
+        assert sc.sheet_fingerprint('Results') == first  # Results invariato
+
+        fake.values = dict(SHEET_VALUES, Results=SHEET_VALUES['Results'] + [['OP12_2025-01-22_0000012345']])
+        sc.fetch_data()
+        assert sc.sheet_fingerprint('Results') != first
+
+    def test_results_table_rebuilt_only_on_change(self, sheet_cache):
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        table = sc.results_table()
+        assert sc.results_table() is table
+
+        fake.values = dict(SHEET_VALUES, Players=[[], [], [], ['0000099999', 'Nuovo', 'OP']])
+        sc.fetch_data()
+        assert sc.results_table() is table  # Results invariato
+
+        fake.values = dict(SHEET_VALUES, Results=SHEET_VALUES['Results'] + [['x', 'OP12_2025-01-22', '0000099999']])
+        sc.fetch_data()
+        assert sc.results_table() is not table
+        assert len(sc.results_table().rows_for_member('0000099999')) == 1
+
+    def test_snapshot_version_tracks_content(self, sheet_cache):
+        import cache as cache_module
+        sc, fake = sheet_cache
+        assert sc.snapshot_version() is None  # nessuno snapshot
+        sc.fetch_data()
+        first = sc.snapshot_version()
+        assert first
+
+        sc.fetch_data()
+        assert sc.snapshot_version() == first  # stessi dati, stessa versione
+
+        # Stesso snapshot letto da disco (altro worker): stessa versione
+        assert cache_module.SheetCache().snapshot_version() == first
+
+        fake.values = dict(SHEET_VALUES, Players=[[], [], [], ['0000099999', 'Nuovo', 'OP']])
+        sc.fetch_data()
+        assert sc.snapshot_version() != first
+
+    def test_results_table_never_mixes_snapshots(self, sheet_cache, monkeypatch):
+        """Refresh che cambia snapshot durante la lettura: niente tabella vecchia sotto fingerprint nuovo."""
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        old = sc.get_data()
+        fake.values = dict(SHEET_VALUES, Results=SHEET_VALUES['Results'] + [['x', 'OP12_2025-01-22', '0000099999']])
+        sc.fetch_data()
+
+        real_get_data = sc.get_data
+        calls = []
+
+        def swapping_get_data():
+            calls.append(1)
+            return old if len(calls) == 1 else real_get_data()
+
+        monkeypatch.setattr(sc, 'get_data', swapping_get_data)
+        assert len(sc.results_table().rows_for_member('0000099999')) == 0  # snapshot letto prima dello swap
+        assert len(sc.results_table().rows_for_member('0000099999')) == 1
+
+    def test_results_table_built_once_under_concurrency(self, sheet_cache, monkeypatch):
+        import threading
+        import cache as cache_module
+        sc, fake = sheet_cache
+        sc.fetch_data()
+        built = []
+        original = cache_module.ResultsTable
+
+        def counting(rows):
+            built.append(1)
+            return original(rows)
+
+        monkeypatch.setattr(cache_module, 'ResultsTable', counting)
+        threads = [threading.Thread(target=sc.results_table) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(built) == 1
@@ -0,0 +1,80 @@
+"""
+LeagueForge - Co-occurrence Tests
+=================================
+
+Test del motore co-occorrenze (companions, rivali di podio, mix top 8).
+
+ESEGUI:
+    pytest tests/test_cooccurrence.py -v
+"""
+
+import random
+
+import pytest
+
+
+def _brute_pairs(groups, n):
+    """Vecchio conteggio: tutte le coppie di ogni gruppo."""
+    counts = {}
+    for first_row, L in groups:
+        for i in range(len(L)):
+            for j in range(i + 1, len(L)):
+                a, b = L[i], L[j]
+                if a == b:
+                    continue
+                pair = (a, b) if a < b else (b, a)
+                if pair not in counts:
+                    counts[pair] = [0, (first_row, i, j)]
+                counts[pair][0] += 1
+    ranked = sorted(counts.items(), key=lambda kv: (-kv[1][0], kv[1][1]))
+    return [(pair, c) for pair, (c, _) in ranked[:n]]
+
+
+def _engine(groups):
+    from cooccurrence import CoOccurrence
+    co = CoOccurrence()
+    for first_row, members in groups:
+        co.add_group(first_row, members)
+    return co
+
+
+class TestTopPairs:
+    """Top-N coppie senza materializzare tutte le coppie."""
+
+    def test_counts_and_order(self):
+        groups = [(0, ['a', 'b', 'c']), (3, ['b', 'c', 'd']), (6, ['a', 'b'])]
+        assert _engine(groups).top_pairs(3) == [(('a', 'b'), 2), (('b', 'c'), 2), (('a', 'c'), 1)]
+
+    def test_ties_follow_sheet_order(self):
+        """A parità vince la coppia comparsa prima (riga, posizioni)."""
+        groups = [(0, ['z', 'y', 'x']), (3, ['a', 'b'])]
+        assert [pair for pair, _ in _engine(groups).top_pairs(2)] == [('y', 'z'), ('x', 'z')]
+
+    @pytest.mark.parametrize('seed', range(25))
+    def test_matches_pair_enumeration(self, seed):
+        rng = random.Random(seed)
+        groups = [
+            (g * 10, [str(rng.randint(0, 20)) for _ in range(rng.randint(0, 12))])
+            for g in range(rng.randint(1, 15))
+        ]
+        n = rng.randint(1, 12)
+        assert _engine(groups).top_pairs(n) == _brute_pairs(groups, n)
+
+    def test_cached_until_new_group(self):
+        co = _engine([(0, ['a', 'b'])])
+        first = co.top_pairs(10)
+        assert co.top_pairs(10) is first
+        co.add_group(2, ['a', 'c'])
+        assert co.top_pairs(10) == [(('a', 'b'), 1), (('a', 'c'), 1)]
+
+
+class TestNeighbourhoods:
+    """Avversari unici (mix top 8)."""
+
+    def test_unique_neighbours(self):
+        groups = [(0, ['a', 'b', 'c']), (3, ['a', 'b']), (6, ['d'])]
+        assert _engine(groups).top_neighbourhoods(10) == [('a', 2), ('b', 2), ('c', 2), ('d', 0)]
+
+    def test_top_n_only(self):
+        groups = [(0, ['a', 'b', 'c', 'd']), (4, ['e', 'f'])]
+        assert _engine(groups).top_neighbourhoods(2) == [('a', 3), ('b', 3)]
@@ -0,0 +1,170 @@
+"""
+LeagueForge - HTTP Cache Tests
+==============================
+
+Test delle risposte condizionali (ETag / Last-Modified / 304).
+
+ESEGUI:
+    pytest tests/test_http_cache.py -v
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from flask import Flask, make_response
+
+
+class FakeCache:
+    """SheetCache minimale: solo lo stato usato da http_cache."""
+
+    def __init__(self, version='v1', data_version='2025-01-15T20:00:00.000Z'):
+        self.version = version
+        self.data_version = data_version
+        self.snapshot_modified = datetime(2025, 1, 16, 8, 0, 0, 123456, tzinfo=timezone.utc)
+        self.get_data_calls = 0
+
+    def snapshot_version(self):
+        return self.version
+
+    def get_data(self):
+        self.get_data_calls += 1
+        return {}, None, (False, 0)
+
+
+@pytest.fixture
+def fake_cache():
+    return FakeCache()
+
+
+@pytest.fixture
+def client(fake_cache):
+    from http_cache import conditional
+
+    app = Flask(__name__)
+    app.view_calls = 0
+
+    @app.route('/page/<name>')
+    @conditional(lambda: fake_cache)
+    def page(name):
+        app.view_calls += 1
+        return f"pagina {name}"
+
+    @app.route('/pending')
+    @conditional(lambda: fake_cache)
+    def pending():
+        response = make_response("in preparazione")
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/missing')
+    @conditional(lambda: fake_cache)
+    def missing():
+        return "non trovato", 404
+
+    client = app.test_client()
+    client.flask_app = app
+    return client
+
+
+# =============================================================================
+# VALIDATORI SULLE 200
+# =============================================================================
+
+class TestTagging:
+    """ETag debole, Last-Modified e Cache-Control sulle risposte 200."""
+
+    def test_ok_response_tagged(self, client):
+        import http_cache
+        response = client.get('/page/a')
+        assert response.status_code == 200
+        etag, weak = response.get_etag()
+        assert etag and weak
+        assert response.last_modified == datetime(2025, 1, 15, 20, 0, tzinfo=timezone.utc)
+        assert response.headers['Cache-Control'] == f"public, max-age={http_cache.HTTP_CACHE_MAX_AGE}"
+
+    def test_etag_per_url(self, client):
+        a = client.get('/page/a').get_etag()[0]
+        b = client.get('/page/b').get_etag()[0]
+        a_query = client.get('/page/a?tcg=OP').get_etag()[0]
+        assert len({a, b, a_query}) == 3
+
+    def test_etag_follows_snapshot_version(self, client, fake_cache):
+        first = client.get('/page/a').get_etag()[0]
+        assert client.get('/page/a').get_etag()[0] == first
+        fake_cache.version = 'v2'
+        assert client.get('/page/a').get_etag()[0] != first
+
+    def test_last_modified_fallback_to_snapshot_time(self, client, fake_cache):
+        fake_cache.data_version = None
+        response = client.get('/page/a')
+        assert response.last_modified == datetime(2025, 1, 16, 8, 0, 0, tzinfo=timezone.utc)
+
+    def test_no_snapshot_no_tags(self, client, fake_cache):
+        fake_cache.version = None
+        response = client.get('/page/a')
+        assert response.status_code == 200
+        assert response.get_etag() == (None, None)
+        assert 'Cache-Control' not in response.headers
+
+    def test_view_cache_control_respected(self, client):
+        response = client.get('/pending')
+        assert response.headers['Cache-Control'] == 'no-store'
+        assert response.get_etag() == (None, None)
+
+    def test_errors_not_tagged(self, client):
+        response = client.get('/missing')
+        assert response.status_code == 404
+        assert response.get_etag() == (None, None)
+
+
+# =============================================================================
+# 304 NOT MODIFIED
+# =============================================================================
+
+class TestNotModified:
+    """La 304 si decide prima della view."""
+
+    def test_if_none_match(self, client, fake_cache):
+        etag = client.get('/page/a').get_etag()[0]
+        calls = client.flask_app.view_calls
+        response = client.get('/page/a', headers={'If-None-Match': f'W/"{etag}"'})
+        assert response.status_code == 304
+        assert response.data == b''
+        assert client.flask_app.view_calls == calls
+        assert fake_cache.get_data_calls == 1  # refresh comunque avviato se scaduto
+
+    def test_stale_etag_renders(self, client, fake_cache):
+        etag = client.get('/page/a').get_etag()[0]
+        fake_cache.version = 'v2'
+        response = client.get('/page/a', headers={'If-None-Match': f'W/"{etag}"'})
+        assert response.status_code == 200
+        assert response.get_etag()[0] != etag
+
+    def test_if_modified_since(self, client):
+        fresh = client.get('/page/a', headers={'If-Modified-Since': 'Wed, 15 Jan 2025 20:00:00 GMT'})
+        assert fresh.status_code == 304
+        stale = client.get('/page/a', headers={'If-Modified-Since': 'Wed, 15 Jan 2025 19:59:59 GMT'})
+        assert stale.status_code == 200
+
+    def test_if_none_match_wins_over_date(self, client):
+        response = client.get('/page/a', headers={
+            'If-None-Match': 'W/"altro"',
+            'If-Modified-Since': 'Wed, 15 Jan 2025 20:00:00 GMT',
+        })
+        assert response.status_code == 200
+
+
+class TestParseDataVersion:
+    """modifiedTime di Drive → datetime UTC."""
+
+    @pytest.mark.parametrize('value,expected', [
+        ('2025-01-15T20:00:00.000Z', datetime(2025, 1, 15, 20, 0, tzinfo=timezone.utc)),
+        ('2025-01-15T21:00:00+01:00', datetime(2025, 1, 15, 20, 0, tzinfo=timezone.utc)),
+        ('2025-01-15T20:00:00', datetime(2025, 1, 15, 20, 0, tzinfo=timezone.utc)),
+        ('non una data', None),
+        ('', None),
+        (None, None),
+    ])
+    def test_parse(self, value, expected):
+        from http_cache import _parse_data_version
+        assert _parse_data_version(value) == expected
@@ -0,0 +1,100 @@
+"""
+LeagueForge - Invalidation Tests
+================================
+
+Test degli eventi di invalidazione pubblicati dagli import.
+
+ESEGUI:
+    pytest tests/test_invalidation.py -v
+"""
+
+import time
+
+import pytest
+
+
+@pytest.fixture
+def invalidation(tmp_path, monkeypatch):
+    """invalidation con cartella eventi isolata."""
+    import invalidation as inv
+    monkeypatch.setattr(inv, 'BASE_DIR', tmp_path / 'invalidations')
+    return inv
+
+
+class TestPublish:
+    """finalize_import pubblica stagione, ALL-<TCG> e giocatori."""
+
+    def test_event_content(self, invalidation):
+        import json
+        path = invalidation.publish('OP12', 'OP', ['12345', '0000067890', '12345'],
+                                    tournament_id='OP12_2025-01-15')
+        event = json.loads(path.read_text(encoding='utf-8'))
+
+        assert event['scopes'] == ['OP12', 'ALL-OP']
+        assert event['players'] == ['0000012345', '0000067890']
+        assert event['tournament_id'] == 'OP12_2025-01-15'
+
+    def test_old_events_removed(self, invalidation, monkeypatch):
+        import os
+        old = invalidation.publish('OP11', 'OP')
+        past = time.time() - invalidation.EVENT_MAX_AGE_SECONDS - 10
+        os.utime(old, (past, past))
+
+        invalidation.publish('OP12', 'OP')
+        assert not old.exists()
+
+
+class TestListener:
+    """Ogni worker legge ogni evento una sola volta."""
+
+    def test_poll_returns_new_events_once(self, invalidation):
+        listener = invalidation.InvalidationListener(since=time.time())
+        assert listener.poll() == []
+
+        invalidation.publish('OP12', 'OP', ['0000012345'])
+        events = listener.poll()
+        assert [e['season_id'] for e in events] == ['OP12']
+        assert listener.poll() == []
+
+        invalidation.publish('PKM-FS25', 'PKM')
+        assert [e['scopes'] for e in listener.poll()] == [['PKM-FS25', 'ALL-PKM']]
+
+    def test_events_before_since_ignored(self, invalidation):
+        invalidation.publish('OP11', 'OP')
+        listener = invalidation.InvalidationListener(since=time.time())
+        assert listener.poll() == []
+
+    def test_independent_listeners(self, invalidation):
+        since = time.time()
+        first = invalidation.InvalidationListener(since=since)
+        second = invalidation.InvalidationListener(since=since)
+        invalidation.publish('OP12', 'OP')
+
+        assert len(first.poll()) == 1
+        assert len(second.poll()) == 1
+
+    def test_event_with_same_dir_mtime_not_missed(self, invalidation):
+        import os
+        listener = invalidation.InvalidationListener(since=time.time())
+        invalidation.publish('OP12', 'OP')
+        mtime = invalidation.BASE_DIR.stat().st_mtime_ns
+        assert len(listener.poll()) == 1
+
+        # mtime a risoluzione di 1s: il secondo evento non cambia l'mtime
+        invalidation.publish('OP11', 'OP')
+        os.utime(invalidation.BASE_DIR, ns=(mtime, mtime))
+        assert [e['season_id'] for e in listener.poll()] == ['OP11']
+
+    def test_old_unchanged_dir_not_listed(self, invalidation, monkeypatch):
+        import os
+        listener = invalidation.InvalidationListener(since=0)
+        invalidation.publish('OP12', 'OP')
+        past = time.time() - 60
+        os.utime(invalidation.BASE_DIR, (past, past))
+        assert len(listener.poll()) == 1
+
+        listed = []
+        monkeypatch.setattr(type(invalidation.BASE_DIR), 'glob',
+                            lambda self, pattern: listed.append(pattern) or iter(()))
+        assert listener.poll() == []
+        assert listed == []
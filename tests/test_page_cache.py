@@ -0,0 +1,111 @@
+"""
+LeagueForge - Page Cache Tests
+==============================
+
+Test della cache delle pagine renderizzate (LRU per versione snapshot).
+
+ESEGUI:
+    pytest tests/test_page_cache.py -v
+"""
+
+import pytest
+
+
+@pytest.fixture
+def page_cache():
+    from page_cache import PageCache
+    return PageCache(max_bytes=100)
+
+
+# =============================================================================
+# GET / PUT
+# =============================================================================
+
+class TestPageCache:
+    """Pagine riusate per (versione, chiave)."""
+
+    def test_put_returns_bytes(self, page_cache):
+        assert page_cache.put('v1', ('player', '1'), 'àè') == 'àè'.encode('utf-8')
+        assert page_cache.get('v1', ('player', '1')) == 'àè'.encode('utf-8')
+
+    def test_miss_on_other_key_or_version(self, page_cache):
+        page_cache.put('v1', ('stats', 'OP12'), 'pagina')
+        assert page_cache.get('v1', ('stats', 'OP11')) is None
+        assert page_cache.get('v2', ('stats', 'OP12')) is None
+        assert page_cache.stats()['misses'] == 2
+
+    def test_no_version_not_stored(self, page_cache):
+        assert page_cache.put(None, ('stats', 'OP12'), 'pagina') == b'pagina'
+        assert page_cache.get(None, ('stats', 'OP12')) is None
+        assert page_cache.stats()['pages'] == 0
+
+    def test_new_version_drops_old_pages(self, page_cache):
+        page_cache.put('v1', ('player', '1'), 'vecchia')
+        page_cache.put('v2', ('player', '2'), 'nuova')
+        assert page_cache.get('v1', ('player', '1')) is None
+        assert page_cache.stats()['pages'] == 1
+
+    def test_late_put_of_old_version_ignored(self):
+        from page_cache import PageCache
+        current = ['v2']
+        cache = PageCache(max_bytes=100, current_version=lambda: current[0])
+        cache.put('v2', 'a', 'nuova')
+        assert cache.put('v1', 'b', 'vecchia') == b'vecchia'  # richiesta rimasta indietro
+        assert cache.get('v2', 'a') == b'nuova'
+        assert cache.get('v1', 'b') is None
+
+    def test_current_version_replaces_pages(self):
+        from page_cache import PageCache
+        current = ['v1']
+        cache = PageCache(max_bytes=100, current_version=lambda: current[0])
+        cache.put('v1', 'a', 'vecchia')
+        current[0] = 'v2'
+        cache.put('v2', 'a', 'nuova')
+        assert cache.get('v1', 'a') is None
+        assert cache.get('v2', 'a') == b'nuova'
+
+    def test_clear(self, page_cache):
+        page_cache.put('v1', ('player', '1'), 'pagina')
+        page_cache.clear()
+        assert page_cache.get('v1', ('player', '1')) is None
+        assert page_cache.stats()['bytes'] == 0
+
+
+# =============================================================================
+# TETTO DI MEMORIA
+# =============================================================================
+
+class TestMemoryCap:
+    """LRU sul totale dei byte."""
+
+    def test_lru_eviction(self, page_cache):
+        for k in range(3):
+            page_cache.put('v1', k, 'x' * 40)
+        assert page_cache.get('v1', 0) is None  # 120 > 100: esce la più vecchia
+        assert page_cache.get('v1', 2) is not None
+        assert page_cache.stats()['bytes'] == 80
+
+    def test_recently_read_kept(self, page_cache):
+        page_cache.put('v1', 'a', 'x' * 40)
+        page_cache.put('v1', 'b', 'x' * 40)
+        page_cache.get('v1', 'a')
+        page_cache.put('v1', 'c', 'x' * 40)
+        assert page_cache.get('v1', 'a') is not None
+        assert page_cache.get('v1', 'b') is None
+
+    def test_replace_updates_size(self, page_cache):
+        page_cache.put('v1', 'a', 'x' * 40)
+        page_cache.put('v1', 'a', 'x' * 10)
+        assert page_cache.stats()['bytes'] == 10
+
+    def test_oversized_page_not_stored(self, page_cache):
+        page_cache.put('v1', 'a', 'x' * 40)
+        assert page_cache.put('v1', 'big', 'x' * 101) == b'x' * 101
+        assert page_cache.get('v1', 'big') is None
+        assert page_cache.get('v1', 'a') is not None
+
+    def test_disabled(self):
+        from page_cache import PageCache
+        disabled = PageCache(max_bytes=0)
+        disabled.put('v1', 'a', 'pagina')
+        assert disabled.get('v1', 'a') is None
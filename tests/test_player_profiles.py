@@ -0,0 +1,177 @@
+"""
+LeagueForge - Player Profiles Tests
+===================================
+
+Test dei profili giocatore precalcolati (indice per snapshot + documenti).
+
+ESEGUI:
+    pytest tests/test_player_profiles.py -v
+"""
+
+import pytest
+
+from tests.conftest import PLAYERS, tournament_rows
+RESULTS = (
+    tournament_rows('OP11_2025-01-10', PLAYERS[:8], match=False) +
+    tournament_rows('OP12_2025-01-17', PLAYERS[2:10]) +
+    tournament_rows('OP12_2025-02-07', PLAYERS[1:9])
+)
+DEFINITIONS = [['ACH_001', 'First Blood', 'Vinci un torneo', 'Glory', 'Rare', '🩸', '25', 'tournament_wins', '1'],
+               ['ACH_002', 'Regular', 'Gioca 2 tornei', 'Legacy', 'Common', '🎯', '10', 'tournaments_played', '2']]
+UNLOCKED = [[PLAYERS[2], 'ACH_002', '2025-01-17', 'OP12_2025-01-17', ''],
+            [PLAYERS[2], 'ACH_999', '2025-01-17', 'OP12_2025-01-17', ''],
+            [PLAYERS[3], 'ACH_001', '2025-02-07', 'OP12_2025-02-07', '']]
+SEASONS = [{'id': 'OP11', 'status': 'ARCHIVED'}, {'id': 'OP12', 'status': 'ACTIVE'}]
+
+
+class FakeCache:
+    """SheetCache minimale: snapshot in memoria con fingerprint per foglio."""
+
+    def __init__(self):
+        from results_table import ResultsTable
+        self.sheets = {
+            'Results': [['h']] * 3 + RESULTS,
+            'Players': [['h']] * 3 + [[m, f"Player {m[-2:]}", 'OP'] for m in PLAYERS[:10]],
+            'Achievement_Definitions': [['h']] * 4 + DEFINITIONS,
+            'Player_Achievements': [['h']] * 4 + UNLOCKED,
+        }
+        self.seasons = [dict(s) for s in SEASONS]
+        self.versions = {name: 1 for name in self.sheets}
+        self.table = ResultsTable(RESULTS)
+
+    def get_data(self):
+        return {'seasons': self.seasons}, None, (False, 0)
+
+    def get_sheet_rows(self, name):
+        return self.sheets.get(name, [])
+
+    def results_table(self):
+        return self.table
+
+    def sheet_fingerprint(self, name):
+        return f"{name}-{self.versions.get(name)}"
+
+    def add_tournament(self, tid, players):
+        """Simula un import: righe in coda a Results, fingerprint nuovo."""
+        from results_table import ResultsTable
+        self.sheets['Results'] = self.sheets['Results'] + tournament_rows(tid, players)
+        self.table = ResultsTable(self.sheets['Results'][3:])  # nuova per snapshot, come SheetCache
+        self.versions['Results'] += 1
+
+
+@pytest.fixture
+def fake_cache():
+    return FakeCache()
+
+
+@pytest.fixture
+def store():
+    from player_profiles import ProfileStore
+    return ProfileStore()
+
+
+# =============================================================================
+# DOCUMENTO PROFILO
+# =============================================================================
+
+class TestBuildProfile:
+    """Campi del documento profilo."""
+
+    @pytest.fixture
+    def index(self, fake_cache):
+        from player_profiles import ProfileIndex
+        return ProfileIndex.from_cache(fake_cache)
+
+    def test_unknown_player(self, index):
+        from player_profiles import build_profile
+        assert build_profile(index, '9999999999') is None
+
+    def test_counters(self, index):
+        from player_profiles import build_profile
+        doc = build_profile(index, PLAYERS[2])  # 3° in OP11, 1° e 2° in OP12
+        assert doc['tournaments_played'] == 3
+        assert doc['tournament_wins'] == 1
+        assert doc['top8_count'] == 3
+        assert doc['best_rank'] == 1
+        assert doc['first_seen'] == '2025-01-10'
+        assert doc['ranking_dist'] == {'first': 1, 'second': 1, 'third': 1, 'top8': 0, 'other': 0}
+
+    def test_history_newest_first(self, index):
+        from player_profiles import build_profile
+        doc = build_profile(index, PLAYERS[2])
+        assert [h['date'] for h in doc['history']] == ['2025-02-07', '2025-01-17', '2025-01-10']
+        assert doc['history'][-1]['season_status'] == 'ARCHIVED'
+        assert doc['history'][-1]['record'].endswith('-?')
+        assert doc['chart_labels'] == ['2025-01-10', '2025-01-17', '2025-02-07']
+
+    def test_match_record_skips_old_rows(self, index):
+        from player_profiles import build_profile
+        doc = build_profile(index, PLAYERS[2])
+        assert doc['match_record'] == {'wins': 5, 'ties': 0, 'losses': 1, 'has_data': True}
+
+    def test_achievements_joined_with_definitions(self, index):
+        from player_profiles import build_profile
+        doc = build_profile(index, PLAYERS[2])
+        assert [a['id'] for a in doc['achievements']] == ['ACH_002']
+        assert doc['achievement_points'] == 10
+
+    def test_tcg_default(self, fake_cache):
+        from player_profiles import ProfileIndex, build_profile
+        fake_cache.sheets['Players'] = [['h']] * 3
+        assert build_profile(ProfileIndex.from_cache(fake_cache), PLAYERS[2])['tcg'] == 'OP'
+
+
+# =============================================================================
+# STORE + INVALIDAZIONE
+# =============================================================================
+
+class TestProfileStore:
+    """Documenti riusati finché i dati del giocatore non cambiano."""
+
+    def test_document_reused(self, store, fake_cache):
+        assert store.get(fake_cache, PLAYERS[2]) is store.get(fake_cache, PLAYERS[2])
+
+    def test_import_refreshes_only_its_players(self, store, fake_cache):
+        other = store.get(fake_cache, PLAYERS[0])
+        before = store.get(fake_cache, PLAYERS[4])
+        fake_cache.add_tournament('OP12_2025-02-14', PLAYERS[3:6])
+        assert store.refresh_players(fake_cache, PLAYERS[3:6]) == 3
+        assert store.get(fake_cache, PLAYERS[0]) is other
+        after = store.get(fake_cache, PLAYERS[4])
+        assert after['tournaments_played'] == before['tournaments_played'] + 1
+
+    def test_request_before_refresh_keeps_other_players(self, store, fake_cache):
+        other = store.get(fake_cache, PLAYERS[0])
+        before = store.get(fake_cache, PLAYERS[4])
+        fake_cache.add_tournament('OP12_2025-02-14', PLAYERS[3:6])
+        # Una richiesta vede lo snapshot nuovo prima del listener
+        after = store.get(fake_cache, PLAYERS[4])
+        assert after['tournaments_played'] == before['tournaments_played'] + 1
+        assert store.get(fake_cache, PLAYERS[0]) is other
+        assert store.refresh_players(fake_cache, PLAYERS[3:6]) == 2  # PLAYERS[4] già ricalcolato
+        assert store.get(fake_cache, PLAYERS[4]) is after
+        assert store.get(fake_cache, PLAYERS[0]) is other
+
+    def test_refresh_without_changes_keeps_documents(self, store, fake_cache):
+        doc = store.get(fake_cache, PLAYERS[0])
+        fake_cache.versions['Players'] += 1  # snapshot nuovo, stessi dati
+        assert store.get(fake_cache, PLAYERS[0]) is doc
+
+    def test_manual_edit_drops_only_that_player(self, store, fake_cache):
+        edited = store.get(fake_cache, PLAYERS[0])
+        other = store.get(fake_cache, PLAYERS[1])
+        fake_cache.sheets['Players'][3] = [PLAYERS[0], 'Player 01', 'PKM']
+        fake_cache.versions['Players'] += 1
+        assert store.get(fake_cache, PLAYERS[0])['tcg'] == 'PKM'
+        assert store.get(fake_cache, PLAYERS[1]) is other
+        assert edited['tcg'] == 'OP'
+
+    @pytest.mark.parametrize('change', ['definitions', 'season_status'])
+    def test_global_change_drops_everything_on_import(self, store, fake_cache, change):
+        doc = store.get(fake_cache, PLAYERS[0])
+        if change == 'definitions':
+            fake_cache.versions['Achievement_Definitions'] += 1
+        else:
+            fake_cache.seasons[1]['status'] = 'CLOSED'
+        store.refresh_players(fake_cache, [PLAYERS[5]])
+        assert store.get(fake_cache, PLAYERS[0]) is not doc
@@ -0,0 +1,167 @@
+"""
+LeagueForge - Results Table Tests
+=================================
+
+Test della tabella Results colonnare (indici, dimensioni, condivisione).
+
+ESEGUI:
+    pytest tests/test_results_table.py -v
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+
+ROWS = [
+    ['OP12_2025-01-15_0000000001', 'OP12_2025-01-15', '0000000001', '1', '9', '65', '3', '15', '18', 'Mario', '3', '0', '0'],
+    ['OP12_2025-01-15_0000000002', 'OP12_2025-01-15', '0000000002', '2', '6', '55', '2', '13', '15', 'Luigi', '2', '0', '1'],
+    ['OP1_2023-03-01_0000000001', 'OP1_2023-03-01', '0000000001', '5', '3', '40', '1', '8', '9', 'Mario', '', '', ''],
+    ['PKM-FS25_2025-02-01_0000000002', 'PKM-FS25_2025-02-01', '0000000002', '1', '10', '60', '3', '15', '18', 'Luigi', '3', '1', '0'],
+    ['', '', '', '', '', '', '', '', '', '', '', '', ''],
+]
+
+
+@pytest.fixture
+def table():
+    from results_table import ResultsTable
+    return ResultsTable(ROWS)
+
+
+class TestIndexes:
+    """Lookup per giocatore, torneo, stagione e TCG senza scan."""
+
+    def test_empty_rows_skipped(self, table):
+        assert len(table) == 4
+
+    def test_rows_for_member(self, table):
+        assert [table.tid_of(i) for i in table.rows_for_member('0000000001')] == [
+            'OP12_2025-01-15', 'OP1_2023-03-01'
+        ]
+        assert len(table.rows_for_member('9999999999')) == 0
+
+    def test_season_is_exact_match(self, table):
+        """OP1 non deve includere i tornei di OP12."""
+        assert [table.tid_of(i) for i in table.rows_for_season('OP1')] == ['OP1_2023-03-01']
+        assert len(table.rows_for_season('OP12')) == 2
+
+    def test_tcg_from_season_prefix(self, table):
+        assert len(table.rows_for_tcg('OP')) == 3
+        assert [table.season_of(i) for i in table.rows_for_tcg('PKM')] == ['PKM-FS25']
+
+    def test_rows_for_scope(self, table):
+        assert len(table.rows_for_scope('ALL-OP')) == 3
+        assert len(table.rows_for_scope('OP12')) == 2
+
+    def test_rows_for_tournament(self, table):
+        rows = table.rows_for_tournament('OP12_2025-01-15')
+        assert [table.name_of(i) for i in rows] == ['Mario', 'Luigi']
+
+
+class TestColumns:
+    """Valori tipizzati e dimensioni condivise."""
+
+    def test_numeric_columns(self, table):
+        i = table.rows_for_member('0000000002')[0]
+        assert table.rank[i] == 2
+        assert table.win_points[i] == 6.0
+        assert table.points_total[i] == 15.0
+
+    def test_missing_match_record(self, table):
+        i = table.rows_for_season('OP1')[0]
+        assert table.match_record(i) is None
+        j = table.rows_for_season('PKM-FS25')[0]
+        assert table.match_record(j) == (3, 1, 0)
+
+    def test_strings_interned(self, table):
+        assert table.memberships == ['0000000001', '0000000002']
+        assert table.names == ['Mario', 'Luigi']
+        assert len(table.tournament_ids) == 3
+
+
+    def test_prefix_digest_matches_shorter_table(self, table):
+        from results_table import ResultsTable
+        assert table.prefix_digest(2) == ResultsTable(ROWS[:2]).digest()
+        assert table.prefix_digest(len(table)) == table.digest()
+        assert table.prefix_digest(0) == ResultsTable().digest()
+
+    def test_prefix_digest_sees_edits(self, table):
+        from results_table import ResultsTable
+        edited = [list(r) for r in ROWS]
+        edited[1][8] = '99'
+        assert ResultsTable(edited).prefix_digest(2) != table.prefix_digest(2)
+
+
+    def test_pickle_rebuilds_indexes(self, table):
+        import pickle
+        copy = pickle.loads(pickle.dumps(table))
+        assert 'by_member' not in table.__getstate__()
+        assert copy.digest() == table.digest()
+        assert copy.by_member == table.by_member
+        assert copy.by_tcg == table.by_tcg
+        assert copy.tournaments == table.tournaments
+        assert copy.append_row(ROWS[0]) == len(table)
+
+
+class TestTournamentDimension:
+    """Dimensione tornei: stagione, TCG, data e partecipanti per tournament_id."""
+
+    def test_one_entry_per_tournament(self, table):
+        assert list(table.tournaments) == ['OP12_2025-01-15', 'OP1_2023-03-01', 'PKM-FS25_2025-02-01']
+
+    def test_fields(self, table):
+        from datetime import datetime
+        t = table.tournaments['PKM-FS25_2025-02-01']
+        assert (t.season_id, t.tcg, t.date_str) == ('PKM-FS25', 'PKM', '2025-02-01')
+        assert t.date == datetime(2025, 2, 1)
+
+    def test_participants_from_ranking_points(self, table):
+        """max(points_ranking + rank - 1) sulle righe del torneo."""
+        assert table.tournaments['OP12_2025-01-15'].participants == 15
+        assert table.tournaments['OP1_2023-03-01'].participants == 12
+
+    def test_tournament_of_row(self, table):
+        i = table.rows_for_member('0000000001')[1]
+        assert table.tournament_of(i).season_id == 'OP1'
+
+    def test_append_updates_built_dimension(self, table):
+        table.tournaments
+        table.append_row(['x', 'OP12_2025-01-15', '0000000003', '20', '0', '0', '0', '1', '1', 'Peach'])
+        table.append_row(['y', 'OP12_20250122', '0000000003', '1', '9', '0', '3', '4', '7', 'Peach'])
+        assert table.tournaments['OP12_2025-01-15'].participants == 20
+        assert table.tournaments['OP12_20250122'].date_str == '20250122'
+        assert table.tournaments['OP12_20250122'].date.day == 22
+        assert table.tournaments['OP12_20250122'].participants == 4
+
+    def test_parse_is_memoized(self):
+        from results_table import parse_tournament_id
+        assert parse_tournament_id('OP12_2025-01-15') is parse_tournament_id('OP12_2025-01-15')
+
+    def test_unknown_date_format(self):
+        from results_table import parse_tournament_id
+        t = parse_tournament_id('OP12_finale')
+        assert t.date is None and t.date_str == 'finale'
+        assert parse_tournament_id('OP12').date_str == ''
+
+
+class TestSharedTable:
+    """Una lettura di Results per processo, rifatta dopo invalidazione."""
+
+    def test_load_once_then_invalidate(self):
+        from results_table import load_results_table, invalidate_results_table
+
+        ws = MagicMock()
+        ws.get_all_values.return_value = [[], [], []] + ROWS
+        sheet = MagicMock()
+        sheet.id = 'sheet-test'
+        sheet.worksheet.return_value = ws
+
+        invalidate_results_table()
+        first = load_results_table(sheet)
+        assert load_results_table(sheet) is first
+        assert ws.get_all_values.call_count == 1
+
+        invalidate_results_table()
+        assert load_results_table(sheet) is not first
+        assert ws.get_all_values.call_count == 2
+        invalidate_results_table()
@@ -0,0 +1,88 @@
+"""
+LeagueForge - Sheet Connection Tests
+====================================
+
+Test della connessione condivisa (nessuna connessione reale a Google Sheets).
+
+ESEGUI:
+    pytest tests/test_sheet_connection.py -v
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    """sheet_connection con Credentials e gspread.authorize finti."""
+    import sheet_connection
+
+    sheet_connection.reset_connection()
+    creds_loader = MagicMock()
+    client = MagicMock()
+    client.open_by_key.side_effect = lambda key: MagicMock(id=key)
+    authorize = MagicMock(return_value=client)
+
+    monkeypatch.setattr(sheet_connection.Credentials, 'from_service_account_file', creds_loader)
+    monkeypatch.setattr(sheet_connection.gspread, 'authorize', authorize)
+    yield sheet_connection, creds_loader, authorize, client
+    sheet_connection.reset_connection()
+
+
+class TestSharedConnection:
+    """Credenziali, client e spreadsheet vengono riusati."""
+
+    def test_spreadsheet_is_reused(self, connection):
+        conn, creds_loader, authorize, client = connection
+        first = conn.get_spreadsheet('SHEET', credentials_file='creds.json')
+        for _ in range(5):
+            assert conn.get_spreadsheet('SHEET', credentials_file='creds.json') is first
+
+        assert creds_loader.call_count == 1
+        assert authorize.call_count == 1
+        assert client.open_by_key.call_count == 1
+
+    def test_open_count(self, connection):
+        conn, creds_loader, authorize, client = connection
+        before = conn.open_count()
+        conn.get_spreadsheet('SHEET', credentials_file='creds.json')
+        conn.get_spreadsheet('SHEET', credentials_file='creds.json')
+        assert conn.open_count() == before + 1
+
+    def test_readonly_scopes_use_separate_client(self, connection):
+        conn, creds_loader, authorize, client = connection
+        conn.get_spreadsheet('SHEET', credentials_file='creds.json')
+        conn.get_spreadsheet('SHEET', scopes=conn.READONLY_SCOPES, credentials_file='creds.json')
+
+        assert creds_loader.call_count == 2
+        assert creds_loader.call_args.kwargs['scopes'] == conn.READONLY_SCOPES
+
+    def test_reset_reconnects(self, connection):
+        conn, creds_loader, authorize, client = connection
+        conn.get_spreadsheet('SHEET', credentials_file='creds.json')
+        conn.reset_connection()
+        conn.get_spreadsheet('SHEET', credentials_file='creds.json')
+
+        assert authorize.call_count == 2
+        assert client.open_by_key.call_count == 2
+
+
+class TestModifiedTime:
+    """get_modified_time funziona con gspread 6 e 5."""
+
+    def test_gspread6_uses_last_update_time(self):
+        from sheet_connection import get_modified_time
+        sheet = MagicMock()
+        sheet.get_lastUpdateTime.return_value = '2025-01-15T20:00:00.000Z'
+        assert get_modified_time(sheet) == '2025-01-15T20:00:00.000Z'
+
+    def test_gspread5_calls_drive_files(self):
+        from sheet_connection import get_modified_time
+        sheet = MagicMock(spec=['id', 'client'])
+        sheet.id = 'SHEET'
+        sheet.client.request.return_value.json.return_value = {'modifiedTime': 'T1'}
+
+        assert get_modified_time(sheet) == 'T1'
+        method, url = sheet.client.request.call_args.args
+        assert url.endswith('/files/SHEET')
+        assert sheet.client.request.call_args.kwargs['params']['fields'] == 'modifiedTime'
@@ -0,0 +1,72 @@
+"""
+LeagueForge - Stats Artifacts Tests
+===================================
+
+Test degli artifact stats precalcolati dall'import e caricati dalla webapp.
+
+ESEGUI:
+    pytest tests/test_stats_artifacts.py -v
+"""
+
+import pytest
+
+from tests.conftest import PLAYERS, tournament_rows
+
+ROWS = (
+    tournament_rows('OP11_2025-01-10', PLAYERS[:8]) +
+    tournament_rows('OP12_2025-01-17', PLAYERS[2:10]) +
+    tournament_rows('OP12_2025-02-07', PLAYERS[1:9])
+)
+
+
+@pytest.fixture
+def artifacts(tmp_path, monkeypatch):
+    """stats_artifacts con cartella isolata."""
+    import stats_artifacts as sa
+    monkeypatch.setattr(sa, 'BASE_DIR', tmp_path / 'stats_artifacts')
+    return sa
+
+
+@pytest.fixture
+def table():
+    from results_table import ResultsTable
+    return ResultsTable(ROWS)
+
+
+class TestArtifacts:
+    """Scritti dall'import, letti solo se della stessa versione di Results."""
+
+    def test_roundtrip_matches_build_stats(self, artifacts, table):
+        from stats_builder import build_stats
+        written = artifacts.write_artifacts(table, ['OP12', 'ALL-OP'])
+        assert sorted(written) == ['ALL-OP', 'OP12']
+        expected = build_stats(['OP12', 'ALL-OP'], table=table)
+        for scope in ('OP12', 'ALL-OP'):
+            assert artifacts.load_artifact(scope, table.digest()) == expected[scope]
+
+    def test_other_results_version_is_miss(self, artifacts, table):
+        artifacts.write_artifacts(table, ['OP12'])
+        assert artifacts.load_artifact('OP12', 'deadbeef0000') is None
+        assert artifacts.load_artifact('OP12') is not None
+
+    def test_other_schema_is_miss(self, artifacts, table, monkeypatch):
+        artifacts.write_artifacts(table, ['OP12'])
+        monkeypatch.setattr(artifacts, 'ARTIFACT_SCHEMA', artifacts.ARTIFACT_SCHEMA + 1)
+        assert artifacts.load_artifact('OP12', table.digest()) is None
+
+    def test_missing_artifact(self, artifacts):
+        assert artifacts.load_artifact('OP12') is None
+
+
+class TestResultsDigest:
+    """Stessi dati → stessa versione, comunque sia stato letto il foglio."""
+
+    def test_ignores_trailing_empty_cells(self, table):
+        from results_table import ResultsTable
+        padded = ResultsTable([row + ['', ''] for row in ROWS])
+        assert padded.digest() == table.digest()
+
+    def test_changes_with_new_rows(self, table):
+        before = table.digest()
+        table.append_row(tournament_rows('OP12_2025-02-21', PLAYERS[:4])[0])
+        assert table.digest() != before
@@ -0,0 +1,254 @@
+"""
+LeagueForge - Stats Builder Tests
+=================================
+
+Test del calcolo stats multi-scope (una passata su Results, ALL-* da merge).
+
+ESEGUI:
+    pytest tests/test_stats_builder.py -v
+"""
+
+import pytest
+
+
+def _tournament(tid, players):
+    """Righe Results di un torneo: players in ordine di classifica."""
+    n = len(players)
+    rows = []
+    for rank, (membership, name) in enumerate(players, start=1):
+        wins = max(0, 4 - rank)
+        pr = n - rank + 1
+        rows.append([f"{tid}_{membership}", tid, membership, str(rank), str(wins * 3), '50',
+                     str(wins), str(pr), str(wins + pr), name, str(wins), '0', str(4 - wins)])
+    return rows
+
+
+PLAYERS = [(f"{k:010d}", f"Player {k}") for k in range(1, 11)]
+
+# OP11 e OP12 intercalate nel foglio, come quando due stagioni si sovrappongono
+ROWS = (
+    _tournament('OP11_2025-01-10', PLAYERS[:8]) +
+    _tournament('OP12_2025-01-17', PLAYERS[2:10]) +
+    _tournament('OP11_2025-01-24', PLAYERS[::-1][:9]) +
+    _tournament('OP12_2025-02-07', PLAYERS[1:9]) +
+    _tournament('OP12_2025-02-21', PLAYERS[:10]) +
+    _tournament('PKM-FS25_2025-02-01', PLAYERS[:6])
+)
+
+
+@pytest.fixture
+def table():
+    from results_table import ResultsTable
+    return ResultsTable(ROWS)
+
+
+class TestMultiScope:
+    """Tutti gli scope in una passata, stesso risultato dei build singoli."""
+
+    def test_same_payload_as_single_scope_builds(self, table):
+        from stats_builder import build_stats
+        scopes = ['OP11', 'OP12', 'ALL-OP', 'PKM-FS25', 'ALL-PKM']
+        together = build_stats(scopes, table=table)
+        for scope in scopes:
+            assert together[scope] == build_stats([scope], table=table)[scope]
+
+    def test_one_pass_over_results(self, table, monkeypatch):
+        import stats_builder
+        calls = []
+        original = stats_builder._table_record
+
+        def counting(tbl, i, events):
+            calls.append(i)
+            return original(tbl, i, events)
+
+        monkeypatch.setattr(stats_builder, '_table_record', counting)
+        stats_builder.build_stats(stats_builder.all_scopes(table), table=table)
+        assert sorted(calls) == list(range(len(table)))
+
+    def test_all_scope_merges_seasons(self, table):
+        from stats_builder import build_stats
+        out = build_stats(['ALL-OP'], table=table)['ALL-OP']
+        assert out['pulse']['kpi']['events_total'] == 5
+        assert out['pulse']['kpi']['entries_total'] == 8 + 8 + 9 + 8 + 10
+        # Serie eventi in ordine cronologico attraverso le stagioni
+        tids = [e['tid'] for e in out['pulse']['series']['entries_per_event']]
+        assert tids == sorted(tids, key=lambda t: t.split('_')[1])
+
+    def test_all_scopes_lists_seasons_and_tcgs(self, table):
+        from stats_builder import all_scopes
+        assert all_scopes(table) == ['OP11', 'OP12', 'PKM-FS25', 'ALL-OP', 'ALL-PKM']
+
+    def test_unknown_scope_is_empty(self, table):
+        from stats_builder import build_stats
+        out = build_stats(['OP99'], table=table)['OP99']
+        assert out['pulse']['kpi']['events_total'] == 0
+
+
+class TestSections:
+    """Ogni sezione si calcola da sola, identica a quella del payload completo."""
+
+    def test_full_payload_has_every_section(self, table):
+        from stats_builder import SECTIONS, build_stats
+        assert tuple(build_stats(['OP12'], table=table)['OP12']) == SECTIONS
+
+    @pytest.mark.parametrize('section', ['spotlights', 'spot_narrative', 'pulse', 'tales', 'hof'])
+    def test_single_section_matches_full(self, table, section):
+        from stats_builder import build_stats
+        full = build_stats(['ALL-OP'], table=table)['ALL-OP']
+        assert build_stats(['ALL-OP'], table=table, sections=[section])['ALL-OP'] == {section: full[section]}
+
+    def test_highlights_skip_hall_of_fame(self, table, monkeypatch):
+        import stats_builder
+
+        def _no_hof(view):
+            raise AssertionError('Hall of Fame calcolata')
+
+        monkeypatch.setitem(stats_builder._SECTION_BUILDERS, 'hof', _no_hof)
+        out = stats_builder.build_stats(['OP12'], table=table, sections=['spotlights'])['OP12']
+        assert list(out) == ['spotlights']
+
+    def test_pulse_skips_player_metrics(self, table, monkeypatch):
+        import stats_builder
+
+        def _no_metrics(self, table=None):
+            raise AssertionError('metriche giocatore calcolate')
+
+        monkeypatch.setattr(stats_builder._ScopePartial, 'prime_metrics', _no_metrics)
+        out = stats_builder.build_stats(['OP12'], table=table, sections=['pulse'])['OP12']
+        assert out['pulse']['kpi']['events_total'] == 3
+
+
+NEW_TOURNAMENT = _tournament('OP12_2025-03-07', PLAYERS[4:10] + [('0000000011', 'Player 11')])
+
+
+class TestIncrementalUpdate:
+    """Torneo aggiunto in coda: fold sugli aggregati, stesso payload del rebuild."""
+
+    def test_update_matches_full_rebuild(self, table):
+        from results_table import ResultsTable
+        from stats_builder import StatsState, all_scopes, build_stats
+        state = StatsState(table, all_scopes(table))
+        state.payloads()   # metriche in cache, come nella webapp
+
+        new_table = ResultsTable(ROWS + NEW_TOURNAMENT)
+        affected = state.update(new_table, ['OP12_2025-03-07'])
+        assert affected == ['OP12', 'ALL-OP']
+        fresh = build_stats(all_scopes(new_table), table=new_table)
+        for scope in all_scopes(new_table):
+            assert state.payload(scope) == fresh[scope]
+
+    def test_only_new_tournament_players_recomputed(self, table):
+        from results_table import ResultsTable
+        from stats_builder import StatsState
+        state = StatsState(table, ['OP12'])
+        state.payload('OP12')
+        part = state.partials['OP12']
+        before = dict(part._player_cache)
+
+        state.update(ResultsTable(ROWS + NEW_TOURNAMENT), ['OP12_2025-03-07'])
+        state.payload('OP12')
+        recomputed = sorted(m for m, metrics in part._player_cache.items() if before.get(m) is not metrics)
+        assert recomputed == sorted(m for m, _ in PLAYERS[4:10]) + ['0000000011']
+
+    def test_reimport_needs_rebuild(self, table):
+        from results_table import ResultsTable
+        from stats_builder import StatsState
+        state = StatsState(table, ['OP12'])
+        assert state.update(ResultsTable(ROWS), ['OP12_2025-02-21']) is None
+
+    def test_rows_not_at_tail_need_rebuild(self, table):
+        from results_table import ResultsTable
+        from stats_builder import StatsState
+        state = StatsState(table, ['OP12'])
+        assert state.update(ResultsTable(NEW_TOURNAMENT + ROWS), ['OP12_2025-03-07']) is None
+        assert state.update(ResultsTable(ROWS + NEW_TOURNAMENT), [None]) is None
+
+    def test_edited_earlier_row_needs_rebuild(self, table):
+        from results_table import ResultsTable
+        from stats_builder import StatsState
+        state = StatsState(table, ['OP11', 'ALL-OP'])
+        edited = [list(r) for r in ROWS]
+        edited[0][8] = '999'  # points_total di una riga già aggregata
+        assert state.update(ResultsTable(edited + NEW_TOURNAMENT), ['OP12_2025-03-07']) is None
+
+    def test_new_season_creates_partial(self, table):
+        from results_table import ResultsTable
+        from stats_builder import StatsState, build_stats
+        state = StatsState(table, ['ALL-OP'])
+        rows = ROWS + _tournament('OP13_2025-03-14', PLAYERS[:8])
+        assert state.update(ResultsTable(rows), ['OP13_2025-03-14']) == ['ALL-OP']
+        assert state.payload('ALL-OP') == build_stats(['ALL-OP'], table=ResultsTable(rows))['ALL-OP']
+
+
+def _synthetic_rows(n_events, field=24, pool=150):
+    """n_events tornei OP su 3 stagioni, giocatori pescati da un pool fisso."""
+    import random
+    from datetime import date, timedelta
+    rng = random.Random(n_events)
+    players = [(f"{k:010d}", f"Player {k}") for k in range(1, pool + 1)]
+    rows = []
+    for e in range(n_events):
+        day = date(2023, 1, 1) + timedelta(days=e)
+        rows += _tournament(f"OP{10 + e % 3}_{day.isoformat()}", rng.sample(players, field))
+    return rows
+
+
+@pytest.mark.slow
+class TestScaling:
+    """Regressione: il build ALL-* deve crescere linearmente con Results."""
+
+    def _best_time(self, rows, repeat=3):
+        import time
+        from results_table import ResultsTable
+        from stats_builder import build_stats
+        table = ResultsTable(rows)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build_stats(['ALL-OP'], table=table)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def test_all_scope_build_is_linear(self):
+        small = self._best_time(_synthetic_rows(100))
+        large = self._best_time(_synthetic_rows(400))
+        # 4x righe: lineare ~4x, il vecchio scan per evento era ~16x
+        assert large / small < 8, f"100 eventi {small:.3f}s, 400 eventi {large:.3f}s"
+
+
+class TestNumpyBackend:
+    """Spotlights vettorizzati: stesso payload del calcolo in puro Python."""
+
+    def test_same_payload_without_numpy(self, monkeypatch):
+        pytest.importorskip('numpy')
+        import stats_builder
+        from results_table import ResultsTable
+        rows = _synthetic_rows(60, field=16, pool=40)
+        for row in rows[::7]:
+            row[8] = str(float(row[8]) + 0.3)     # punti non interi
+            row[9] = 'Alias'                      # nomi diversi per lo stesso giocatore
+        table = ResultsTable(rows)
+        scopes = stats_builder.all_scopes(table)
+        vectorized = stats_builder.build_stats(scopes, table=table)
+        monkeypatch.setattr(stats_builder, 'np', None)
+        assert stats_builder.build_stats(scopes, table=table) == vectorized
+
+    def test_player_metrics_match(self, table):
+        pytest.importorskip('numpy')
+        from stats_builder import StatsState, _np_player_metrics, _player_metrics
+        part = StatsState(table, ['ALL-OP']).partials['ALL-OP']
+        members = list(part.by_player)
+        vectorized = _np_player_metrics(table, [part.player_rows[m] for m in members], part.events)
+        for m, metrics in zip(members, vectorized):
+            assert metrics == _player_metrics(m, part.by_player[m])
+
+    def test_incremental_update_uses_new_rows(self, table):
+        pytest.importorskip('numpy')
+        from results_table import ResultsTable
+        from stats_builder import StatsState, build_stats
+        state = StatsState(table, ['OP12', 'ALL-OP'])
+        state.payloads()
+        new_table = ResultsTable(ROWS + NEW_TOURNAMENT)
+        state.update(new_table, ['OP12_2025-03-07'])
+        assert state.payloads() == build_stats(['OP12', 'ALL-OP'], table=new_table)
@@ -0,0 +1,102 @@
+"""
+LeagueForge - Stats Cache Tests
+===============================
+
+Test della cache stats a due livelli (memoria LRU + file).
+
+ESEGUI:
+    pytest tests/test_stats_cache.py -v
+"""
+
+import pytest
+
+
+@pytest.fixture
+def stats_cache(tmp_path, monkeypatch):
+    """stats_cache con cartella isolata e LRU vuota."""
+    import stats_cache as sc
+    monkeypatch.setattr(sc, 'BASE_DIR', tmp_path)
+    sc._memory.clear()
+    yield sc
+    sc._memory.clear()
+
+
+class TestMemoryTier:
+    """Gli scope caldi sono serviti dalla memoria."""
+
+    def test_hit_without_disk_read(self, stats_cache, monkeypatch):
+        stats_cache.set_cached('OP12', {'mvp': 'Mario'})
+
+        def _no_disk(*args, **kwargs):
+            raise AssertionError('letto da disco')
+
+        monkeypatch.setattr(stats_cache.Path, 'read_text', _no_disk)
+        assert stats_cache.get_cached('OP12', 900) == {'mvp': 'Mario'}
+
+    def test_file_hit_fills_memory(self, stats_cache):
+        stats_cache.set_cached('OP12', {'mvp': 'Mario'})
+        stats_cache._memory.clear()
+        assert stats_cache.get_cached('OP12', 900) == {'mvp': 'Mario'}
+        assert 'OP12' in stats_cache._memory
+
+    def test_lru_is_bounded(self, stats_cache, monkeypatch):
+        monkeypatch.setattr(stats_cache, 'MAX_MEMORY_ENTRIES', 2)
+        stats_cache.set_cached('OP10', {})
+        stats_cache.set_cached('OP11', {})
+        stats_cache.get_cached('OP10', 900)  # OP10 diventa il più recente
+        stats_cache.set_cached('OP12', {})
+        assert list(stats_cache._memory) == ['OP10', 'OP12']
+
+    def test_clear_removes_both_tiers(self, stats_cache):
+        stats_cache.set_cached('OP12', {'mvp': 'Mario'})
+        assert stats_cache.clear('OP12')
+        assert stats_cache.get_cached('OP12', 900) is None
+
+
+class TestFingerprint:
+    """TTL scaduto con dati invariati: rivalidazione, nessun rebuild."""
+
+    def _expire(self, stats_cache, scope):
+        stats_cache._memory[scope]['_cached_at'] -= 3600
+
+    def test_expired_without_fingerprint_is_miss(self, stats_cache):
+        stats_cache.set_cached('OP12', {'mvp': 'Mario'})
+        self._expire(stats_cache, 'OP12')
+        stats_cache._path_for('OP12').unlink()
+        assert stats_cache.get_cached('OP12', 900) is None
+
+    def test_expired_same_fingerprint_revalidates(self, stats_cache):
+        stats_cache.set_cached('OP12', {'mvp': 'Mario'}, fingerprint='abc')
+        self._expire(stats_cache, 'OP12')
+        assert stats_cache.get_cached('OP12', 900, fingerprint='abc') == {'mvp': 'Mario'}
+
+    def test_changed_fingerprint_is_miss(self, stats_cache):
+        stats_cache.set_cached('OP12', {'mvp': 'Mario'}, fingerprint='abc')
+        assert stats_cache.get_cached('OP12', 900, fingerprint='def') is None
+
+    def test_fingerprint_persisted_on_disk(self, stats_cache):
+        stats_cache.set_cached('OP12', {'mvp': 'Mario'}, fingerprint='abc')
+        stats_cache._memory.clear()
+        assert stats_cache.get_cached('OP12', 0, fingerprint='abc') == {'mvp': 'Mario'}
+
+
+class TestSections:
+    """Una entry per sezione: si leggono e si invalidano per scope."""
+
+    def test_roundtrip_and_partial_hit(self, stats_cache):
+        stats_cache.set_sections('OP12', {'spotlights': {'mvp': []}, 'hof': {}}, fingerprint='abc')
+        found = stats_cache.get_sections('OP12', ['spotlights', 'tales', 'hof'], 900, fingerprint='abc')
+        assert found == {'spotlights': {'mvp': []}, 'hof': {}}
+
+    def test_list_section(self, stats_cache):
+        stats_cache.set_sections('OP12', {'spot_narrative': []})
+        stats_cache._memory.clear()
+        assert stats_cache.get_sections('OP12', ['spot_narrative'], 900) == {'spot_narrative': []}
+
+    def test_clear_drops_every_section(self, stats_cache):
+        stats_cache.set_sections('OP12', {'spotlights': {}, 'hof': {}})
+        stats_cache.set_sections('OP1', {'hof': {}})
+        assert stats_cache.clear('OP12')
+        assert stats_cache.get_sections('OP12', ['spotlights', 'hof'], 900) == {}
+        stats_cache._memory.clear()
+        assert stats_cache.get_sections('OP1', ['hof'], 900) == {'hof': {}}
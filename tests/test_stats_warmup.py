@@ -0,0 +1,156 @@
+"""
+LeagueForge - Stats Warm-up Tests
+=================================
+
+Test del warm-up parallelo degli scope stats (pool di processi → stats_cache).
+
+ESEGUI:
+    pytest tests/test_stats_warmup.py -v
+"""
+
+import pytest
+
+from tests.conftest import PLAYERS, tournament_rows
+
+ROWS = (
+    tournament_rows('OP11_2025-01-10', PLAYERS[:8]) +
+    tournament_rows('OP12_2025-01-17', PLAYERS[2:10]) +
+    tournament_rows('OP11_2025-01-24', PLAYERS[9:0:-1]) +
+    tournament_rows('OP12_2025-02-07', PLAYERS[1:9]) +
+    tournament_rows('PKM-FS25_2025-02-01', PLAYERS[:6])
+)
+
+
+@pytest.fixture
+def stats_cache(tmp_path, monkeypatch):
+    """stats_cache con cartella isolata e LRU vuota."""
+    import stats_cache as sc
+    monkeypatch.setattr(sc, 'BASE_DIR', tmp_path)
+    sc._memory.clear()
+    yield sc
+    sc._memory.clear()
+
+
+@pytest.fixture
+def table():
+    from results_table import ResultsTable
+    return ResultsTable(ROWS)
+
+
+class TestWarmScopes:
+    """Ogni scope calcolato, salvato in cache e cronometrato."""
+
+    def test_sequential_writes_every_scope(self, table, stats_cache):
+        from stats_builder import SECTIONS, all_scopes, build_stats
+        from stats_warmup import warm_scopes
+        timings = warm_scopes(table, fingerprint='fp-1', workers=1, verbose=False)
+        assert sorted(timings) == sorted(all_scopes(table))
+        assert all(seconds >= 0 for seconds in timings.values())
+        expected = build_stats(all_scopes(table), table=table)
+        for scope in all_scopes(table):
+            assert stats_cache.get_sections(scope, SECTIONS, 900, fingerprint='fp-1') == expected[scope]
+
+    def test_largest_scope_first(self, table, stats_cache):
+        from stats_warmup import warm_scopes
+        timings = warm_scopes(table, ['OP11', 'ALL-OP', 'PKM-FS25'], workers=1, verbose=False)
+        assert list(timings) == ['ALL-OP', 'OP11', 'PKM-FS25']
+
+    @pytest.mark.slow
+    def test_process_pool_same_payloads(self, table, stats_cache):
+        from stats_builder import SECTIONS, build_stats
+        from stats_warmup import warm_scopes
+        scopes = ['OP11', 'OP12', 'ALL-OP']
+        timings = warm_scopes(table, scopes, fingerprint='fp-2', workers=2, verbose=False)
+        assert sorted(timings) == sorted(scopes)
+        expected = build_stats(scopes, table=table)
+        for scope in scopes:
+            assert stats_cache.get_sections(scope, SECTIONS, 900, fingerprint='fp-2') == expected[scope]
+
+    def test_pool_unavailable_falls_back(self, table, stats_cache, monkeypatch):
+        import stats_warmup
+
+        def _no_pool(*args, **kwargs):
+            raise OSError('no semaphores')
+
+        monkeypatch.setattr(stats_warmup, 'ProcessPoolExecutor', _no_pool)
+        timings = stats_warmup.warm_scopes(table, ['OP12'], workers=4, verbose=False)
+        assert list(timings) == ['OP12']
+        assert stats_cache.get_cached('OP12.hof', 900) is not None
+
+
+    @pytest.mark.slow
+    def test_broken_pool_falls_back(self, table, stats_cache, monkeypatch):
+        import stats_warmup
+        from stats_builder import SECTIONS, build_stats
+        monkeypatch.setattr(stats_warmup, '_init_worker', _failing_init)
+        scopes = ['OP11', 'OP12', 'ALL-OP']
+        timings = stats_warmup.warm_scopes(table, scopes, workers=2, verbose=False)
+        assert sorted(timings) == sorted(scopes)
+        expected = build_stats(scopes, table=table)
+        for scope in scopes:
+            assert stats_cache.get_sections(scope, SECTIONS, 900) == expected[scope]
+
+
+def _failing_init(table):
+    """Initializer del pool che fallisce nel processo worker."""
+    raise RuntimeError('initializer rotto')
+
+
+NEW_TOURNAMENT = tournament_rows('OP12_2025-02-21', PLAYERS[3:10])
+
+
+class TestStatsWorker:
+    """Aggregati e fold fuori dal processo web (qui inline: pool non disponibile)."""
+
+    @pytest.fixture
+    def worker(self, monkeypatch):
+        import stats_warmup
+
+        def _no_pool(*args, **kwargs):
+            raise OSError('no semaphores')
+
+        monkeypatch.setattr(stats_warmup, 'ProcessPoolExecutor', _no_pool)
+        monkeypatch.setattr(stats_warmup, '_worker_state', None)
+        worker = stats_warmup.StatsWorker()
+        yield worker
+        worker.close()
+
+    def test_fold_without_aggregates_needs_rebuild(self, worker, table):
+        from results_table import ResultsTable
+        assert worker.fold(ResultsTable(ROWS + NEW_TOURNAMENT), ['OP12_2025-02-21'], ['OP12']) is None
+
+    def test_fold_matches_full_build(self, worker, table):
+        from results_table import ResultsTable
+        from stats_builder import build_stats
+        worker.rebuild(table).result()
+        new_table = ResultsTable(ROWS + NEW_TOURNAMENT)
+        out = worker.fold(new_table, ['OP12_2025-02-21'], ['OP12', 'ALL-OP'])
+        expected = build_stats(['OP12', 'ALL-OP'], table=new_table)
+        assert out == expected
+
+    def test_fold_without_scopes_keeps_aggregates_current(self, worker, table):
+        from results_table import ResultsTable
+        worker.rebuild(table).result()
+        assert worker.fold(ResultsTable(ROWS + NEW_TOURNAMENT), ['OP12_2025-02-21'], []) == {}
+        more = ROWS + NEW_TOURNAMENT + tournament_rows('OP12_2025-02-28', PLAYERS[:5])
+        assert worker.fold(ResultsTable(more), ['OP12_2025-02-28'], ['OP12']) is not None
+
+    def test_rejected_fold_drops_aggregates(self, worker, table):
+        from results_table import ResultsTable
+        worker.rebuild(table).result()
+        assert worker.fold(ResultsTable(ROWS), ['OP12_2025-02-07'], ['OP12']) is None  # reimport
+        assert worker.fold(ResultsTable(ROWS + NEW_TOURNAMENT), ['OP12_2025-02-21'], ['OP12']) is None
+
+    @pytest.mark.slow
+    def test_dedicated_process(self, table):
+        from results_table import ResultsTable
+        from stats_builder import build_stats
+        from stats_warmup import StatsWorker
+        worker = StatsWorker()
+        try:
+            worker.rebuild(table)
+            new_table = ResultsTable(ROWS + NEW_TOURNAMENT)
+            out = worker.fold(new_table, ['OP12_2025-02-21'], ['OP12'])
+            assert out == build_stats(['OP12'], table=new_table)
+        finally:
+            worker.close()